@@ -1,104 +1,292 @@
-# TODO accept configurations as arguments and not hardcoded constants
-import time
-import math
+"""
+Bridge relayer
+
+Relays every Deposit on one side of a bridge pair as a release of the CFMM output on the other side.
+Chains and bridge pairs come from a JSON config:
+
+    {
+        "chains": {
+            "SourceChain": {"rpc_url": "http://localhost:8545", "account": "0x...", "private_key": "0x..."},
+            "DestinationChain": {"rpc_url": "http://localhost:8546", "account": "0x...", "private_key": "0x..."}
+        },
+        "pairs": [
+            {"name": "Bridge-B", "chain_a": "SourceChain", "bridge_a": "0x...", "chain_b": "DestinationChain", "bridge_b": "0x...", "fee_percent": 0}
+        ]
+    }
+
+One relayer process serves any number of pairs. Chains sharing an RPC url share one connection, all
+bridges on a chain are read with a single LogIngestor (one eth_getLogs per poll for all of them)
+and every chain is polled from one asyncio event loop. Releases go out through one ChainSigner per
+chain so back to back releases don't wait on each other's nonce. Pairs can be split across
+processes with --shards, each pair is served by exactly one shard.
+
+A release that fails doesn't hold up the other pairs, it is queued and tried again on later polls
+of its chain with exponential backoff, up to max_retries times. When the release transaction was
+signed but sending it failed (ie. a timeout after the node took it) the same signed transaction is
+resent rather than a new one, so a deposit is never paid twice.
+
+from root dir:
+`python3 -m bridge --config relayer.json --shards 4`
+without --config the two local Anvil chains of ./scripts/chains.sh are relayed.
+"""
+import argparse
+import asyncio
 import json
-from web3 import Web3
+import logging
+import math
+import multiprocessing
+import time
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from execution import ChainSigner
 
-with open('./contracts/out/Bridge.sol/Bridge.json') as f:
-    bridge_json = json.load(f)
-    BRIDGE_ABI = bridge_json['abi']
+logger = logging.getLogger(__name__)
 
-# Constants
-SRC_CHAIN_RPC = "http://localhost:8545"
-DEST_CHAIN_RPC = "http://localhost:8546"
-BRIDGE_CONTRACT_ADDRESS_SRC = "0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9"
-BRIDGE_CONTRACT_ADDRESS_DST = "0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9"
-ACCOUNT_SRC = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
-ACCOUNT_DEST = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
-PRIVATE_KEY_SRC = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
-PRIVATE_KEY_DEST = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+# web3, events and execution are imported where the relayer is wired up, importing this module
+# (ie. for calculate_output_amount or from a CLI parsing its arguments) stays fast and needs no node
 
-# Initialize web3 instances
-web3_src = Web3(Web3.HTTPProvider(SRC_CHAIN_RPC))
-web3_dest = Web3(Web3.HTTPProvider(DEST_CHAIN_RPC))
+ACCOUNT = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
 
-# Load bridge contract
-bridge_src = web3_src.eth.contract(address=BRIDGE_CONTRACT_ADDRESS_SRC, abi=BRIDGE_ABI)
-bridge_dest = web3_dest.eth.contract(address=BRIDGE_CONTRACT_ADDRESS_DST, abi=BRIDGE_ABI)
+# the local setup of ./scripts/chains.sh and ./scripts/deploy.py
+DEFAULT_CONFIG = {
+    "chains": {
+        "SourceChain": {"rpc_url": "http://localhost:8545", "account": ACCOUNT, "private_key": PRIVATE_KEY},
+        "DestinationChain": {"rpc_url": "http://localhost:8546", "account": ACCOUNT, "private_key": PRIVATE_KEY},
+    },
+    "pairs": [
+        {"name": "Bridge-B", "chain_a": "SourceChain", "bridge_a": "0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9",
+         "chain_b": "DestinationChain", "bridge_b": "0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9", "fee_percent": 0},
+    ],
+}
 
-TOKEN_ADDRESS_SRC = bridge_src.functions.token().call()
-TOKEN_ADDRESS_DEST = bridge_dest.functions.token().call()
 
-def get_nonce_and_balance(bridge, web3):
-    nonce = bridge.functions.depositNonce().call()
-    balance = bridge.functions.getReserve().call()
-    return nonce, balance
+class BridgePair(NamedTuple):
+    name: str
+    chain_a: str
+    bridge_a: str
+    chain_b: str
+    bridge_b: str
+    fee_percent: float = 0
 
-def get_deposit_amount(bridge, nonce):
-    return bridge.functions.getDepositAmount(nonce).call()
 
-def get_depositor(bridge, nonce):
-    return bridge.functions.getDepositor(nonce).call()
+@dataclass(slots=True)
+class PendingRelease:
+    pair: BridgePair
+    event: Any
+    bridge_out: Any
+    signer: "ChainSigner"
+    signed_tx: Any = None  # release signed by a failed attempt, resent instead of signing a new one
+    attempts: int = 0
+    next_attempt: float = 0.0
+
+
+def _get_abi(contract_name: str) -> Any:
+    with open(f'./contracts/out/{contract_name}.sol/{contract_name}.json') as f:
+        return json.load(f)['abi']
+
+
+def load_config(path: Optional[str] = None) -> dict:
+    if path is None:
+        return DEFAULT_CONFIG
+    with open(path) as f:
+        return json.load(f)
+
+
+def shard_of(pair_name: str, shards: int) -> int:
+    # stable across processes and runs, unlike hash()
+    return zlib.crc32(pair_name.encode()) % shards
+
 
 def calculate_output_amount(amount_in, reserve_in, reserve_out, fee_percent):
     amount_in_with_fee = amount_in * (1 - fee_percent)
     return (amount_in_with_fee * reserve_out) / (reserve_in + amount_in_with_fee)
 
 
-def release_tokens(bridge, web3, to, amount, private_key):
-    tx = bridge.functions.release(to, amount).build_transaction({
-        'nonce': web3.eth.get_transaction_count(ACCOUNT_SRC), # assume same as account_dst FIXME
-        'gas': 2000000,
-        'gasPrice': web3.to_wei('50', 'gwei')
-    })
-    signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-    tx_hash = web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    tx_hash_str = web3.to_hex(tx_hash)
-    print('released token on opposite bridge')
-    print(tx_hash_str)
-    return tx_hash_str
-
-def main():
-    fee_percent = 0
-    last_nonce_src, _ = get_nonce_and_balance(bridge_src, web3_src)
-    last_nonce_dest, _ = get_nonce_and_balance(bridge_dest, web3_dest)
-
-
-    while True:
-
-        current_nonce_src, reserve_src = get_nonce_and_balance(bridge_src, web3_src)
-        current_nonce_dest, reserve_dest = get_nonce_and_balance(bridge_dest, web3_dest)
-
-
-        if current_nonce_src > last_nonce_src:
-            amount_to_release = get_deposit_amount(bridge_src, last_nonce_src)
-            depositor_address = get_depositor(bridge_src, last_nonce_src)
-            reserve_out = bridge_dest.functions.getReserve().call()
-            amount_to_release_cfmm = calculate_output_amount(amount_to_release, reserve_src, reserve_out, fee_percent)
-            amount_to_release_cfmm = math.floor(amount_to_release_cfmm)  # Convert to nearest integer
-            print(f"amount to release: {amount_to_release_cfmm}")
-            release_tokens(bridge_dest, web3_dest, depositor_address, amount_to_release_cfmm, PRIVATE_KEY_DEST)
-            last_nonce_src = current_nonce_src
-
-        if current_nonce_dest > last_nonce_dest:
-            amount_to_release = get_deposit_amount(bridge_dest, last_nonce_dest)
-            depositor_address = get_depositor(bridge_dest, last_nonce_dest)
-            reserve_out = bridge_src.functions.getReserve().call()
-            amount_to_release_cfmm = calculate_output_amount(amount_to_release, reserve_dest, reserve_out, fee_percent)
-            amount_to_release_cfmm = math.floor(amount_to_release_cfmm)  # Convert to nearest integer
-            print(f"amount to release: {amount_to_release_cfmm}")
-            release_tokens(bridge_src, web3_src, depositor_address, amount_to_release_cfmm, PRIVATE_KEY_SRC)
-            last_nonce_dest = current_nonce_dest
-
-        time.sleep(1)
+def relay_deposit(event, bridge_out, signer: "ChainSigner", fee_percent):
+    """
+    Release the CFMM output of one Deposit event on the opposite bridge.
+    The event carries the source reserve after the deposit, only the destination reserve is read.
+    """
+    amount_to_release = event['args']['amount']
+    depositor_address = event['args']['depositor']
+    reserve_in = event['args']['reserve']
+    reserve_out = bridge_out.functions.getReserve().call()
+    amount_to_release_cfmm = calculate_output_amount(amount_to_release, reserve_in, reserve_out, fee_percent)
+    amount_to_release_cfmm = math.floor(amount_to_release_cfmm)  # Convert to nearest integer
+    print(f"deposit nonce {event['args']['nonce']}, amount to release: {amount_to_release_cfmm}")
+    from web3 import Web3
+    tx_hash = Web3.to_hex(signer.send(bridge_out.functions.release(depositor_address, amount_to_release_cfmm)))
+    print(f"released token on opposite bridge {tx_hash}")
+    return tx_hash
+
+
+class Relayer:
+    """
+    Relays the bridge pairs of one shard
+    """
+    def __init__(self, config: dict, shard: int = 0, shards: int = 1, poll_interval: float = 1.0, web3_factory=None, abi=None,
+                 retry_backoff: float = 1.0, max_retry_delay: float = 60.0, max_retries: int = 10, clock=time.monotonic) -> None:
+        from web3 import Web3
+        from events import LogIngestor
+        from execution import ChainSigner
+
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.max_retry_delay = max_retry_delay
+        self.max_retries = max_retries
+        self.clock = clock
+        self.chains = config['chains']
+        self.pairs = [BridgePair(**pair) for pair in config['pairs'] if shard_of(pair['name'], shards) == shard]
+        web3_factory = web3_factory or (lambda rpc_url: Web3(Web3.HTTPProvider(rpc_url)))
+        if abi is None and self.pairs:
+            abi = _get_abi('Bridge')
+
+        self.web3s: Dict[str, Any] = {}  # rpc url -> connection shared by every chain and pair on it
+        self.ingestors: Dict[str, "LogIngestor"] = {}
+        self.signers: Dict[str, "ChainSigner"] = {}
+        # chain -> deposits on it whose release failed and will be tried again
+        self.retries: Dict[str, list[PendingRelease]] = {}
+        # releases given up on after max_retries, left for an operator
+        self.failed: list[PendingRelease] = []
+        signers_by_account: Dict[tuple[str, str], "ChainSigner"] = {}  # one nonce counter per account and endpoint
+        for pair in self.pairs:
+            for chain in (pair.chain_a, pair.chain_b):
+                if chain in self.ingestors:
+                    continue
+                chain_config = self.chains[chain]
+                rpc_url = chain_config['rpc_url']
+                if rpc_url not in self.web3s:
+                    self.web3s[rpc_url] = web3_factory(rpc_url)
+                web3 = self.web3s[rpc_url]
+                self.ingestors[chain] = LogIngestor(web3)
+                self.retries[chain] = []
+                key = (rpc_url, chain_config['account'])
+                if key not in signers_by_account:
+                    signers_by_account[key] = ChainSigner(web3, chain_config['account'], chain_config['private_key'])
+                self.signers[chain] = signers_by_account[key]
+
+        for pair in self.pairs:
+            bridge_a = self.ingestors[pair.chain_a].web3.eth.contract(address=pair.bridge_a, abi=abi)
+            bridge_b = self.ingestors[pair.chain_b].web3.eth.contract(address=pair.bridge_b, abi=abi)
+            self._subscribe(pair, bridge_a, bridge_b, pair.chain_b)
+            self._subscribe(pair, bridge_b, bridge_a, pair.chain_a)
+
+    def _subscribe(self, pair: BridgePair, bridge_in, bridge_out, chain_out: str) -> None:
+        signer = self.signers[chain_out]
+        chain_in = pair.chain_a if chain_out == pair.chain_b else pair.chain_b
+
+        def on_deposit(event) -> None:
+            # one failed release must not stop the other pairs on this chain, nor be skipped for good
+            pending = PendingRelease(pair, event, bridge_out, signer)
+            if not self._relay(pending):
+                self._schedule(chain_in, pending)
+
+        self.ingestors[chain_in].subscribe(bridge_in, 'Deposit', on_deposit)
+
+    def _relay(self, pending: PendingRelease) -> bool:
+        from execution import SendError, StaleTransaction
+
+        try:
+            if pending.signed_tx is not None:
+                try:
+                    pending.signer.resend(pending.signed_tx)
+                    return True
+                except StaleTransaction:
+                    # never mined and can't be anymore, a new release is safe
+                    pending.signed_tx = None
+            relay_deposit(pending.event, pending.bridge_out, pending.signer, pending.pair.fee_percent)
+        except SendError as error:
+            pending.signed_tx = error.signed_tx
+            logger.exception("%s: sending release of deposit %s failed", pending.pair.name, pending.event['args']['nonce'])
+            return False
+        except Exception:
+            logger.exception("%s: release of deposit %s failed", pending.pair.name, pending.event['args']['nonce'])
+            return False
+        return True
+
+    def _schedule(self, chain: str, pending: PendingRelease) -> None:
+        pending.attempts += 1
+        if pending.attempts > self.max_retries:
+            logger.error("%s: giving up on release of deposit %s after %d attempts", pending.pair.name, pending.event['args']['nonce'], pending.attempts)
+            self.failed.append(pending)
+            return
+        pending.next_attempt = self.clock() + min(self.retry_backoff * 2 ** (pending.attempts - 1), self.max_retry_delay)
+        self.retries[chain].append(pending)
+
+    def _retry(self, chain: str) -> int:
+        """
+        Try the failed releases of deposits on chain that are due again, returns the number released
+        """
+        now = self.clock()
+        pending_releases, self.retries[chain] = self.retries[chain], []
+        released = 0
+        for pending in pending_releases:
+            if pending.next_attempt > now:
+                self.retries[chain].append(pending)
+            elif self._relay(pending):
+                released += 1
+            else:
+                self._schedule(chain, pending)
+        return released
+
+    def poll_chain(self, chain: str) -> int:
+        """
+        Retry failed releases then relay new deposits of one chain, returns the number of deposits handled
+        """
+        return self._retry(chain) + self.ingestors[chain].poll()
+
+    def poll(self) -> int:
+        return sum(self.poll_chain(chain) for chain in self.ingestors)
+
+    async def _follow(self, chain: str) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                # web3 calls block, run them off the loop so one slow chain doesn't hold up the others
+                await loop.run_in_executor(None, self.poll_chain, chain)
+            except Exception:
+                logger.exception("%s: poll failed", chain)
+            await asyncio.sleep(self.poll_interval)
+
+    async def run_async(self) -> None:
+        await asyncio.gather(*(self._follow(chain) for chain in self.ingestors))
+
+    def run(self) -> None:
+        asyncio.run(self.run_async())
+
+
+def run_shard(config: dict, shard: int, shards: int, poll_interval: float) -> None:
+    relayer = Relayer(config, shard, shards, poll_interval)
+    print(f"Relayer shard {shard}/{shards} serving {', '.join(pair.name for pair in relayer.pairs) or 'no pairs'}")
+    for chain, ingestor in relayer.ingestors.items():
+        print(f"Listening to {chain} RPC: {relayer.chains[chain]['rpc_url']}")
+    relayer.run()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Bridge relayer")
+    parser.add_argument('--config', help="JSON config of chains and bridge pairs, defaults to the local Anvil chains")
+    parser.add_argument('--shards', type=int, default=1, help="total number of relayer shards")
+    parser.add_argument('--shard', type=int, help="serve only this shard, otherwise start one process per shard")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between polls of each chain")
+    args = parser.parse_args(argv)
+    logging.basicConfig()
+    config = load_config(args.config)
+
+    if args.shard is not None or args.shards == 1:
+        run_shard(config, args.shard or 0, args.shards, args.interval)
+        return
+    processes = [multiprocessing.Process(target=run_shard, args=(config, shard, args.shards, args.interval)) for shard in range(args.shards)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
 
 if __name__ == "__main__":
     print("Bridge service is running")
-    print(f"Listening to Source Chain RPC: {SRC_CHAIN_RPC}")
-    print(f"Listening to Destination Chain RPC: {DEST_CHAIN_RPC}")
-    print(f"Source Bridge Contract Address: {BRIDGE_CONTRACT_ADDRESS_SRC}")
-    print(f"Destination Bridge Contract Address: {BRIDGE_CONTRACT_ADDRESS_DST}")
-    print(f"Source Token Address: {TOKEN_ADDRESS_SRC}")
-    print(f"Destination Token Address: {TOKEN_ADDRESS_DEST}")
-
-    main()
\ No newline at end of file
+    main()
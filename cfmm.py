@@ -0,0 +1,63 @@
+"""
+Exact integer CFMM math mirroring contracts/src/Dex.sol
+
+Solidity ^0.8 arithmetic is checked, any uint256 overflow, underflow or division by zero reverts the
+swap. The helpers below raise instead of wrapping so a simulated swap fails exactly where the
+contract call would.
+"""
+from decimal import Decimal
+from typing import Union
+
+UINT256_MAX = 2**256 - 1
+FEE_DENOMINATOR = 10000  # Dex.sol fees are in basis points
+
+
+class Uint256Error(ArithmeticError):
+    """
+    Raised where the EVM would revert with an arithmetic panic
+    """
+
+
+def _check(value: int) -> int:
+    if value < 0 or value > UINT256_MAX:
+        raise Uint256Error(f"uint256 overflow: {value}")
+    return value
+
+
+def fee_percent_to_bps(fee_percent: Union[float, Decimal]) -> int:
+    """
+    Convert a fractional fee (0.0025) to the basis points Dex.sol is deployed with (25)
+    """
+    return int(round(Decimal(str(fee_percent)) * FEE_DENOMINATOR))
+
+
+def get_amount_out(amount_in: int, reserve_in: int, reserve_out: int, fee_bps: int) -> int:
+    """
+    Bit identical port of Dex._getAmountOut
+
+        amountInWithFee = amountIn * (10000 - feePercent) / 10000;
+        return (amountInWithFee * reserveOut) / (reserveIn + amountInWithFee);
+
+    Range checks are inlined as `value >> 256`, which is non zero for negatives and anything above UINT256_MAX.
+    """
+    if (amount_in | reserve_in | reserve_out) >> 256:
+        raise Uint256Error("uint256 argument out of range")
+    if fee_bps < 0 or fee_bps > FEE_DENOMINATOR:
+        raise Uint256Error(f"uint256 overflow: {FEE_DENOMINATOR - fee_bps}")
+    amount_in_with_fee = amount_in * (FEE_DENOMINATOR - fee_bps)
+    if amount_in_with_fee >> 256:
+        raise Uint256Error(f"uint256 overflow: {amount_in_with_fee}")
+    amount_in_with_fee //= FEE_DENOMINATOR
+    denominator = reserve_in + amount_in_with_fee
+    if denominator >> 256:
+        raise Uint256Error(f"uint256 overflow: {denominator}")
+    if not denominator:
+        raise Uint256Error("division by zero")
+    numerator = amount_in_with_fee * reserve_out
+    if numerator >> 256:
+        raise Uint256Error(f"uint256 overflow: {numerator}")
+    return numerator // denominator
+
+
+def checked_add(a: int, b: int) -> int:
+    return _check(a + b)
@@ -15,6 +15,10 @@ contract Bridge is Ownable(msg.sender) {
     mapping(uint256 => uint256) public depositAmounts; // New mapping to store deposit amounts
     mapping(uint256 => address) public depositors; // New mapping to store depositor addresses
 
+    // reserve is the bridge balance after the transfer so listeners never need to call getReserve
+    event Deposit(uint256 indexed nonce, address indexed depositor, uint256 amount, uint256 reserve);
+    event Release(uint256 indexed nonce, address indexed to, uint256 amount, uint256 reserve);
+
     constructor(address _token, string memory _name) {
         token = IERC20(_token);
         name = _name;
@@ -28,6 +32,7 @@ contract Bridge is Ownable(msg.sender) {
         depositExecuted[depositNonce] = true;
         depositAmounts[depositNonce] = amount; // Store the deposit amount
         depositors[depositNonce] = msg.sender; // Store the depositor's address
+        emit Deposit(depositNonce, msg.sender, amount, token.balanceOf(address(this)));
         depositNonce++;
         return amount;
     }
@@ -35,6 +40,7 @@ contract Bridge is Ownable(msg.sender) {
     function release(address to, uint256 amount) external onlyOwner returns (uint256) {
         require(token.transfer(to, amount), "Transfer failed");
         console.log("releasing");
+        emit Release(releaseNonce, to, amount, token.balanceOf(address(this)));
         releaseExecuted[releaseNonce] = true;
         releaseNonce++;
         return amount;
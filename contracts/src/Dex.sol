@@ -11,6 +11,16 @@ contract Dex {
     uint256 public swapNonce;
     mapping(uint256 => bool) public swapExecuted;
 
+    event Swap(
+        uint256 indexed nonce,
+        address indexed sender,
+        address indexed tokenIn,
+        uint256 amountIn,
+        uint256 amountOut,
+        uint256 reserveA,
+        uint256 reserveB
+    );
+
     constructor(address _tokenA, address _tokenB, uint256 _feePercent, string memory _chainName) {
         require(_tokenA != _tokenB, "Tokens must be different");
         tokenA = IERC20(_tokenA);
@@ -45,6 +55,8 @@ contract Dex {
         require(fromToken.transferFrom(msg.sender, address(this), amountIn), "Transfer failed");
         require(toToken.transfer(msg.sender, amountOut), "Transfer failed");
 
+        emit Swap(swapNonce, msg.sender, address(fromToken), amountIn, amountOut, _getReserve(tokenA), _getReserve(tokenB));
+
         swapExecuted[swapNonce] = true;
         swapNonce++;
 
@@ -28,6 +28,9 @@ contract BridgeTest is Test {
     MintableERC20 public token;
     address public user = address(0x123);
 
+    event Deposit(uint256 indexed nonce, address indexed depositor, uint256 amount, uint256 reserve);
+    event Release(uint256 indexed nonce, address indexed to, uint256 amount, uint256 reserve);
+
     function setUp() public {
         token = new MintableERC20("Token", "TKN");
 
@@ -125,4 +128,23 @@ contract BridgeTest is Test {
         assertEq(nonce, 0);
         assertFalse(executed);
     }
-}
\ No newline at end of file
+
+    function testDepositEmitsEvent() public {
+        uint256 amount = 100 ether;
+
+        vm.startPrank(user);
+        token.approve(address(bridge), amount);
+        vm.expectEmit(true, true, false, true, address(bridge));
+        emit Deposit(0, user, amount, 600 ether);
+        bridge.deposit(amount);
+        vm.stopPrank();
+    }
+
+    function testReleaseEmitsEvent() public {
+        uint256 amount = 100 ether;
+
+        vm.expectEmit(true, true, false, true, address(bridge));
+        emit Release(0, user, amount, 400 ether);
+        bridge.release(user, amount);
+    }
+}
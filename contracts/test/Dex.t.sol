@@ -29,6 +29,16 @@ contract DexTest is Test {
     MintableERC20 public tokenB;
     address public user = address(0x123);
 
+    event Swap(
+        uint256 indexed nonce,
+        address indexed sender,
+        address indexed tokenIn,
+        uint256 amountIn,
+        uint256 amountOut,
+        uint256 reserveA,
+        uint256 reserveB
+    );
+
     function setUp() public {
         tokenA = new MintableERC20("Token A", "TKA");
         tokenB = new MintableERC20("Token B", "TKB");
@@ -123,4 +133,29 @@ contract DexTest is Test {
         assertEq(dex.swapNonce(), 1);
         assertTrue(dex.swapExecuted(0));
     }
-}
\ No newline at end of file
+
+    function testSwapAForBMatchesPythonExactMath() public {
+        // expected output computed with cfmm.get_amount_out(100 ether, 500 ether, 500 ether, 25)
+        uint256 amountA = 100 ether;
+
+        vm.startPrank(user);
+        tokenA.approve(address(dex), amountA);
+        uint256 amountBOut = dex.swapAForB(amountA);
+        vm.stopPrank();
+
+        assertEq(amountBOut, 83159649854105877448);
+        assertEq(tokenB.balanceOf(address(dex)), 500 ether - 83159649854105877448);
+    }
+
+    function testSwapEmitsEvent() public {
+        uint256 amountA = 100 ether;
+        uint256 amountBOut = 83159649854105877448;
+
+        vm.startPrank(user);
+        tokenA.approve(address(dex), amountA);
+        vm.expectEmit(true, true, true, true, address(dex));
+        emit Swap(0, user, address(tokenA), amountA, amountBOut, 600 ether, 500 ether - amountBOut);
+        dex.swapAForB(amountA);
+        vm.stopPrank();
+    }
+}
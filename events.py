@@ -0,0 +1,244 @@
+"""
+Event driven tracking of Dex and Bridge state
+
+LogIngestor reads contract logs for one chain in batched eth_getLogs calls over block ranges and
+dispatches decoded events to handlers, so every poll costs O(new logs) instead of re-reading
+contract state. Nodes that don't support eth_getLogs are served through an eth_newFilter /
+eth_getFilterChanges polling filter instead.
+
+ReserveTracker uses the Swap, Deposit and Release events (all carry the post trade reserves) to keep
+pool reserves and the routing graph weights of only the touched LPs up to date.
+"""
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional
+
+from web3 import Web3
+
+from pathway import Graph, LPExchange, TokenNode, update_edges_for_lp
+
+EventHandler = Callable[[Any], None]
+
+
+def _event_topic(contract, event_name: str) -> str:
+    for entry in contract.abi:
+        if entry.get('type') == 'event' and entry.get('name') == event_name:
+            signature = f"{event_name}({','.join(arg['type'] for arg in entry['inputs'])})"
+            return Web3.to_hex(Web3.keccak(text=signature))
+    raise ValueError(f"Event '{event_name}' not found in contract ABI.")
+
+
+# messages and codes nodes use to reject an eth_getLogs range or result as too large
+_RANGE_ERROR_MARKERS = ('range', 'limit', 'too large', 'too many', 'exceed', 'more than')
+_RANGE_ERROR_CODES = {-32005}
+
+
+def _is_range_error(error: Exception) -> bool:
+    detail = error.args[0] if error.args else None
+    if isinstance(detail, dict) and detail.get('code') in _RANGE_ERROR_CODES:
+        return True
+    message = detail.get('message', '') if isinstance(detail, dict) else str(error)
+    return any(marker in message.lower() for marker in _RANGE_ERROR_MARKERS)
+
+
+# the node does not serve eth_getLogs at all, only then is a polling filter used
+_UNSUPPORTED_CODES = {-32601}
+_UNSUPPORTED_MARKERS = ('not supported', 'does not exist', 'method not found', 'not available', 'unsupported')
+
+
+def _is_unsupported_error(error: Exception) -> bool:
+    detail = error.args[0] if error.args else None
+    if isinstance(detail, dict) and detail.get('code') in _UNSUPPORTED_CODES:
+        return True
+    message = detail.get('message', '') if isinstance(detail, dict) else str(error)
+    return any(marker in message.lower() for marker in _UNSUPPORTED_MARKERS)
+
+
+class LogIngestor:
+    """
+    Follows logs of subscribed contract events on one chain
+
+        ingestor = LogIngestor(web3)
+        ingestor.subscribe(bridge_contract, 'Deposit', on_deposit)
+        ingestor.run()
+
+    Only blocks at least `confirmations` deep are read, ranges are capped at `batch_size` blocks and
+    halved whenever the node rejects a range as too large. A node answering that eth_getLogs is not
+    supported is served through a polling filter, still holding logs back until they are
+    `confirmations` deep. Other errors are retried `retries` times with exponential backoff, then
+    raised, the next poll starts over from the same block.
+    """
+    def __init__(self, web3: Web3, start_block: Optional[int] = None, batch_size: int = 2000, confirmations: int = 0, retries: int = 2, backoff: float = 0.2) -> None:
+        self.web3 = web3
+        self.next_block = web3.eth.block_number + 1 if start_block is None else start_block
+        self.batch_size = batch_size
+        self.confirmations = confirmations
+        self.retries = retries
+        self.backoff = backoff
+        self.subscriptions: Dict[tuple[str, str], tuple[Any, EventHandler]] = {}
+        # (blockNumber, logIndex) of the last dispatched log, guards against replays after falling back
+        self.last_position = (-1, -1)
+        self.log_filter = None
+        # filter mode only, logs received but not `confirmations` deep yet
+        self._unconfirmed: list = []
+
+    def subscribe(self, contract, event_name: str, handler: EventHandler) -> None:
+        topic = _event_topic(contract, event_name)
+        self.subscriptions[(contract.address.lower(), topic)] = (getattr(contract.events, event_name)(), handler)
+        # the filter, if any, was installed for the previous subscription set
+        self.log_filter = None
+
+    def _filter_params(self) -> dict:
+        return {
+            'address': sorted({Web3.to_checksum_address(address) for address, _ in self.subscriptions}),
+            'topics': [sorted({topic for _, topic in self.subscriptions})],
+        }
+
+    def poll(self) -> int:
+        """
+        Dispatch every new log, returns the number of logs dispatched
+        """
+        if not self.subscriptions:
+            return 0
+        if self.log_filter is not None:
+            return self._poll_filter()
+
+        head = self.web3.eth.block_number - self.confirmations
+        dispatched = 0
+        while self.next_block <= head:
+            to_block = min(head, self.next_block + self.batch_size - 1)
+            try:
+                logs = self._get_logs(self.next_block, to_block)
+            except Exception as error:
+                if _is_range_error(error) and to_block > self.next_block:
+                    # range too large for this node, retry with half the window
+                    self.batch_size = max(1, (to_block - self.next_block + 1) // 2)
+                    continue
+                if _is_unsupported_error(error):
+                    return dispatched + self._install_filter(self.next_block)
+                raise
+            dispatched += self._dispatch(logs)
+            self.next_block = to_block + 1
+        return dispatched
+
+    def _get_logs(self, from_block: int, to_block: int) -> list:
+        for attempt in range(self.retries + 1):
+            try:
+                return self.web3.eth.get_logs({**self._filter_params(), 'fromBlock': from_block, 'toBlock': to_block})
+            except Exception as error:
+                # a smaller range or a filter is the fix for these, not another try
+                if _is_range_error(error) or _is_unsupported_error(error) or attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def _install_filter(self, from_block: int) -> int:
+        self.log_filter = self.web3.eth.filter({**self._filter_params(), 'fromBlock': from_block})
+        # the new filter returns the held back logs again
+        self._unconfirmed = []
+        # filter changes only cover logs after installation, catch up on the range before it
+        return self._dispatch_filter_logs(self.web3.eth.get_filter_logs(self.log_filter.filter_id))
+
+    def _poll_filter(self) -> int:
+        try:
+            logs = self.web3.eth.get_filter_changes(self.log_filter.filter_id)
+        except Exception:
+            # filters expire on most nodes, reinstall from the first block not read yet, every
+            # dispatched log is before next_block and last_position skips any replay
+            return self._install_filter(max(self.next_block, self.last_position[0]))
+        return self._dispatch_filter_logs(logs)
+
+    def _dispatch_filter_logs(self, logs) -> int:
+        logs = self._unconfirmed + list(logs)
+        if self.confirmations:
+            head = self.web3.eth.block_number - self.confirmations
+            self._unconfirmed = [log for log in logs if log['blockNumber'] > head]
+            logs = [log for log in logs if log['blockNumber'] <= head]
+        dispatched = self._dispatch(logs)
+        if logs:
+            self.next_block = max(self.next_block, max(log['blockNumber'] for log in logs) + 1)
+        return dispatched
+
+    def _dispatch(self, logs) -> int:
+        dispatched = 0
+        for log in sorted(logs, key=lambda log: (log['blockNumber'], log['logIndex'])):
+            position = (log['blockNumber'], log['logIndex'])
+            if position <= self.last_position:
+                continue
+            topic = Web3.to_hex(log['topics'][0])
+            subscription = self.subscriptions.get((log['address'].lower(), topic))
+            if subscription is None:
+                continue
+            event, handler = subscription
+            handler(event.process_log(log))
+            self.last_position = position
+            dispatched += 1
+        return dispatched
+
+    def run(self, interval: float = 1.0) -> None:
+        while True:
+            self.poll()
+            time.sleep(interval)
+
+
+class ReserveTracker:
+    """
+    Keeps LP reserves and their graph edges current from Swap, Deposit and Release events
+
+    Pools are registered with the ingestor of the chain their contract lives on. After each poll
+    round call flush() to recompute the edge weights of the LPs that changed since the last flush.
+    Liquidity added by plain token transfers emits no pool event, call resync() for such pools.
+    """
+    def __init__(self, graph: Graph, large_swap_amount: Decimal, price_dict: Optional[Dict[TokenNode, Decimal]] = None, is_dollar: bool = True) -> None:
+        self.graph = graph
+        self.large_swap_amount = large_swap_amount
+        self.price_dict = price_dict
+        self.is_dollar = is_dollar
+        self.dirty: dict[str, LPExchange] = {}
+
+    def _stop_polling(self, lp: LPExchange) -> None:
+        if getattr(lp, 'live', False):
+            lp.set_reserves(*lp.get_reserves())
+            lp.live = False
+
+    def resync(self, lp: LPExchange) -> None:
+        """
+        Re-read the reserves of a tracked Real* pool over RPC once
+        """
+        lp.live = True
+        self._stop_polling(lp)
+        self.dirty[lp.name] = lp
+
+    def track_dex(self, ingestor: LogIngestor, lp: LPExchange, dex_contract) -> None:
+        self._stop_polling(lp)
+
+        def on_swap(event) -> None:
+            lp.set_reserves(event['args']['reserveA'], event['args']['reserveB'])
+            self.dirty[lp.name] = lp
+
+        ingestor.subscribe(dex_contract, 'Swap', on_swap)
+
+    def track_bridge(self, ingestor: LogIngestor, lp: LPExchange, bridge_contract, side: str) -> None:
+        """
+        side is 'a' for the bridge contract holding token a's reserve, 'b' for token b's
+        """
+        if side not in ('a', 'b'):
+            raise ValueError("Bridge side must be 'a' or 'b'.")
+        self._stop_polling(lp)
+        token = lp.token_a if side == 'a' else lp.token_b
+
+        def on_reserve_change(event) -> None:
+            token.amount = event['args']['reserve']
+            self.dirty[lp.name] = lp
+
+        ingestor.subscribe(bridge_contract, 'Deposit', on_reserve_change)
+        ingestor.subscribe(bridge_contract, 'Release', on_reserve_change)
+
+    def flush(self) -> list[str]:
+        """
+        Recompute weights of LPs whose reserves changed, returns their names
+        """
+        changed = list(self.dirty)
+        for lp in self.dirty.values():
+            update_edges_for_lp(self.graph, lp, self.large_swap_amount, self.price_dict, self.is_dollar)
+        self.dirty.clear()
+        return changed
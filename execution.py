@@ -0,0 +1,305 @@
+"""
+Executes a route found by dijkstra on chain.
+
+    executor = TradeExecutor({lp.name: lp for lp in lps}, {
+        "SourceChain": ChainSigner(web3_src, ACCOUNT, PRIVATE_KEY),
+        "DestinationChain": ChainSigner(web3_dst, ACCOUNT, PRIVATE_KEY),
+    })
+    report = executor.execute(dijkstra(graph, initial, target), 1000)
+
+The legs of the route are run in batches: consecutive legs on one chain, up to and including a
+bridge deposit. Every batch is quoted from the pools' current reserves, then the approvals and
+swaps of the whole batch are signed with locally counted nonces and sent back to back without
+waiting for receipts in between. Each leg after the first spends its predecessor's quote less
+slippage_tolerance, so small deviations still leave enough balance and the difference stays in the
+wallet. After a bridge deposit the destination bridge's Release to the account is awaited, and the
+next batch is quoted again from the amount actually released. If a leg reverts because the realized
+output fell short, the remaining legs are re-quoted from the last realized output and sent again.
+
+Release does not carry the deposit nonce, so a release is matched by recipient (the depositing
+account, which must be the destination signer's account too) and by an amount within
+release_tolerance of the quote. Run one execution per account at a time all the same.
+"""
+import json
+import math
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Dict, NamedTuple, Optional
+
+from web3 import Web3
+
+from events import LogIngestor
+from pathway import Bridge, LPExchange, ShortestPathResult, TokenNode
+
+
+class ExecutionError(Exception):
+    pass
+
+
+class SendError(ExecutionError):
+    """
+    Sending a signed transaction failed, the node may still have taken it. Pass signed_tx to
+    ChainSigner.resend instead of signing the call again, which could get both mined.
+    """
+    def __init__(self, message: str, signed_tx: Any) -> None:
+        super().__init__(message)
+        self.signed_tx = signed_tx
+
+
+class StaleTransaction(ExecutionError):
+    """
+    A signed transaction that was never mined and whose nonce another transaction took, safe to sign again
+    """
+
+
+class ChainSigner:
+    """
+    Signs and sends transactions of one account on one chain with a locally managed nonce
+    """
+    def __init__(self, web3: Web3, account: str, private_key: str, gas: int = 2000000, gas_price: Optional[int] = None) -> None:
+        self.web3 = web3
+        self.account = account
+        self.private_key = private_key
+        self.gas = gas
+        self.gas_price = Web3.to_wei('50', 'gwei') if gas_price is None else gas_price
+        self.lock = threading.Lock()
+        self.nonce: Optional[int] = None
+
+    def resync(self) -> None:
+        with self.lock:
+            self.nonce = None
+
+    def send(self, function_call) -> Any:
+        """
+        Sign and send a contract function call, returns the transaction hash without waiting for it
+        """
+        with self.lock:
+            if self.nonce is None:
+                self.nonce = self.web3.eth.get_transaction_count(self.account, 'pending')
+            # explicit gas, estimating would fail for calls depending on transactions not mined yet
+            tx = function_call.build_transaction({
+                'from': self.account,
+                'nonce': self.nonce,
+                'gas': self.gas,
+                'gasPrice': self.gas_price,
+            })
+            signed_tx = self.web3.eth.account.sign_transaction(tx, self.private_key)
+            try:
+                tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            except Exception as error:
+                # the node may or may not have taken the nonce, ask again next time
+                self.nonce = None
+                raise SendError(f"Sending transaction failed: {error}", signed_tx) from error
+            self.nonce += 1
+            return tx_hash
+
+    def resend(self, signed_tx) -> Any:
+        """
+        Send a transaction whose send raised SendError again, returns its hash. Does nothing when the
+        node already knows it, raises StaleTransaction when its nonce went to another transaction.
+        """
+        if self._known(signed_tx.hash):
+            return signed_tx.hash
+        try:
+            return self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        except Exception as error:
+            message = str(error).lower()
+            # it may have been mined between the lookup and the send, only then is its nonce too low
+            if 'already known' in message or self._known(signed_tx.hash):
+                return signed_tx.hash
+            if 'nonce too low' in message:
+                raise StaleTransaction(f"Nonce of {Web3.to_hex(signed_tx.hash)} was used by another transaction.") from error
+            raise SendError(f"Resending {Web3.to_hex(signed_tx.hash)} failed: {error}", signed_tx) from error
+
+    def _known(self, tx_hash) -> bool:
+        try:
+            return self.web3.eth.get_transaction(tx_hash) is not None
+        except Exception:  # TransactionNotFound
+            return False
+
+    def wait(self, tx_hash, timeout: float = 120) -> Any:
+        return self.web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+
+
+class Leg(NamedTuple):
+    lp: LPExchange
+    from_node: TokenNode
+    to_node: TokenNode
+    a_to_b: bool
+    chain: str  # chain the transaction is sent on
+
+    @property
+    def is_bridge(self) -> bool:
+        return isinstance(self.lp, Bridge)
+
+
+class LegFill(NamedTuple):
+    lp_name: str
+    amount_in: int
+    quoted_out: int
+    realized_out: int
+    tx_hash: str
+
+
+class ExecutionReport(NamedTuple):
+    amount_in: int
+    amount_out: int
+    fills: list[LegFill]
+    requotes: int
+    elapsed: float
+
+
+class TradeExecutor:
+    def __init__(self, lps: Dict[str, LPExchange], signers: Dict[str, ChainSigner], slippage_tolerance: float = 0.005,
+                 release_timeout: float = 120, poll_interval: float = 0.5, release_tolerance: float = 0.02) -> None:
+        self.lps = lps
+        self.signers = signers
+        self.slippage_tolerance = Decimal(str(slippage_tolerance))
+        self.release_tolerance = release_tolerance
+        self.release_timeout = release_timeout
+        self.poll_interval = poll_interval
+        self._token_abi = None
+        self._token_addresses: Dict[tuple[str, bool], str] = {}
+
+    def plan(self, result: ShortestPathResult) -> list[Leg]:
+        legs = []
+        for from_node, to_node, lp_name in result.edges_used:
+            if lp_name not in self.lps:
+                raise ExecutionError(f"No pool named {lp_name} to execute with.")
+            lp = self.lps[lp_name]
+            token_a_node = (lp.get_token_a().chain, lp.get_token_a().name)
+            a_to_b = from_node == token_a_node
+            leg = Leg(lp, from_node, to_node, a_to_b, from_node[0])
+            for chain in (from_node[0], to_node[0]):
+                if chain not in self.signers:
+                    raise ExecutionError(f"No signer for {chain} to execute {lp_name} with.")
+            # the relayer releases to the depositor, the destination signer has to be able to spend it
+            if leg.is_bridge and self.signers[from_node[0]].account.lower() != self.signers[to_node[0]].account.lower():
+                raise ExecutionError(f"{lp_name} releases to the {from_node[0]} account, the {to_node[0]} signer uses another one.")
+            legs.append(leg)
+        return legs
+
+    def quote(self, leg: Leg, amount: int) -> int:
+        output = leg.lp.get_b_from_a(amount) if leg.a_to_b else leg.lp.get_a_from_b(amount)
+        return int(output)
+
+    def _contract(self, leg: Leg, sending: bool = True):
+        # the bridge contract deposits go to, or with sending=False the one releasing on the other chain
+        if not leg.is_bridge:
+            return leg.lp.dex_contract
+        return leg.lp.bridge_contract_src if leg.a_to_b == sending else leg.lp.bridge_contract_dst
+
+    def _get_token_abi(self) -> Any:
+        if self._token_abi is None:
+            with open('./contracts/out/Token.sol/Token.json') as f:
+                self._token_abi = json.load(f)['abi']
+        return self._token_abi
+
+    def _input_token(self, leg: Leg):
+        key = (leg.lp.name, leg.a_to_b)
+        contract = self._contract(leg)
+        if key not in self._token_addresses:
+            if leg.is_bridge:
+                self._token_addresses[key] = contract.functions.token().call()
+            else:
+                self._token_addresses[key] = (contract.functions.tokenA() if leg.a_to_b else contract.functions.tokenB()).call()
+        return self.signers[leg.chain].web3.eth.contract(address=self._token_addresses[key], abi=self._get_token_abi())
+
+    def _leg_call(self, leg: Leg, amount: int):
+        contract = self._contract(leg)
+        if leg.is_bridge:
+            return contract.functions.deposit(amount)
+        return contract.functions.swapAForB(amount) if leg.a_to_b else contract.functions.swapBForA(amount)
+
+    def _swap_output(self, leg: Leg, receipt) -> int:
+        events = self._contract(leg).events.Swap().process_receipt(receipt)
+        return events[-1]['args']['amountOut']
+
+    def _wait_release(self, leg: Leg, ingestor: LogIngestor, quote: int) -> int:
+        account = self.signers[leg.chain].account  # the depositor
+        released = []
+
+        def on_release(event) -> None:
+            # a release far from the quote belongs to another deposit still in flight
+            if event['args']['to'].lower() == account.lower() and abs(event['args']['amount'] - quote) <= quote * self.release_tolerance:
+                released.append(event['args']['amount'])
+
+        ingestor.subscribe(self._contract(leg, sending=False), 'Release', on_release)
+        deadline = time.monotonic() + self.release_timeout
+        while not released:
+            if time.monotonic() > deadline:
+                raise ExecutionError(f"No release from {leg.lp.name} on {leg.to_node[0]} within {self.release_timeout}s.")
+            try:
+                ingestor.poll()
+            except Exception:
+                pass  # node hiccup, the ingestor resumes from the same block and the deadline still applies
+            if not released:
+                time.sleep(self.poll_interval)
+        return released[0]
+
+    def _next_batch(self, legs: list[Leg], start: int) -> list[Leg]:
+        batch = []
+        for leg in legs[start:]:
+            if leg.chain != legs[start].chain:
+                break
+            batch.append(leg)
+            if leg.is_bridge:
+                break
+        return batch
+
+    def execute(self, result: ShortestPathResult, amount: int) -> ExecutionReport:
+        if not result.path or math.isinf(result.total_cost):
+            # dijkstra's answer for an unreachable target, there is nothing to execute
+            raise ExecutionError("Route is empty, the target is unreachable.")
+        start_time = time.perf_counter()
+        legs = self.plan(result)
+        amount_in = amount = int(amount)
+        fills: list[LegFill] = []
+        requotes = 0
+        position = 0
+
+        while position < len(legs):
+            batch = self._next_batch(legs, position)
+            signer = self.signers[batch[0].chain]
+
+            # quote the whole batch up front, later legs spend the previous quote less the tolerance
+            inputs, quotes = [], []
+            leg_amount = amount
+            for leg in batch:
+                inputs.append(leg_amount)
+                quotes.append(self.quote(leg, leg_amount))
+                leg_amount = math.floor(quotes[-1] * (1 - self.slippage_tolerance))
+
+            release_ingestor = None
+            if batch[-1].is_bridge:
+                # watch the destination from before the deposit can possibly be relayed
+                release_ingestor = LogIngestor(self.signers[batch[-1].to_node[0]].web3)
+
+            tx_hashes = []
+            for leg, leg_input in zip(batch, inputs):
+                signer.send(self._input_token(leg).functions.approve(self._contract(leg).address, leg_input))
+                tx_hashes.append(signer.send(self._leg_call(leg, leg_input)))
+
+            executed = 0
+            for leg, leg_input, quote, tx_hash in zip(batch, inputs, quotes, tx_hashes):
+                receipt = signer.wait(tx_hash)
+                if receipt['status'] != 1:
+                    break
+                realized = self._wait_release(leg, release_ingestor, quote) if leg.is_bridge else self._swap_output(leg, receipt)
+                fills.append(LegFill(leg.lp.name, leg_input, quote, realized, Web3.to_hex(tx_hash)))
+                amount = realized
+                executed += 1
+
+            if executed < len(batch):
+                if executed == 0:
+                    raise ExecutionError(f"{batch[0].lp.name} reverted on the first leg of a batch.")
+                # the realized output fell short of the next leg's input, the rest of the batch reverted
+                for tx_hash in tx_hashes[executed + 1:]:
+                    if signer.wait(tx_hash)['status'] == 1:
+                        raise ExecutionError("A leg succeeded after a reverted leg, wallet balances no longer follow the route.")
+                signer.resync()
+                requotes += 1
+            position += executed
+
+        return ExecutionReport(amount_in, amount, fills, requotes, time.perf_counter() - start_time)
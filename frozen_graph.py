@@ -0,0 +1,111 @@
+"""
+Read only CSR form of a routing Graph
+
+Nodes are numbered once, adjacency is packed into `indptr`/`indices` arrays with one weight and one
+LP id per directed edge. The arrays can be plain NumPy arrays or zero copy views over a memory map
+or shared memory, so a FrozenGraph can be handed to other processes without rebuilding the Graph.
+"""
+import heapq
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from pathway import Graph, ShortestPathResult, TokenNode
+
+
+class FrozenGraph(NamedTuple):
+    nodes: list[TokenNode]
+    node_index: dict[TokenNode, int]
+    lp_names: list[str]
+    indptr: np.ndarray   # int64, len(nodes) + 1
+    indices: np.ndarray  # int32, destination node id per directed edge
+    weights: np.ndarray  # float64, weight per directed edge
+    edge_lp: np.ndarray  # int32, index into lp_names per directed edge
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> "FrozenGraph":
+        """
+        Pack a Graph, duplicate neighbour entries collapse into one directed edge
+        """
+        nodes = sorted(graph.nodes | set(graph.edges))
+        node_index = {node: i for i, node in enumerate(nodes)}
+        lp_names = sorted(set(graph.lp_names.values()))
+        lp_index = {name: i for i, name in enumerate(lp_names)}
+
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        indices, weights, edge_lp = [], [], []
+        for i, node in enumerate(nodes):
+            for neighbour in dict.fromkeys(graph.edges.get(node, ())):
+                indices.append(node_index[neighbour])
+                weights.append(float(graph.weights[(node, neighbour)]))
+                edge_lp.append(lp_index[graph.lp_names[(node, neighbour)]])
+            indptr[i + 1] = len(indices)
+        return cls(
+            nodes, node_index, lp_names, indptr,
+            np.array(indices, dtype=np.int32), np.array(weights, dtype=np.float64), np.array(edge_lp, dtype=np.int32),
+        )
+
+    @classmethod
+    def from_arrays(cls, nodes: list[TokenNode], lp_names: list[str], indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, edge_lp: np.ndarray) -> "FrozenGraph":
+        return cls(nodes, {node: i for i, node in enumerate(nodes)}, lp_names, indptr, indices, weights, edge_lp)
+
+    def to_graph(self) -> Graph:
+        graph = Graph()
+        for node in self.nodes:
+            graph.add_node(node)
+        for u, node in enumerate(self.nodes):
+            start, end = int(self.indptr[u]), int(self.indptr[u + 1])
+            for v, weight, lp in zip(self.indices[start:end].tolist(), self.weights[start:end].tolist(), self.edge_lp[start:end].tolist()):
+                neighbour = self.nodes[v]
+                graph.edges[node].append(neighbour)
+                graph.weights[(node, neighbour)] = weight
+                graph.lp_names[(node, neighbour)] = self.lp_names[lp]
+        return graph
+
+    def route(self, initial: TokenNode, target: TokenNode) -> ShortestPathResult:
+        """
+        Same contract as pathway.dijkstra, run directly over the CSR arrays with a binary heap
+        """
+        if initial == target:
+            return ShortestPathResult([initial], [], 0)
+        source = self.node_index.get(initial)
+        goal = self.node_index.get(target)
+        if source is None or goal is None:
+            return ShortestPathResult([], [], float('infinity'))
+
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        distances: dict[int, float] = {source: 0.0}
+        previous: dict[int, tuple[int, int]] = {}
+        visited: set[int] = set()
+        heap = [(0.0, source)]
+        while heap:
+            distance, u = heapq.heappop(heap)
+            if u in visited:
+                continue
+            if u == goal:
+                break
+            visited.add(u)
+            start, end = indptr[u], indptr[u + 1]
+            for edge, (v, weight) in enumerate(zip(indices[start:end].tolist(), weights[start:end].tolist()), start):
+                candidate = distance + weight
+                if v not in distances or candidate < distances[v]:
+                    distances[v] = candidate
+                    previous[v] = (u, edge)
+                    heapq.heappush(heap, (candidate, v))
+
+        if goal not in distances:
+            return ShortestPathResult([], [], float('infinity'))
+        return self._reconstruct(previous, goal, distances[goal])
+
+    def _reconstruct(self, previous: dict[int, tuple[int, int]], goal: int, cost: float) -> ShortestPathResult:
+        path: list[TokenNode] = [self.nodes[goal]]
+        edges_used: list[tuple[TokenNode, TokenNode, str]] = []
+        current: Optional[int] = goal
+        while current in previous:
+            u, edge = previous[current]
+            edges_used.append((self.nodes[u], self.nodes[current], self.lp_names[int(self.edge_lp[edge])]))
+            path.append(self.nodes[u])
+            current = u
+        path.reverse()
+        edges_used.reverse()
+        return ShortestPathResult(path, edges_used, cost)
@@ -0,0 +1,32 @@
+"""
+Pydantic models validating token input, see TokenManager.add_token and TokenManager.load_manifest
+
+Kept out of pathway.py so the routing core imports without pydantic, pathway loads this on first use.
+"""
+from typing import Optional
+
+from pydantic import BaseModel
+
+from pathway import Token
+
+
+class TokenModel(BaseModel):
+    """
+    Validating model for tokens entering through API boundaries ie. TokenManager.add_token
+    """
+    chain: str
+    name: str
+    amount: Optional[int] = None
+
+    def to_token(self) -> Token:
+        return Token(self.chain, self.name, self.amount)
+
+
+class TokenManifestEntry(TokenModel):
+    """
+    One row of a token manifest, see TokenManager.load_manifest
+    """
+    address: Optional[str] = None
+    decimals: Optional[int] = None
+    asset: Optional[str] = None
+    rpc_url: Optional[str] = None
@@ -0,0 +1,120 @@
+"""
+Dex, Bridge and token classes backed by deployed contracts, reserves and balances are read over RPC
+
+Kept out of pathway.py so the routing core imports without web3, `from pathway import RealDex`
+still works and loads this module on first use.
+"""
+import json
+from decimal import Decimal
+from typing import Any
+
+from web3 import Web3
+
+from pathway import Token, Dex, Bridge, ReserveRead
+
+# seconds before an RPC call gives up, a hung node must not hold a refresh worker forever
+RPC_TIMEOUT = 10.0
+
+
+def _provider(rpc_url: str) -> Web3.HTTPProvider:
+    return Web3.HTTPProvider(rpc_url, request_kwargs={'timeout': RPC_TIMEOUT})
+
+
+class RealDex(Dex):
+    def __init__(self, name: str, token_a: Token, token_b: Token, fee_percent: float, dex_address: str, rpc_url: str, exact: bool = False) -> None:
+        super().__init__(name, token_a, token_b, fee_percent, exact)
+        self.web3 = Web3(_provider(rpc_url))
+        self.dex_address = dex_address
+        self.dex_contract = self.web3.eth.contract(address=dex_address, abi=self._get_abi('Dex'))
+        # read reserves over RPC, events.ReserveTracker turns this off and keeps the tokens up to date instead
+        self.live = True
+
+    def _get_abi(self, contract_name: str) -> Any:
+        with open(f'./contracts/out/{contract_name}.sol/{contract_name}.json') as f:
+            contract_json = json.load(f)
+            return contract_json['abi']
+
+    def get_a_reserve(self) -> Decimal:
+        if not self.live:
+            return super().get_a_reserve()
+        reserve = self.dex_contract.functions.getAReserve().call()
+        return Decimal(reserve)
+
+    def get_b_reserve(self) -> Decimal:
+        if not self.live:
+            return super().get_b_reserve()
+        reserve = self.dex_contract.functions.getBReserve().call()
+        return Decimal(reserve)
+
+    def get_reserves(self) -> tuple[int, int]:
+        if not self.live:
+            return super().get_reserves()
+        return self.dex_contract.functions.getAReserve().call(), self.dex_contract.functions.getBReserve().call()
+
+    def reserve_reads(self) -> list[ReserveRead]:
+        """
+        RPC reads making up get_reserves, used by refresh.ReserveRefresher to fetch pools concurrently
+        """
+        def read() -> tuple[int, int]:
+            return self.dex_contract.functions.getAReserve().call(), self.dex_contract.functions.getBReserve().call()
+        return [ReserveRead(self.token_a.chain, self.web3.provider.endpoint_uri, 'ab', read)]
+
+class RealBridge(Bridge):
+    def __init__(self, name: str, token_a: Token, token_b: Token, fee_percent: float, bridge_address_src: str, bridge_address_dst: str, rpc_url_src: str, rpc_url_dst: str, exact: bool = False) -> None:
+        super().__init__(name, token_a, token_b, fee_percent, exact)
+        self.web3_src = Web3(_provider(rpc_url_src))
+        self.web3_dst = Web3(_provider(rpc_url_dst))
+        self.bridge_address_src = bridge_address_src
+        self.bridge_address_dst = bridge_address_dst
+        self.bridge_contract_src = self.web3_src.eth.contract(address=bridge_address_src, abi=self._get_abi('Bridge'))
+        self.bridge_contract_dst = self.web3_dst.eth.contract(address=bridge_address_dst, abi=self._get_abi('Bridge'))
+        # read reserves over RPC, events.ReserveTracker turns this off and keeps the tokens up to date instead
+        self.live = True
+
+    def _get_abi(self, contract_name: str) -> Any:
+        with open(f'./contracts/out/{contract_name}.sol/{contract_name}.json') as f:
+            contract_json = json.load(f)
+            return contract_json['abi']
+
+    def get_a_reserve(self) -> Decimal:
+        if not self.live:
+            return super().get_a_reserve()
+        reserve = self.bridge_contract_src.functions.getReserve().call()
+        return Decimal(reserve)
+
+    def get_b_reserve(self) -> Decimal:
+        if not self.live:
+            return super().get_b_reserve()
+        reserve = self.bridge_contract_dst.functions.getReserve().call()
+        return Decimal(reserve)
+
+    def get_reserves(self) -> tuple[int, int]:
+        if not self.live:
+            return super().get_reserves()
+        return self.bridge_contract_src.functions.getReserve().call(), self.bridge_contract_dst.functions.getReserve().call()
+
+    def reserve_reads(self) -> list[ReserveRead]:
+        return [
+            ReserveRead(self.token_a.chain, self.web3_src.provider.endpoint_uri, 'a', self.bridge_contract_src.functions.getReserve().call),
+            ReserveRead(self.token_b.chain, self.web3_dst.provider.endpoint_uri, 'b', self.bridge_contract_dst.functions.getReserve().call),
+        ]
+
+class RealToken:
+    def __init__(self, chain: str, name: str, token_address: str, rpc_url: str):
+        self.chain = chain
+        self.name = name
+        self.web3 = Web3(_provider(rpc_url))
+        self.token_address = token_address
+        self.token_contract = self.web3.eth.contract(address=token_address, abi=self._get_abi('Token'))
+
+    def _get_abi(self, contract_name: str) -> Any:
+        with open(f'./contracts/out/{contract_name}.sol/{contract_name}.json') as f:
+            contract_json = json.load(f)
+            return contract_json['abi']
+
+    def get_amount(self, account: str) -> int:
+        return self.token_contract.functions.balanceOf(account).call()
+
+    def to_token(self, account: str) -> Token:
+        amount = self.get_amount(account)
+        return Token(chain=self.chain, name=self.name, amount=amount)
@@ -0,0 +1,114 @@
+"""
+Multi core route serving over a graph placed in shared memory
+
+The CSR arrays of a FrozenGraph are copied once into a single SharedMemory block. Worker processes
+attach to the block by name and wrap it in NumPy views, so every worker routes over the same pages
+without unpickling or copying the graph. Only the small node and LP name tables are sent to workers.
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from frozen_graph import FrozenGraph
+from pathway import Graph, ShortestPathResult, TokenNode
+
+_ARRAYS = ("indptr", "indices", "weights", "edge_lp")
+_ALIGNMENT = 64
+
+# (name, dtype, offset, length) per array
+Layout = list[tuple[str, str, int, int]]
+
+
+class SharedGraph:
+    """
+    Owner of the shared memory block holding a frozen graph, unlinks it on close
+    """
+    def __init__(self, graph: Union[Graph, FrozenGraph]) -> None:
+        frozen = graph if isinstance(graph, FrozenGraph) else FrozenGraph.from_graph(graph)
+        self.layout: Layout = []
+        offset = 0
+        for name in _ARRAYS:
+            array = getattr(frozen, name)
+            offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+            self.layout.append((name, array.dtype.str, offset, len(array)))
+            offset += array.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, dtype, offset, length in self.layout:
+            np.ndarray(length, dtype=dtype, buffer=self.shm.buf, offset=offset)[:] = getattr(frozen, name)
+        self.nodes = frozen.nodes
+        self.lp_names = frozen.lp_names
+        self.graph = attach(self.shm, self.nodes, self.lp_names, self.layout)
+
+    def close(self) -> None:
+        self.graph = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(shm: shared_memory.SharedMemory, nodes: list[TokenNode], lp_names: list[str], layout: Layout) -> FrozenGraph:
+    arrays = {name: np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=offset) for name, dtype, offset, length in layout}
+    for array in arrays.values():
+        array.flags.writeable = False
+    return FrozenGraph.from_arrays(nodes, lp_names, **arrays)
+
+
+# per worker process state, set by _init_worker
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_graph: Optional[FrozenGraph] = None
+
+
+def _init_worker(shm_name: str, nodes: list[TokenNode], lp_names: list[str], layout: Layout) -> None:
+    global _worker_shm, _worker_graph
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_graph = attach(_worker_shm, nodes, lp_names, layout)
+
+
+def _route_chunk(queries: list[tuple[TokenNode, TokenNode]]) -> list[ShortestPathResult]:
+    return [_worker_graph.route(initial, target) for initial, target in queries]
+
+
+class RouteExecutor:
+    """
+    Process pool answering route queries against one shared graph
+
+        with RouteExecutor(graph, processes=8) as executor:
+            results = executor.route_many([(initial, target), ...])
+    """
+    def __init__(self, graph: Union[Graph, FrozenGraph], processes: Optional[int] = None) -> None:
+        self.processes = processes or os.cpu_count() or 1
+        self.shared = SharedGraph(graph)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=_init_worker,
+            initargs=(self.shared.shm.name, self.shared.nodes, self.shared.lp_names, self.shared.layout),
+        )
+
+    def route_many(self, queries: Sequence[tuple[TokenNode, TokenNode]], chunksize: Optional[int] = None) -> list[ShortestPathResult]:
+        """
+        Fan (initial, target) queries out across the pool, results come back in query order
+        """
+        queries = list(queries)
+        if not queries:
+            return []
+        if chunksize is None:
+            # a few chunks per worker keeps the pool balanced without per query IPC
+            chunksize = max(1, math.ceil(len(queries) / (self.processes * 4)))
+        chunks = [queries[i:i + chunksize] for i in range(0, len(queries), chunksize)]
+        results = []
+        for chunk_results in self.pool.map(_route_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        self.shared.close()
+
+    def __enter__(self) -> "RouteExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
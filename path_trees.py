@@ -0,0 +1,177 @@
+"""
+Shortest path trees from hot source tokens, repaired incrementally when edge weights change.
+
+    trees = ShortestPathTrees(graph)
+    trees.add_source(("Ethereum", "USDC"))
+    ...
+    update_edges_for_lp(graph, lp, large_swap_amount)
+    trees.on_lps_updated([lp.name])
+    trees.route(("Ethereum", "USDC"), ("Arbitrum", "USDC"))
+
+Each tree keeps the distance and parent of every node reachable from its source, so a route is a walk
+up the parents instead of a dijkstra run. After weights change only the affected part of the tree is
+recomputed, in the style of Ramalingam and Reps:
+
+1. a tree edge that got more expensive invalidates the subtree below it, those nodes get the best
+   distance offered by a neighbour outside the subtree and go into a heap
+2. any changed edge that now gives a shorter distance to its head lowers it and pushes it on the heap
+3. a dijkstra run from the heap settles the changes, it stops where distances stop improving
+
+The work is proportional to the nodes whose distance or parent changes and their edges, not the graph.
+Like dijkstra the weights are read from graph.weights, edges are expected in both directions as
+Graph.add_edge adds them.
+"""
+import heapq
+from typing import Dict, Iterable, Optional
+
+from pathway import Graph, ShortestPathResult, TokenNode
+
+INFINITY = float('inf')
+
+
+class _Tree:
+    __slots__ = ('source', 'distances', 'parents')
+
+    def __init__(self, source: TokenNode) -> None:
+        self.source = source
+        self.distances: Dict[TokenNode, float] = {}
+        self.parents: Dict[TokenNode, Optional[TokenNode]] = {}
+
+
+class ShortestPathTrees:
+    def __init__(self, graph: Graph) -> None:
+        self.graph = graph
+        self.trees: Dict[TokenNode, _Tree] = {}
+        # lp name -> directed edges, rebuilt when an unknown LP shows up
+        self._edges_by_lp: Dict[str, list[tuple[TokenNode, TokenNode]]] = {}
+        # node labels set by repairs, to compare with full recomputes
+        self.repaired = 0
+
+    def add_source(self, source: TokenNode) -> None:
+        tree = _Tree(source)
+        tree.distances[source] = 0.0
+        tree.parents[source] = None
+        self._settle(tree, [(0.0, source)])
+        self.trees[source] = tree
+
+    def remove_source(self, source: TokenNode) -> None:
+        self.trees.pop(source, None)
+
+    def distance(self, source: TokenNode, target: TokenNode) -> float:
+        return self.trees[source].distances.get(target, INFINITY)
+
+    def route(self, source: TokenNode, target: TokenNode) -> ShortestPathResult:
+        """
+        Same result as dijkstra(graph, source, target), read from the tree
+        """
+        tree = self.trees[source]
+        if target not in tree.distances:
+            return ShortestPathResult([], [], INFINITY)
+        path = [target]
+        edges_used = []
+        node = target
+        while tree.parents[node] is not None:
+            parent = tree.parents[node]
+            edges_used.append((parent, node, self.graph.lp_names[(parent, node)]))
+            path.append(parent)
+            node = parent
+        path.reverse()
+        edges_used.reverse()
+        return ShortestPathResult(path, edges_used, tree.distances[target])
+
+    def on_lps_updated(self, lp_names: Iterable[str]) -> int:
+        """
+        Repair every tree after the named LPs got new weights (or were added), returns the number of labels repaired
+        """
+        edges = []
+        for lp_name in lp_names:
+            if lp_name not in self._edges_by_lp:
+                self._index_lps()
+            edges.extend(self._edges_by_lp.get(lp_name, ()))
+        return self.edges_updated(edges)
+
+    def edges_updated(self, edges: Iterable[tuple[TokenNode, TokenNode]]) -> int:
+        """
+        Repair every tree after the weights of the given directed edges changed in the graph
+        """
+        edges = list(edges)
+        repaired = self.repaired
+        for tree in self.trees.values():
+            self._repair(tree, edges)
+        return self.repaired - repaired
+
+    def _index_lps(self) -> None:
+        self._edges_by_lp = {}
+        for edge, lp_name in self.graph.lp_names.items():
+            self._edges_by_lp.setdefault(lp_name, []).append(edge)
+
+    def _repair(self, tree: _Tree, edges: list[tuple[TokenNode, TokenNode]]) -> None:
+        graph = self.graph
+        distances, parents = tree.distances, tree.parents
+
+        # tree edges that got more expensive, everything below them may now be farther
+        roots = [to_node for from_node, to_node in edges
+                 if parents.get(to_node) == from_node and distances[from_node] + float(graph.weights[(from_node, to_node)]) > distances[to_node]]
+        affected = self._subtree(tree, roots)
+
+        heap = []
+        for node in affected:
+            del distances[node]
+            del parents[node]
+        for node in affected:
+            best, best_parent = INFINITY, None
+            for neighbour in graph.edges.get(node, ()):
+                if neighbour in distances and neighbour not in affected:
+                    distance = distances[neighbour] + float(graph.weights[(neighbour, node)])
+                    if distance < best:
+                        best, best_parent = distance, neighbour
+            if best_parent is not None:
+                distances[node] = best
+                parents[node] = best_parent
+                heap.append((best, node))
+
+        # edges that got cheaper, or new ones
+        for from_node, to_node in edges:
+            if from_node not in distances or from_node in affected:
+                continue  # an affected tail relaxes its edges when it is settled
+            distance = distances[from_node] + float(graph.weights[(from_node, to_node)])
+            if distance < distances.get(to_node, INFINITY):
+                distances[to_node] = distance
+                parents[to_node] = from_node
+                heap.append((distance, to_node))
+
+        self.repaired += len(heap)
+        heapq.heapify(heap)
+        self.repaired += self._settle(tree, heap)
+
+    def _subtree(self, tree: _Tree, roots: list[TokenNode]) -> set[TokenNode]:
+        parents = tree.parents
+        subtree = set(roots)
+        stack = list(subtree)
+        while stack:
+            node = stack.pop()
+            for child in self.graph.edges.get(node, ()):
+                if child not in subtree and parents.get(child) == node:
+                    subtree.add(child)
+                    stack.append(child)
+        return subtree
+
+    def _settle(self, tree: _Tree, heap: list[tuple[float, TokenNode]]) -> int:
+        """
+        Dijkstra from the labelled nodes on the heap, relaxing edges until no distance improves, returns the labels set
+        """
+        graph = self.graph
+        labelled = 0
+        distances, parents = tree.distances, tree.parents
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > distances.get(node, INFINITY):
+                continue
+            for next_node in graph.edges.get(node, ()):
+                next_distance = distance + float(graph.weights[(node, next_node)])
+                if next_distance < distances.get(next_node, INFINITY):
+                    distances[next_node] = next_distance
+                    parents[next_node] = node
+                    heapq.heappush(heap, (next_distance, next_node))
+                    labelled += 1
+        return labelled
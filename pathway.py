@@ -1,24 +1,42 @@
 import random
+import csv
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
 from decimal import Decimal, getcontext
-from pydantic import BaseModel
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict, Tuple, Iterable, KeysView
 import json
-from web3 import Web3
+from cfmm import get_amount_out, checked_add, fee_percent_to_bps
 from collections import defaultdict, deque
 from typing import NamedTuple, Any
 
 
-class Token(BaseModel):
+@dataclass(slots=True)
+class Token:
+    """
+    Lightweight token record, pool reserves are read and written through `amount` on every swap
+    so this stays a plain slotted object. Use TokenModel to validate untrusted input.
+    """
     chain: str
     name: str
     amount: Optional[int] = None
 
+@dataclass(slots=True)
+class TokenMetadata:
+    """
+    Static token details loaded from a manifest, asset groups the same asset across chains ie. USDC
+    """
+    asset: str
+    address: Optional[str] = None
+    decimals: Optional[int] = None
+
 # Set precision for Decimal calculations
 getcontext().prec = 50
 
 TokenNode = tuple[str, str]
 
-class Pairwise(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Pairwise:
     """
     Pairwise is a tuple of two tokens, by chain and name
     """
@@ -26,21 +44,127 @@ class Pairwise(BaseModel):
     token_b: TokenNode
 
 class TokenManager:
-    def __init__(self):
-        self.tokens = {}
+    """
+    Token registry with stable integer ids and indexes by chain and by canonical asset
 
-    def add_token(self, chain: str, name: str, amount: Optional[int] = None):
-        key = (chain, name)
+    Ids are assigned in insertion order and never reused, so they can index arrays built from the
+    registry. Pools registered with add_lp are indexed by the chains they touch.
+    """
+    def __init__(self):
+        self.tokens: Dict[TokenNode, Token] = {}
+        self.metadata: Dict[TokenNode, TokenMetadata] = {}
+        self.rpc_urls: Dict[str, str] = {}
+        self._ids: Dict[TokenNode, int] = {}
+        self._keys_by_id: list[TokenNode] = []
+        self._by_chain: Dict[str, list[TokenNode]] = defaultdict(list)
+        self._by_asset: Dict[str, list[TokenNode]] = defaultdict(list)
+        self._lps_by_chain: Dict[str, list["LPExchange"]] = defaultdict(list)
+
+    def add_token(self, chain: str, name: str, amount: Optional[int] = None, address: Optional[str] = None, decimals: Optional[int] = None, asset: Optional[str] = None) -> int:
+        from models import TokenManifestEntry
+        entry = TokenManifestEntry(chain=chain, name=name, amount=amount, address=address, decimals=decimals, asset=asset)
+        return self._add_entry(entry)
+
+    def _add_entry(self, entry: "TokenManifestEntry") -> int:
+        key = (entry.chain, entry.name)
         if key in self.tokens:
-            raise ValueError(f"Token with chain '{chain}' and name '{name}' already exists.")
-        self.tokens[key] = Token(chain=chain, name=name, amount=amount)
+            raise ValueError(f"Token with chain '{entry.chain}' and name '{entry.name}' already exists.")
+        token_id = len(self._keys_by_id)
+        asset = entry.asset or entry.name
+        self.tokens[key] = entry.to_token()
+        self.metadata[key] = TokenMetadata(asset, entry.address, entry.decimals)
+        self._ids[key] = token_id
+        self._keys_by_id.append(key)
+        self._by_chain[entry.chain].append(key)
+        self._by_asset[asset].append(key)
+        if entry.rpc_url:
+            self.rpc_urls[entry.chain] = entry.rpc_url
+        return token_id
+
+    def add_tokens(self, entries: Iterable[dict]) -> list[int]:
+        """
+        Bulk add manifest rows (dicts with chain, name and optional amount, address, decimals, asset, rpc_url).
+        All or nothing, every row is validated before any is added.
+        """
+        return [self._add_entry(entry) for entry in self._validate_entries(entries)]
+
+    def _validate_entries(self, entries: Iterable[dict]) -> list["TokenManifestEntry"]:
+        from models import TokenManifestEntry
+        validated = [TokenManifestEntry(**entry) for entry in entries]
+        keys = set()
+        for entry in validated:
+            key = (entry.chain, entry.name)
+            if key in self.tokens or key in keys:
+                raise ValueError(f"Token with chain '{entry.chain}' and name '{entry.name}' already exists.")
+            keys.add(key)
+        return validated
+
+    def load_manifest(self, path: str) -> list[int]:
+        """
+        Load tokens from a .json or .csv manifest, nothing is added when a row is invalid or a duplicate.
+
+        JSON is either a list of rows or {"chains": {chain: {"rpc_url": ...}}, "tokens": [rows]}.
+        CSV has a header with chain and name columns, empty cells are treated as missing.
+        """
+        if path.endswith('.csv'):
+            with open(path, newline='') as f:
+                rows = [{column: value for column, value in row.items() if value not in (None, '')} for row in csv.DictReader(f)]
+            return self.add_tokens(rows)
+        with open(path) as f:
+            manifest = json.load(f)
+        if isinstance(manifest, list):
+            return self.add_tokens(manifest)
+        entries = self._validate_entries(manifest.get('tokens', []))
+        for chain, chain_config in manifest.get('chains', {}).items():
+            if chain_config.get('rpc_url'):
+                self.rpc_urls[chain] = chain_config['rpc_url']
+        return [self._add_entry(entry) for entry in entries]
+
+    @classmethod
+    def from_manifest(cls, path: str) -> "TokenManager":
+        token_manager = cls()
+        token_manager.load_manifest(path)
+        return token_manager
 
     def get_token(self, chain: str, name: str) -> Token:
         key = (chain, name)
         return self.tokens.get(key, None)
 
-    def get_all_keys(self) -> set[TokenNode]:
-        return set(self.tokens.keys())
+    def get_token_id(self, chain: str, name: str) -> Optional[int]:
+        return self._ids.get((chain, name))
+
+    def get_key_by_id(self, token_id: int) -> TokenNode:
+        return self._keys_by_id[token_id]
+
+    def get_token_by_id(self, token_id: int) -> Token:
+        return self.tokens[self._keys_by_id[token_id]]
+
+    def get_all_keys(self) -> KeysView[TokenNode]:
+        """
+        Live set-like view of every token key, no copy is made
+        """
+        return self.tokens.keys()
+
+    def get_chains(self) -> list[str]:
+        return list(self._by_chain)
+
+    # the get_* lookups return copies, callers changing the result must not corrupt the indexes
+    def get_tokens_on_chain(self, chain: str) -> list[TokenNode]:
+        return list(self._by_chain.get(chain, ()))
+
+    def get_tokens_for_asset(self, asset: str) -> list[TokenNode]:
+        return list(self._by_asset.get(asset, ()))
+
+    def add_lp(self, lp: "LPExchange") -> None:
+        """
+        Index a pool under every chain it touches, a bridge is listed on both of its chains
+        """
+        self._lps_by_chain[lp.token_a.chain].append(lp)
+        if lp.token_b.chain != lp.token_a.chain:
+            self._lps_by_chain[lp.token_b.chain].append(lp)
+
+    def get_lps_on_chain(self, chain: str) -> list["LPExchange"]:
+        return list(self._lps_by_chain.get(chain, ()))
 
 def get_dollar_value(token: Token, amount: Decimal, price_dict: Optional[ Dict[TokenNode, Decimal] ] = None, is_dollar: bool = True) -> Decimal:
     """
@@ -66,6 +190,8 @@ def get_dollar_value(token: Token, amount: Decimal, price_dict: Optional[ Dict[T
 
 # constant function market making in python
 class LiquidityPool:
+    __slots__ = ('token_a', 'token_b')
+
     def __init__(self, token_a: Token, token_b: Token):
         self.token_a = token_a
         self.token_b = token_b
@@ -84,38 +210,76 @@ class LiquidityPool:
         self.token_b.amount = int(amount)
         return Decimal(self.token_b.amount)
 
+    def get_reserves(self) -> tuple[int, int]:
+        """
+        Both reserves as raw integers, used by the exact integer math path
+        """
+        return self.token_a.amount, self.token_b.amount
+
+    def set_reserves(self, a_amount: int, b_amount: int) -> None:
+        self.token_a.amount = a_amount
+        self.token_b.amount = b_amount
+
 class LPExchange(LiquidityPool):
     """
     Internal Library for simulating AMM in python
+
+    With exact=True quotes and swaps use integer math bit identical to Dex.sol, the fee is rounded to
+    basis points and amounts are truncated to integers. Otherwise reserves are evaluated in Decimal.
     """
-    def __init__(self, token_a: Token, token_b: Token, fee_percent=0.0025) -> None:
+    __slots__ = ('fee_percent', 'fee_bps', 'exact')
+
+    def __init__(self, token_a: Token, token_b: Token, fee_percent=0.0025, exact: bool = False) -> None:
         super().__init__(token_a, token_b)
         self.fee_percent = Decimal(fee_percent)
+        self.fee_bps = fee_percent_to_bps(fee_percent)
+        self.exact = exact
+
+    def _get_output(self, amount_in: Decimal, reserve_in: Decimal, reserve_out: Decimal) -> Decimal:
+        fee = amount_in * self.fee_percent
+        invarient = reserve_in * reserve_out
+        new_reserve_out = invarient / (reserve_in + amount_in - fee)
+        return reserve_out - new_reserve_out
 
     def get_a_from_b(self, b_amount: Decimal) -> Decimal:
-        b_amount = Decimal(b_amount)
-        fee = b_amount * self.fee_percent
-        invarient = self.get_a_reserve() * self.get_b_reserve()
-        new_a_reserve = invarient / (self.get_b_reserve() + b_amount - fee)
-        return self.get_a_reserve() - new_a_reserve
+        if self.exact:
+            a_reserve, b_reserve = self.get_reserves()
+            return get_amount_out(int(b_amount), b_reserve, a_reserve, self.fee_bps)
+        return self._get_output(Decimal(b_amount), self.get_b_reserve(), self.get_a_reserve())
 
     def get_b_from_a(self, a_amount: Decimal) -> Decimal:
-        a_amount = Decimal(a_amount)
-        fee = a_amount * self.fee_percent
-        invarient = self.get_a_reserve() * self.get_b_reserve()
-        new_b_reserve = invarient / (self.get_a_reserve() + a_amount - fee)
-        return self.get_b_reserve() - new_b_reserve
+        if self.exact:
+            a_reserve, b_reserve = self.get_reserves()
+            return get_amount_out(int(a_amount), a_reserve, b_reserve, self.fee_bps)
+        return self._get_output(Decimal(a_amount), self.get_a_reserve(), self.get_b_reserve())
 
     def swap_a_from_b(self, b_amount: Decimal) -> Decimal:
-        a_output = self.get_a_from_b(b_amount)
-        self.set_b_reserve(self.get_b_reserve() + Decimal(b_amount))
-        self.set_a_reserve(self.get_a_reserve() - a_output)
+        if self.exact:
+            b_amount = int(b_amount)
+            a_reserve, b_reserve = self.get_reserves()
+            a_output = get_amount_out(b_amount, b_reserve, a_reserve, self.fee_bps)
+            self.set_reserves(a_reserve - a_output, checked_add(b_reserve, b_amount))
+            return a_output
+        # read each reserve once, getters may be backed by RPC calls
+        b_amount = Decimal(b_amount)
+        a_reserve, b_reserve = self.get_a_reserve(), self.get_b_reserve()
+        a_output = self._get_output(b_amount, b_reserve, a_reserve)
+        self.set_b_reserve(b_reserve + b_amount)
+        self.set_a_reserve(a_reserve - a_output)
         return a_output
 
     def swap_b_from_a(self, a_amount: Decimal) -> Decimal:
-        b_output = self.get_b_from_a(a_amount)
-        self.set_a_reserve(self.get_a_reserve() + Decimal(a_amount))
-        self.set_b_reserve(self.get_b_reserve() - b_output)
+        if self.exact:
+            a_amount = int(a_amount)
+            a_reserve, b_reserve = self.get_reserves()
+            b_output = get_amount_out(a_amount, a_reserve, b_reserve, self.fee_bps)
+            self.set_reserves(checked_add(a_reserve, a_amount), b_reserve - b_output)
+            return b_output
+        a_amount = Decimal(a_amount)
+        a_reserve, b_reserve = self.get_a_reserve(), self.get_b_reserve()
+        b_output = self._get_output(a_amount, a_reserve, b_reserve)
+        self.set_a_reserve(a_reserve + a_amount)
+        self.set_b_reserve(b_reserve - b_output)
         return b_output
 
     def get_token_a(self) -> Token:
@@ -126,24 +290,28 @@ class LPExchange(LiquidityPool):
 
 
 class Dex(LPExchange):
-    def __init__(self, name: str, token_a: Token, token_b: Token, fee_percent=0.0025) -> None:
+    __slots__ = ('name',)
+
+    def __init__(self, name: str, token_a: Token, token_b: Token, fee_percent=0.0025, exact: bool = False) -> None:
         if token_a.chain != token_b.chain:
             raise ValueError("Dex can only have tokens from the same chain.")
-        super().__init__(token_a, token_b, fee_percent)
+        super().__init__(token_a, token_b, fee_percent, exact)
         self.name = name
 
     def get_pairwise(self) -> Pairwise:
-        return Pairwise(token_a=TokenNode(self.token_a.name, self.token_a.chain), token_b=TokenNode(self.token_b.name, self.token_b.chain))
+        return Pairwise(token_a=(self.token_a.chain, self.token_a.name), token_b=(self.token_b.chain, self.token_b.name))
 
 class Bridge(LPExchange):
-    def __init__(self, name: str, token_a: Token, token_b: Token, fee_percent=0.0025) -> None:
+    __slots__ = ('name',)
+
+    def __init__(self, name: str, token_a: Token, token_b: Token, fee_percent=0.0025, exact: bool = False) -> None:
         if token_a.chain == token_b.chain:
             raise ValueError("Bridge must have tokens from different chains.")
-        super().__init__(token_a, token_b, fee_percent)
+        super().__init__(token_a, token_b, fee_percent, exact)
         self.name = name
 
     def get_pairwise(self) -> Pairwise:
-        return Pairwise(token_a=TokenNode(self.token_a.name, self.token_a.chain), token_b=TokenNode(self.token_b.name, self.token_b.chain))
+        return Pairwise(token_a=(self.token_a.chain, self.token_a.name), token_b=(self.token_b.chain, self.token_b.name))
 
 # Helper function to generate random fee
 def random_fee(base_fee=0.0025, variation=0.15):
@@ -155,6 +323,9 @@ class Graph:
         self.edges = defaultdict(list)
         self.weights = {}
         self.lp_names = {}
+        # optional directed slippage per trade size, see impact.add_impact_tables
+        self.impact_ladder: Optional[list[float]] = None
+        self.impact_tables: Dict[tuple[TokenNode, TokenNode], list[float]] = {}
 
     def add_node(self, value):
         self.nodes.add(value)
@@ -167,6 +338,67 @@ class Graph:
         self.lp_names[(from_node, to_node)] = lp_name
         self.lp_names[(to_node, from_node)] = lp_name
 
+    def set_edge_weight(self, from_node, to_node, weight, lp_name):
+        """
+        Same as add_edge for an edge that already exists, without growing the adjacency lists
+        """
+        self.weights[(from_node, to_node)] = weight
+        self.weights[(to_node, from_node)] = weight
+        self.lp_names[(from_node, to_node)] = lp_name
+        self.lp_names[(to_node, from_node)] = lp_name
+
+    def set_impact_table(self, from_node, to_node, slippages: list[float]):
+        """
+        Slippage of swapping from_node to to_node at each size of impact_ladder
+        """
+        if self.impact_ladder is None or len(slippages) != len(self.impact_ladder):
+            raise ValueError("Impact table does not match the graph's impact ladder.")
+        self.impact_tables[(from_node, to_node)] = slippages
+
+    def weights_for_amount(self, amount) -> "AmountWeights":
+        return AmountWeights(self, amount)
+
+class AmountWeights:
+    """
+    Edge weights for one trade size, interpolated from the impact tables in log size space.
+
+    The ladder bucket and interpolation factor are found once per amount, every edge lookup is then
+    O(1). Amounts outside the ladder are clamped to its ends, edges without a table fall back to the
+    weight computed by add_edges_for_lp.
+    """
+    __slots__ = ('graph', 'index', 'fraction')
+
+    def __init__(self, graph: Graph, amount) -> None:
+        ladder = graph.impact_ladder
+        if not ladder:
+            raise ValueError("Graph has no impact tables, add them with impact.add_impact_tables.")
+        self.graph = graph
+        amount = float(amount)
+        if amount <= ladder[0]:
+            self.index, self.fraction = 0, 0.0
+        elif amount >= ladder[-1]:
+            self.index, self.fraction = len(ladder) - 2, 1.0
+        else:
+            self.index = bisect_right(ladder, amount) - 1
+            low, high = ladder[self.index], ladder[self.index + 1]
+            self.fraction = math.log(amount / low) / math.log(high / low)
+
+    def __getitem__(self, key: tuple[TokenNode, TokenNode]) -> float:
+        table = self.graph.impact_tables.get(key)
+        if table is None:
+            return float(self.graph.weights[key])
+        low = table[self.index]
+        return low + self.fraction * (table[self.index + 1] - low)
+
+class ReserveRead(NamedTuple):
+    """
+    One RPC read of pool reserves, see RealDex.reserve_reads
+    """
+    chain: str
+    endpoint: str
+    side: str  # 'ab' returns both reserves, 'a' or 'b' a single one
+    read: Any
+
 class ShortestPathResult(NamedTuple):
     path: list[TokenNode]
     edges_used: list[tuple[TokenNode, TokenNode, str]]
@@ -175,8 +407,11 @@ class ShortestPathResult(NamedTuple):
 TokenNodeCost = Tuple[Optional[TokenNode], float]
 ShortestPaths = Dict[TokenNode, TokenNodeCost]
 
-def dijkstra(graph: Graph, initial: TokenNode, target: TokenNode) -> ShortestPathResult:
+def dijkstra(graph: Graph, initial: TokenNode, target: TokenNode, amount: Optional[Decimal] = None) -> ShortestPathResult:
     """
+    When amount is given edge weights are interpolated for that trade size from the graph's impact tables
+    instead of using the weights computed for a single large_swap_amount.
+
     Current Djikstra's algorithm prioritize slippage and fees an only works with in-kind asset pairs across different chains
 
     Further work could be done to generalize this version of path finding algorithm to support non-homongenously priced assets
@@ -191,6 +426,8 @@ def dijkstra(graph: Graph, initial: TokenNode, target: TokenNode) -> ShortestPat
     current_node: Optional[TokenNode] = initial
     # Create a set to keep track of visited nodes to avoid revisiting them.
     visited: set[TokenNode] = set()
+    # Edge weights, either fixed or interpolated for the requested amount.
+    weights = graph.weights if amount is None else graph.weights_for_amount(amount)
     
     # Continue the algorithm until there are no more nodes to visit.
     while current_node is not None:
@@ -207,7 +444,7 @@ def dijkstra(graph: Graph, initial: TokenNode, target: TokenNode) -> ShortestPat
 
         # Iterate over each neighboring node and calculate the weight of the path through the current node.
         for next_node in destinations:
-            weight: float = graph.weights[(current_node, next_node)] + weight_to_current_node
+            weight: float = weights[(current_node, next_node)] + weight_to_current_node
             # If the next node is not in the shortest_paths dictionary, or if the new weight is less than
             # the previously recorded weight, update the shortest path to the next node.
             if next_node not in shortest_paths or shortest_paths[next_node][1] > weight:
@@ -249,9 +486,9 @@ def dijkstra(graph: Graph, initial: TokenNode, target: TokenNode) -> ShortestPat
         return ShortestPathResult([], [], float('infinity'))
 
 
-def add_edges_for_lp(graph: Graph, lp: LPExchange, large_swap_amount: Decimal, price_dict: Optional[Dict[TokenNode, Decimal]] = None, is_dollar: bool = True) -> None:
+def get_lp_weights(lp: LPExchange, large_swap_amount: Decimal, price_dict: Optional[Dict[TokenNode, Decimal]] = None, is_dollar: bool = True) -> Tuple[Decimal, Decimal]:
     """
-    Calculate the weight based on the loss in dollar price.
+    Calculate the a to b and b to a weights of an LP based on the loss in dollar price.
     """
     # Get the output amounts for the swap
     a_to_b_output = lp.get_b_from_a(large_swap_amount)
@@ -269,9 +506,15 @@ def add_edges_for_lp(graph: Graph, lp: LPExchange, large_swap_amount: Decimal, p
     b_to_a_slippage = (b_dollar_value - a_dollar_value_from_b) / b_dollar_value
     
     # Ensure non-negative weights
-    a_to_b_weight = max(a_to_b_slippage, 0)
+    return max(a_to_b_slippage, 0), max(b_to_a_slippage, 0)
+
+
+def add_edges_for_lp(graph: Graph, lp: LPExchange, large_swap_amount: Decimal, price_dict: Optional[Dict[TokenNode, Decimal]] = None, is_dollar: bool = True) -> None:
+    """
+    Calculate the weight based on the loss in dollar price.
+    """
+    a_to_b_weight, b_to_a_weight = get_lp_weights(lp, large_swap_amount, price_dict, is_dollar)
     print(f"a_to_b_weight: {a_to_b_weight}")
-    b_to_a_weight = max(b_to_a_slippage, 0)
     
     # Get the token nodes
     token_a_node = (lp.get_token_a().chain, lp.get_token_a().name)
@@ -286,65 +529,31 @@ def add_edges_for_lp(graph: Graph, lp: LPExchange, large_swap_amount: Decimal, p
     graph.add_edge(token_b_node, token_a_node, b_to_a_weight, lp.name)
 
 
-class RealDex(Dex):
-    def __init__(self, name: str, token_a: Token, token_b: Token, fee_percent: float, dex_address: str, rpc_url: str) -> None:
-        super().__init__(name, token_a, token_b, fee_percent)
-        self.web3 = Web3(Web3.HTTPProvider(rpc_url))
-        self.dex_address = dex_address
-        self.dex_contract = self.web3.eth.contract(address=dex_address, abi=self._get_abi('Dex'))
-
-    def _get_abi(self, contract_name: str) -> Any:
-        with open(f'./contracts/out/{contract_name}.sol/{contract_name}.json') as f:
-            contract_json = json.load(f)
-            return contract_json['abi']
-
-    def get_a_reserve(self) -> Decimal:
-        reserve = self.dex_contract.functions.getAReserve().call()
-        return Decimal(reserve)
-
-    def get_b_reserve(self) -> Decimal:
-        reserve = self.dex_contract.functions.getBReserve().call()
-        return Decimal(reserve)
-
-class RealBridge(Bridge):
-    def __init__(self, name: str, token_a: Token, token_b: Token, fee_percent: float, bridge_address_src: str, bridge_address_dst: str, rpc_url_src: str, rpc_url_dst: str) -> None:
-        super().__init__(name, token_a, token_b, fee_percent)
-        self.web3_src = Web3(Web3.HTTPProvider(rpc_url_src))
-        self.web3_dst = Web3(Web3.HTTPProvider(rpc_url_dst))
-        self.bridge_address_src = bridge_address_src
-        self.bridge_address_dst = bridge_address_dst
-        self.bridge_contract_src = self.web3_src.eth.contract(address=bridge_address_src, abi=self._get_abi('Bridge'))
-        self.bridge_contract_dst = self.web3_dst.eth.contract(address=bridge_address_dst, abi=self._get_abi('Bridge'))
-
-    def _get_abi(self, contract_name: str) -> Any:
-        with open(f'./contracts/out/{contract_name}.sol/{contract_name}.json') as f:
-            contract_json = json.load(f)
-            return contract_json['abi']
-
-    def get_a_reserve(self) -> Decimal:
-        reserve = self.bridge_contract_src.functions.getReserve().call()
-        return Decimal(reserve)
-
-    def get_b_reserve(self) -> Decimal:
-        reserve = self.bridge_contract_dst.functions.getReserve().call()
-        return Decimal(reserve)
-
-class RealToken:
-    def __init__(self, chain: str, name: str, token_address: str, rpc_url: str):
-        self.chain = chain
-        self.name = name
-        self.web3 = Web3(Web3.HTTPProvider(rpc_url))
-        self.token_address = token_address
-        self.token_contract = self.web3.eth.contract(address=token_address, abi=self._get_abi('Token'))
-
-    def _get_abi(self, contract_name: str) -> Any:
-        with open(f'./contracts/out/{contract_name}.sol/{contract_name}.json') as f:
-            contract_json = json.load(f)
-            return contract_json['abi']
-
-    def get_amount(self, account: str) -> int:
-        return self.token_contract.functions.balanceOf(account).call()
-
-    def to_token(self, account: str) -> Token:
-        amount = self.get_amount(account)
-        return Token(chain=self.chain, name=self.name, amount=amount)
\ No newline at end of file
+def update_edges_for_lp(graph: Graph, lp: LPExchange, large_swap_amount: Decimal, price_dict: Optional[Dict[TokenNode, Decimal]] = None, is_dollar: bool = True) -> None:
+    """
+    Recompute the weights of an LP already added with add_edges_for_lp after its reserves changed,
+    leaves the graph exactly as add_edges_for_lp would with the new reserves.
+    """
+    a_to_b_weight, b_to_a_weight = get_lp_weights(lp, large_swap_amount, price_dict, is_dollar)
+    token_a_node = (lp.get_token_a().chain, lp.get_token_a().name)
+    token_b_node = (lp.get_token_b().chain, lp.get_token_b().name)
+    graph.set_edge_weight(token_a_node, token_b_node, a_to_b_weight, lp.name)
+    graph.set_edge_weight(token_b_node, token_a_node, b_to_a_weight, lp.name)
+
+
+# pydantic models and the web3 backed classes load on first use, importing the routing core stays fast
+_LAZY_ATTRIBUTES = {
+    'TokenModel': 'models',
+    'TokenManifestEntry': 'models',
+    'RealDex': 'onchain',
+    'RealBridge': 'onchain',
+    'RealToken': 'onchain',
+}
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
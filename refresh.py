@@ -0,0 +1,145 @@
+"""
+Concurrent reserve refresh for RealDex / RealBridge pools.
+
+Building the graph with add_edges_for_lp reads every pool's reserves over RPC one after another, so
+the build takes the sum of all round trips. ReserveRefresher issues the reads of all pools at once
+from one thread pool per RPC endpoint of max_per_endpoint workers, so a slow node only delays reads
+queued on it. Failed reads are retried and the edge weights of each pool are computed on the
+calling thread as soon as its reads arrive. When the timeout is hit reads not started yet are
+cancelled, reads still running are abandoned and their chains reported stale, pools on those chains
+keep their previous weights (or stay out of the graph on the first build). An abandoned read holds
+its worker until the RPC call returns, onchain.RPC_TIMEOUT bounds that for RealDex / RealBridge.
+
+    refresher = ReserveRefresher(graph, Decimal(1000))
+    result = refresher.refresh(lps)
+    cache.invalidate_lps(result.refreshed)
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional
+
+from pathway import Graph, LPExchange, ReserveRead, TokenNode, add_edges_for_lp, update_edges_for_lp
+
+
+class RefreshResult(NamedTuple):
+    refreshed: list[str]  # names of LPs whose weights were recomputed, in arrival order
+    stale_chains: set[str]  # chains with reads that failed or did not finish in time
+    errors: Dict[str, Exception]  # last error per LP name
+    elapsed: float
+
+
+def _reserve_reads(lp: LPExchange) -> list[ReserveRead]:
+    # plain Dex / Bridge pools already hold their reserves
+    reserve_reads = getattr(lp, 'reserve_reads', None)
+    return reserve_reads() if reserve_reads is not None else []
+
+
+class ReserveRefresher:
+    def __init__(self, graph: Graph, large_swap_amount: Decimal, price_dict: Optional[Dict[TokenNode, Decimal]] = None, is_dollar: bool = True,
+                 max_per_endpoint: int = 4, timeout: float = 5.0, retries: int = 2, backoff: float = 0.2,
+                 on_update: Optional[Callable[[LPExchange], None]] = None) -> None:
+        self.graph = graph
+        self.large_swap_amount = large_swap_amount
+        self.price_dict = price_dict
+        self.is_dollar = is_dollar
+        self.max_per_endpoint = max_per_endpoint
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.on_update = on_update
+        # endpoint -> its own workers, kept across refreshes so reads abandoned by a timeout still count
+        # against the endpoint's limit and never take the workers of another endpoint
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._in_graph: set[str] = set()
+
+    def _executor(self, endpoint: str) -> ThreadPoolExecutor:
+        if endpoint not in self._executors:
+            self._executors[endpoint] = ThreadPoolExecutor(max_workers=self.max_per_endpoint, thread_name_prefix=f"refresh {endpoint}")
+        return self._executors[endpoint]
+
+    def close(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
+
+    def _read(self, reserve_read: ReserveRead) -> Any:
+        for attempt in range(self.retries + 1):
+            try:
+                return reserve_read.read()
+            except Exception:
+                if attempt == self.retries:
+                    raise
+            time.sleep(self.backoff * 2 ** attempt)
+
+    def _apply(self, lp: LPExchange, reserves: Dict[str, Any]) -> None:
+        if 'ab' in reserves:
+            lp.set_reserves(*reserves['ab'])
+        else:
+            lp.set_reserves(reserves['a'], reserves['b'])
+        # weights from the reserves just read, without reading them again
+        live = getattr(lp, 'live', None)
+        if live is not None:
+            lp.live = False
+        try:
+            if lp.name in self._in_graph:
+                update_edges_for_lp(self.graph, lp, self.large_swap_amount, self.price_dict, self.is_dollar)
+            else:
+                self.graph.add_node((lp.get_token_a().chain, lp.get_token_a().name))
+                self.graph.add_node((lp.get_token_b().chain, lp.get_token_b().name))
+                add_edges_for_lp(self.graph, lp, self.large_swap_amount, self.price_dict, self.is_dollar)
+                self._in_graph.add(lp.name)
+        finally:
+            if live is not None:
+                lp.live = live
+        if self.on_update is not None:
+            self.on_update(lp)
+
+    def refresh(self, lps: Iterable[LPExchange]) -> RefreshResult:
+        start = time.perf_counter()
+        refreshed: list[str] = []
+        stale_chains: set[str] = set()
+        errors: Dict[str, Exception] = {}
+
+        reads_by_lp = [(lp, _reserve_reads(lp)) for lp in lps]
+        futures = {}
+        # lp name -> side -> value, and the number of reads still outstanding
+        received: Dict[str, Dict[str, Any]] = {}
+        outstanding: Dict[str, int] = {}
+        for lp, reserve_reads in reads_by_lp:
+            if not reserve_reads:
+                self._apply(lp, {'ab': lp.get_reserves()})
+                refreshed.append(lp.name)
+                continue
+            received[lp.name] = {}
+            outstanding[lp.name] = len(reserve_reads)
+            for reserve_read in reserve_reads:
+                futures[self._executor(reserve_read.endpoint).submit(self._read, reserve_read)] = (lp, reserve_read)
+
+        def collect(future) -> None:
+            lp, reserve_read = futures.pop(future)
+            try:
+                received[lp.name][reserve_read.side] = future.result()
+            except Exception as error:
+                errors[lp.name] = error
+                stale_chains.add(reserve_read.chain)
+            outstanding[lp.name] -= 1
+            if outstanding[lp.name] == 0 and lp.name not in errors:
+                self._apply(lp, received[lp.name])
+                refreshed.append(lp.name)
+
+        try:
+            for future in as_completed(list(futures), timeout=self.timeout):
+                collect(future)
+        except TimeoutError:
+            for future, (lp, reserve_read) in list(futures.items()):
+                if future.done():
+                    # finished while the timeout fired
+                    collect(future)
+                else:
+                    # a queued read frees its place, a running one is left to its RPC timeout
+                    future.cancel()
+                    errors.setdefault(lp.name, TimeoutError(f"Reserve read of {lp.name} on {reserve_read.chain} timed out."))
+                    stale_chains.add(reserve_read.chain)
+
+        return RefreshResult(refreshed, stale_chains, errors, time.perf_counter() - start)
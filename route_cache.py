@@ -0,0 +1,153 @@
+"""
+Cache of dijkstra results for the few pairs that dominate traffic.
+
+Entries are keyed by (initial, target, amount bucket, cost profile) and remember the LPs their route
+goes through. When reserves change only the entries routed through the changed LPs are dropped, so
+the hot pairs stay cached while unrelated pools trade:
+
+    cache = RouteCache(max_entries=1024, ttl=30)
+    result = cache.route(graph, initial, target, amount=Decimal(5000))
+    ...
+    cache.invalidate_lps(tracker.flush())
+
+A reserve change can also make an LP that a cached route does not use the better choice, the ttl
+bounds how long such a route can be served. Call clear() after adding or removing LPs.
+"""
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from pathway import Graph, ShortestPathResult, TokenNode, dijkstra
+
+DEFAULT_PROFILE = "slippage"
+
+CacheKey = Tuple[TokenNode, TokenNode, Optional[int], Hashable]
+
+
+def amount_bucket(amount: Optional[Decimal], ratio: float = 2.0) -> Optional[int]:
+    """
+    Geometric bucket of a trade size, amounts within a factor of ratio share a bucket
+    """
+    if amount is None:
+        return None
+    amount = float(amount)
+    if amount <= 0:
+        return 0
+    bucket = math.floor(math.log(amount, ratio))
+    # log rounds either way near exact powers, ie. log(1000, 10) is 2.9999999999999996
+    if ratio ** (bucket + 1) <= amount:
+        return bucket + 1
+    if ratio ** bucket > amount:
+        return bucket - 1
+    return bucket
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # dropped to stay within max_entries
+    expirations: int = 0  # older than ttl
+    invalidations: int = 0  # routed through an LP whose reserves changed
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class RouteCache:
+    """
+    Bounded LRU of ShortestPathResult with an optional ttl in seconds
+    """
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None, bucket_ratio: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.bucket_ratio = bucket_ratio
+        self.clock = clock
+        self.stats = CacheStats()
+        # key -> (result, stored at), least recently used first
+        self._entries: OrderedDict[CacheKey, tuple[ShortestPathResult, float]] = OrderedDict()
+        # lp name -> keys of entries routed through it
+        self._keys_by_lp: Dict[str, set[CacheKey]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, initial: TokenNode, target: TokenNode, amount: Optional[Decimal] = None, profile: Hashable = DEFAULT_PROFILE) -> CacheKey:
+        return initial, target, amount_bucket(amount, self.bucket_ratio), profile
+
+    def get(self, initial: TokenNode, target: TokenNode, amount: Optional[Decimal] = None, profile: Hashable = DEFAULT_PROFILE) -> Optional[ShortestPathResult]:
+        key = self.key(initial, target, amount, profile)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        result, stored_at = entry
+        if self.ttl is not None and self.clock() - stored_at > self.ttl:
+            self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return result
+
+    def put(self, initial: TokenNode, target: TokenNode, result: ShortestPathResult, amount: Optional[Decimal] = None, profile: Hashable = DEFAULT_PROFILE) -> None:
+        key = self.key(initial, target, amount, profile)
+        if key in self._entries:
+            self._remove(key)
+        if not result.path or math.isinf(result.total_cost):
+            # an unreachable result goes through no LP, no invalidate_lps call could ever drop it
+            return
+        self._entries[key] = (result, self.clock())
+        for _, _, lp_name in result.edges_used:
+            self._keys_by_lp.setdefault(lp_name, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def route(self, graph: Graph, initial: TokenNode, target: TokenNode, amount: Optional[Decimal] = None, profile: Hashable = DEFAULT_PROFILE,
+              router: Callable[..., ShortestPathResult] = dijkstra) -> ShortestPathResult:
+        """
+        Cached route, computed with router(graph, initial, target, amount=amount) on a miss.
+
+        Pass a different profile for routers weighing edges differently so their results are kept apart.
+        """
+        result = self.get(initial, target, amount, profile)
+        if result is None:
+            result = router(graph, initial, target, amount=amount)
+            self.put(initial, target, result, amount, profile)
+        return result
+
+    def invalidate_lps(self, lp_names: Iterable[str]) -> int:
+        """
+        Drop every entry routed through one of the LPs, returns the number of entries dropped
+        """
+        dropped = 0
+        for lp_name in lp_names:
+            for key in self._keys_by_lp.pop(lp_name, ()):
+                if key in self._entries:
+                    self._remove(key)
+                    dropped += 1
+        self.stats.invalidations += dropped
+        return dropped
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_lp.clear()
+
+    def _remove(self, key: CacheKey) -> None:
+        result, _ = self._entries.pop(key)
+        for _, _, lp_name in result.edges_used:
+            keys = self._keys_by_lp.get(lp_name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_lp[lp_name]
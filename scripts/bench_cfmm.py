@@ -0,0 +1,37 @@
+"""
+Quote and swap cost of the Decimal CFMM path against the exact integer path (Dex.sol semantics).
+
+from root dir:
+`python3 -m scripts.bench_cfmm --iterations 200000`
+"""
+import argparse
+import timeit
+
+from pathway import Token, LPExchange
+
+
+def bench(exact: bool, iterations: int) -> tuple[float, float]:
+    """
+    Seconds per quote and per swap, swaps alternate direction so reserves stay balanced
+    """
+    amm = LPExchange(Token("Ethereum", "ETH", 10**24), Token("Ethereum", "USDT", 10**24), fee_percent=0.0025, exact=exact)
+    env = {'quote': amm.get_b_from_a, 'swap_b': amm.swap_b_from_a, 'swap_a': amm.swap_a_from_b, 'amount': 10**18}
+    quote = timeit.timeit('quote(amount)', globals=env, number=iterations) / iterations
+    swap = timeit.timeit('swap_b(amount); swap_a(amount)', globals=env, number=iterations // 2) / iterations
+    return quote, swap
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    decimal_quote, decimal_swap = bench(False, args.iterations)
+    exact_quote, exact_swap = bench(True, args.iterations)
+    print(f"decimal: {decimal_quote * 1e6:7.3f} us/quote, {decimal_swap * 1e6:7.3f} us/swap")
+    print(f"  exact: {exact_quote * 1e6:7.3f} us/quote, {exact_swap * 1e6:7.3f} us/swap")
+    print(f"speedup: {decimal_quote / exact_quote:.1f}x quote, {decimal_swap / exact_swap:.1f}x swap")
+
+
+if __name__ == "__main__":
+    main()
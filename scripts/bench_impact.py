@@ -0,0 +1,78 @@
+"""
+Amount aware routing: recomputing every LP weight for the trade size versus interpolating impact tables.
+
+from root dir:
+`python3 -m scripts.bench_impact --tokens 500 --lps 2000 --queries 50`
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+from decimal import Decimal
+
+from impact import add_impact_tables
+from pathway import Graph, Token, Dex, Bridge, add_edges_for_lp, get_lp_weights, dijkstra
+
+
+def build_pools(tokens: int, lps: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    nodes = [(f"Chain{i % 10}", f"T{i}") for i in range(tokens)]
+    pools = []
+    for i in range(lps):
+        (chain_a, name_a), (chain_b, name_b) = rng.sample(nodes, 2)
+        depth = 10 ** rng.uniform(4, 8)
+        kind = Dex if chain_a == chain_b else Bridge
+        pools.append(kind(f"LP-{i}", Token(chain_a, name_a, int(depth)), Token(chain_b, name_b, int(depth * rng.uniform(0.9, 1.1))),
+                         fee_percent=rng.uniform(0.0005, 0.005)))
+    return pools
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=500)
+    parser.add_argument('--lps', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    pools = build_pools(args.tokens, args.lps)
+    graph = Graph()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for lp in pools:
+            graph.add_node((lp.get_token_a().chain, lp.get_token_a().name))
+            graph.add_node((lp.get_token_b().chain, lp.get_token_b().name))
+            add_edges_for_lp(graph, lp, Decimal(1000))
+
+    start = time.perf_counter()
+    add_impact_tables(graph, pools)
+    build = time.perf_counter() - start
+
+    rng = random.Random(1)
+    nodes = sorted(graph.nodes)
+    queries = [(*rng.sample(nodes, 2), Decimal(round(10 ** rng.uniform(1, 6)))) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    for initial, target, amount in queries:
+        exact = Graph()
+        exact.nodes, exact.edges, exact.lp_names = graph.nodes, graph.edges, graph.lp_names
+        for lp in pools:
+            a_to_b, b_to_a = get_lp_weights(lp, amount)
+            token_a_node = (lp.get_token_a().chain, lp.get_token_a().name)
+            token_b_node = (lp.get_token_b().chain, lp.get_token_b().name)
+            exact.weights[(token_a_node, token_b_node)] = a_to_b
+            exact.weights[(token_b_node, token_a_node)] = b_to_a
+        dijkstra(exact, initial, target)
+    recompute = (time.perf_counter() - start) / args.queries
+
+    start = time.perf_counter()
+    for initial, target, amount in queries:
+        dijkstra(graph, initial, target, amount=amount)
+    interpolate = (time.perf_counter() - start) / args.queries
+
+    print(f"build impact tables ({len(graph.impact_ladder)} sizes, {args.lps} LPs): {build * 1000:9.1f} ms")
+    print(f"route, recompute weights per query:        {recompute * 1000:9.2f} ms")
+    print(f"route, interpolate impact tables:          {interpolate * 1000:9.2f} ms  ({recompute / interpolate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Cold import time of each module, measured with `python -X importtime` in a fresh interpreter.
+
+from root dir:
+`python3 -m scripts.bench_import pathway bridge events`
+"""
+import argparse
+import subprocess
+import sys
+from typing import Dict
+
+DEFAULT_MODULES = ['pathway', 'cfmm', 'route_cache', 'subscriptions', 'bridge', 'frozen_graph', 'events', 'onchain']
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """
+    Cumulative import time in microseconds of every module loaded by `import module`
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        times = import_times(module)
+        heavy = [name for name in ('web3', 'pydantic', 'numpy') if name in times]
+        print(f"{module:15s} {times[module] / 1000:8.1f} ms  loads {', '.join(heavy) or 'no web3, pydantic or numpy'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Route query throughput of parallel.RouteExecutor as the number of worker processes grows.
+
+from root dir:
+`python3 -m scripts.bench_parallel --tokens 5000 --lps 20000 --queries 2000 --processes 1 2 4 8`
+"""
+import argparse
+import os
+import random
+import time
+
+from parallel import RouteExecutor
+from scripts.bench_snapshot import build_graph
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=5000)
+    parser.add_argument('--lps', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args(argv)
+
+    graph = build_graph(args.tokens, args.lps)
+    nodes = sorted(graph.nodes)
+    rng = random.Random(1)
+    queries = [tuple(rng.sample(nodes, 2)) for _ in range(args.queries)]
+
+    baseline = None
+    for processes in sorted(set(args.processes)):
+        with RouteExecutor(graph, processes=processes) as executor:
+            executor.route_many(queries[:processes])  # warm up workers
+            start = time.perf_counter()
+            executor.route_many(queries)
+            elapsed = time.perf_counter() - start
+        rate = args.queries / elapsed
+        baseline = baseline or rate
+        print(f"{processes:3d} processes: {rate:10,.0f} routes/s, speedup {rate / baseline:5.2f}x")
+    print(f"({os.cpu_count()} cores available)")
+
+
+if __name__ == "__main__":
+    main()
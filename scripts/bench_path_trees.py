@@ -0,0 +1,85 @@
+"""
+Keeping shortest path trees from a few hot sources current while single pools change:
+incremental repair versus recomputing the trees from scratch after every update.
+
+from root dir:
+`python3 -m scripts.bench_path_trees --tokens 2000 --lps 8000 --sources 5 --updates 500`
+"""
+import argparse
+import random
+import time
+
+from path_trees import ShortestPathTrees
+from pathway import Graph, dijkstra
+
+
+def build_graph(tokens: int, lps: int, seed: int = 0) -> Graph:
+    rng = random.Random(seed)
+    nodes = [(f"Chain{i % 10}", f"T{i}") for i in range(tokens)]
+    graph = Graph()
+    for node in nodes:
+        graph.add_node(node)
+    for i in range(lps):
+        a, b = rng.sample(nodes, 2)
+        graph.add_edge(a, b, rng.uniform(0.0005, 0.01), f"LP-{i}")
+    return graph
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=2000)
+    parser.add_argument('--lps', type=int, default=8000)
+    parser.add_argument('--sources', type=int, default=5)
+    parser.add_argument('--updates', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    graph = build_graph(args.tokens, args.lps)
+    rng = random.Random(1)
+    nodes = sorted(graph.nodes)
+    sources = rng.sample(nodes, args.sources)
+    edges = {lp_name: edge for edge, lp_name in graph.lp_names.items()}
+    lp_names = sorted(edges)
+    # reserve moves of a few percent either way, now and then a pool drained or refilled
+    updates = [(lp_name, rng.choice([rng.uniform(0.95, 1.05), rng.uniform(0.2, 5.0)])) for lp_name in rng.choices(lp_names, k=args.updates)]
+
+    def apply(lp_name, factor):
+        from_node, to_node = edges[lp_name]
+        graph.set_edge_weight(from_node, to_node, graph.weights[(from_node, to_node)] * factor, lp_name)
+
+    trees = ShortestPathTrees(graph)
+    for source in sources:
+        trees.add_source(source)
+    start = time.perf_counter()
+    for lp_name, factor in updates:
+        apply(lp_name, factor)
+        trees.on_lps_updated([lp_name])
+    incremental = (time.perf_counter() - start) / args.updates
+
+    # undo the updates and replay them with full recomputes, same weights at every step
+    for lp_name, factor in reversed(updates):
+        apply(lp_name, 1 / factor)
+    full = ShortestPathTrees(graph)
+    start = time.perf_counter()
+    for lp_name, factor in updates:
+        apply(lp_name, factor)
+        for source in sources:
+            full.add_source(source)
+    recompute = (time.perf_counter() - start) / args.updates
+
+    for source in sources:
+        for target in rng.sample(nodes, 20):
+            assert abs(trees.distance(source, target) - full.distance(source, target)) < 1e-9
+
+    start = time.perf_counter()
+    for source in sources:
+        dijkstra(graph, source, rng.choice(nodes))
+    single = time.perf_counter() - start
+
+    print(f"{args.tokens} tokens, {args.lps} LPs, {args.sources} sources, {args.updates} single pool updates")
+    print(f"recompute all trees per update:   {recompute * 1000:9.3f} ms")
+    print(f"repair trees per update:          {incremental * 1000:9.3f} ms  ({recompute / incremental:.0f}x, {trees.repaired / args.updates:.1f} labels repaired per update)")
+    print(f"pathway.dijkstra, one route per source: {single * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Graph build time with simulated RPC latency: sequential add_edges_for_lp versus refresh.ReserveRefresher.
+
+from root dir:
+`python3 -m scripts.bench_refresh --chains 5 --pools 20 --latency 0.02`
+"""
+import argparse
+import contextlib
+import io
+import time
+from decimal import Decimal
+
+from pathway import Graph, Token, Dex, ReserveRead, add_edges_for_lp
+from refresh import ReserveRefresher
+
+
+class SlowDex(Dex):
+    """
+    Dex whose reserve reads take `latency` seconds, like RealDex over a remote RPC endpoint
+    """
+    def __init__(self, name: str, token_a: Token, token_b: Token, endpoint: str, latency: float) -> None:
+        super().__init__(name, token_a, token_b)
+        self.endpoint = endpoint
+        self.latency = latency
+        self.live = True
+
+    def _read(self) -> tuple[int, int]:
+        time.sleep(self.latency)
+        return self.token_a.amount, self.token_b.amount
+
+    def get_reserves(self) -> tuple[int, int]:
+        return self._read() if self.live else super().get_reserves()
+
+    def get_a_reserve(self) -> Decimal:
+        return Decimal(self._read()[0]) if self.live else super().get_a_reserve()
+
+    def get_b_reserve(self) -> Decimal:
+        return Decimal(self._read()[1]) if self.live else super().get_b_reserve()
+
+    def reserve_reads(self) -> list[ReserveRead]:
+        return [ReserveRead(self.token_a.chain, self.endpoint, 'ab', self._read)]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chains', type=int, default=5)
+    parser.add_argument('--pools', type=int, default=20, help="pools per chain")
+    parser.add_argument('--latency', type=float, default=0.02, help="seconds per RPC read")
+    parser.add_argument('--per-endpoint', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    lps = [SlowDex(f"DEX-{c}-{i}", Token(f"Chain{c}", f"T{i}", 10**6), Token(f"Chain{c}", f"U{i}", 10**6), f"http://chain{c}", args.latency)
+           for c in range(args.chains) for i in range(args.pools)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        graph = Graph()
+        for lp in lps:
+            add_edges_for_lp(graph, lp, Decimal(1000))
+        sequential = time.perf_counter() - start
+
+        result = ReserveRefresher(Graph(), Decimal(1000), max_per_endpoint=args.per_endpoint, timeout=60).refresh(lps)
+
+    print(f"{len(lps)} pools on {args.chains} chains, {args.latency * 1000:.0f} ms per read")
+    print(f"sequential add_edges_for_lp: {sequential * 1000:9.1f} ms")
+    print(f"ReserveRefresher:            {result.elapsed * 1000:9.1f} ms  ({sequential / result.elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Relayer throughput benchmark.
+
+Spins up two local Anvil chains (same ports and chain ids as ./scripts/chains.sh), deploys the
+contracts with ./scripts/deploy.py, starts the `bridge` relayer and fires bursts of `deposit`
+calls from many funded accounts on the source chain. Every successful release on the destination
+chain (its `Release` event, reverted release calls emit none) is matched back to a deposit so we can report relay throughput, end to end release latency
+and missed or duplicated releases.
+
+from root dir:
+`python3 -m scripts.bench_relayer --accounts 20 --bursts 10 --burst-size 20`
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from typing import NamedTuple, Optional
+
+from eth_account import Account
+from web3 import Web3
+
+from events import LogIngestor
+from scripts.deploy import SRC_CHAIN_RPC, DEST_CHAIN_RPC, ACCOUNT, main as deploy_contracts
+
+# deterministic addresses given a fresh chain and ./scripts/deploy.py, see Readme
+TOKEN_ADDRESS = "0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512"
+BRIDGE_ADDRESS = "0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9"
+
+CHAINS = [(1447, 8545), (1559, 8546)]
+
+
+class DepositSent(NamedTuple):
+    account: str
+    amount: int
+    sent_at: float
+
+
+class ReleaseSeen(NamedTuple):
+    to: str
+    amount: int
+    block_number: int
+    seen_at: float
+
+
+class RelayReport(NamedTuple):
+    deposits: int
+    releases: int
+    matched: int
+    missed: int
+    duplicated: int
+    throughput: float
+    latencies: list[float]
+
+
+def _get_abi(contract_name: str):
+    with open(f'./contracts/out/{contract_name}.sol/{contract_name}.json') as f:
+        return json.load(f)['abi']
+
+
+def _wait_for_rpc(rpc_url: str, timeout: float = 30) -> Web3:
+    web3 = Web3(Web3.HTTPProvider(rpc_url))
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            web3.eth.block_number
+            return web3
+        except Exception:
+            time.sleep(0.2)
+    raise TimeoutError(f"RPC {rpc_url} did not come up within {timeout}s")
+
+
+def start_chains(files: contextlib.ExitStack) -> list[subprocess.Popen]:
+    """
+    Log files are registered with files and closed when it exits
+    """
+    os.makedirs('./logs', exist_ok=True)
+    processes = []
+    for chain_id, port in CHAINS:
+        log = files.enter_context(open(f'./logs/chain_{chain_id}.log', 'w'))
+        processes.append(subprocess.Popen(['anvil', '--chain-id', str(chain_id), '--port', str(port)], stdout=log, stderr=subprocess.STDOUT))
+    return processes
+
+
+def start_relayer(files: contextlib.ExitStack) -> subprocess.Popen:
+    log = files.enter_context(open('./logs/relayer.log', 'w'))
+    return subprocess.Popen([sys.executable, '-m', 'bridge'], stdout=log, stderr=subprocess.STDOUT)
+
+
+def fund_accounts(web3_src: Web3, web3_dest: Web3, num_accounts: int, tokens_per_account: int) -> list:
+    """
+    Create throwaway accounts on the source chain, give them gas, tokens and an allowance on the bridge.
+    Both bridges are seeded with liquidity so releases never fail on reserve.
+    """
+    token_abi = _get_abi('Token')
+    token_src = web3_src.eth.contract(address=TOKEN_ADDRESS, abi=token_abi)
+    token_dest = web3_dest.eth.contract(address=TOKEN_ADDRESS, abi=token_abi)
+
+    token_src.functions.mint(BRIDGE_ADDRESS, tokens_per_account * num_accounts).transact({'from': ACCOUNT})
+    token_dest.functions.mint(BRIDGE_ADDRESS, tokens_per_account * num_accounts).transact({'from': ACCOUNT})
+
+    accounts = [Account.create() for _ in range(num_accounts)]
+    for account in accounts:
+        web3_src.provider.make_request('anvil_setBalance', [account.address, hex(Web3.to_wei(100, 'ether'))])
+        token_src.functions.mint(account.address, tokens_per_account).transact({'from': ACCOUNT})
+        tx = token_src.functions.approve(BRIDGE_ADDRESS, tokens_per_account).build_transaction({
+            'from': account.address,
+            'nonce': 0,
+            'gas': 2000000,
+            'gasPrice': web3_src.to_wei('50', 'gwei')
+        })
+        signed_tx = account.sign_transaction(tx)
+        web3_src.eth.wait_for_transaction_receipt(web3_src.eth.send_raw_transaction(signed_tx.rawTransaction))
+    return accounts
+
+
+def fire_deposits(web3_src: Web3, accounts: list, bursts: int, burst_size: int, interval: float, amount: int) -> list[DepositSent]:
+    """
+    Send `bursts` bursts of `burst_size` deposits round robin across `accounts` without waiting for receipts.
+    Nonces are tracked locally so a burst is submitted back to back.
+    """
+    bridge_src = web3_src.eth.contract(address=BRIDGE_ADDRESS, abi=_get_abi('Bridge'))
+    nonces = {account.address: 1 for account in accounts}  # nonce 0 was the approval
+    gas_price = web3_src.to_wei('50', 'gwei')
+    sent = []
+    for burst in range(bursts):
+        for i in range(burst_size):
+            account = accounts[(burst * burst_size + i) % len(accounts)]
+            tx = bridge_src.functions.deposit(amount).build_transaction({
+                'from': account.address,
+                'nonce': nonces[account.address],
+                'gas': 2000000,
+                'gasPrice': gas_price
+            })
+            signed_tx = account.sign_transaction(tx)
+            web3_src.eth.send_raw_transaction(signed_tx.rawTransaction)
+            nonces[account.address] += 1
+            sent.append(DepositSent(account.address, amount, time.time()))
+        time.sleep(interval)
+    return sent
+
+
+class ReleaseWatcher(threading.Thread):
+    """
+    Follows the bridge's Release events on the destination chain. Only successful releases emit
+    one, a release call that reverts is not counted.
+    """
+    def __init__(self, web3_dest: Web3, poll_interval: float = 0.05):
+        super().__init__(daemon=True)
+        self.poll_interval = poll_interval
+        self.releases: list[ReleaseSeen] = []
+        self.ingestor = LogIngestor(web3_dest)
+        bridge = web3_dest.eth.contract(address=BRIDGE_ADDRESS, abi=_get_abi('Bridge'))
+        self.ingestor.subscribe(bridge, 'Release', self._on_release)
+        self._stop_event = threading.Event()
+
+    def _on_release(self, event) -> None:
+        self.releases.append(ReleaseSeen(event['args']['to'], event['args']['amount'], event['blockNumber'], time.time()))
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.ingestor.poll()
+            time.sleep(self.poll_interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def summarize(deposits: list[DepositSent], releases: list[ReleaseSeen]) -> RelayReport:
+    """
+    Match releases to deposits first in first out per depositor. A release with no outstanding
+    deposit for its recipient counts as duplicated, a deposit never matched counts as missed.
+    """
+    pending: dict[str, deque[DepositSent]] = defaultdict(deque)
+    for deposit in deposits:
+        pending[deposit.account].append(deposit)
+
+    latencies = []
+    duplicated = 0
+    for release in releases:
+        if pending[release.to]:
+            deposit = pending[release.to].popleft()
+            latencies.append(release.seen_at - deposit.sent_at)
+        else:
+            duplicated += 1
+
+    missed = sum(len(queue) for queue in pending.values())
+    matched = len(latencies)
+    throughput = 0.0
+    if matched and deposits:
+        elapsed = max(release.seen_at for release in releases) - min(deposit.sent_at for deposit in deposits)
+        throughput = matched / elapsed if elapsed > 0 else float('infinity')
+    return RelayReport(len(deposits), len(releases), matched, missed, duplicated, throughput, latencies)
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def print_report(report: RelayReport) -> None:
+    print(f"Deposits sent: {report.deposits}")
+    print(f"Releases observed: {report.releases}")
+    print(f"Matched: {report.matched}, missed: {report.missed}, duplicated: {report.duplicated}")
+    print(f"Relay throughput: {report.throughput:.2f} releases/s")
+    if report.latencies:
+        print("End to end release latency (s): "
+              f"min {min(report.latencies):.3f}, "
+              f"p50 {_percentile(report.latencies, 50):.3f}, "
+              f"p90 {_percentile(report.latencies, 90):.3f}, "
+              f"p99 {_percentile(report.latencies, 99):.3f}, "
+              f"max {max(report.latencies):.3f}, "
+              f"mean {statistics.mean(report.latencies):.3f}")
+
+
+def main(argv: Optional[list[str]] = None) -> RelayReport:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--accounts', type=int, default=10, help="number of depositing accounts")
+    parser.add_argument('--bursts', type=int, default=5, help="number of deposit bursts")
+    parser.add_argument('--burst-size', type=int, default=10, help="deposits per burst")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between bursts")
+    parser.add_argument('--amount', type=int, default=100, help="tokens per deposit")
+    parser.add_argument('--drain-timeout', type=float, default=30.0, help="seconds to wait for outstanding releases")
+    parser.add_argument('--use-running-chains', action='store_true', help="skip starting anvil and deploying, reuse chains on 8545/8546")
+    parser.add_argument('--use-running-relayer', action='store_true', help="skip starting `python -m bridge`")
+    args = parser.parse_args(argv)
+
+    processes = []
+    files = contextlib.ExitStack()
+    try:
+        if not args.use_running_chains:
+            processes += start_chains(files)
+        web3_src = _wait_for_rpc(SRC_CHAIN_RPC)
+        web3_dest = _wait_for_rpc(DEST_CHAIN_RPC)
+        if not args.use_running_chains:
+            deploy_contracts()
+
+        deposits_per_account = -(-args.bursts * args.burst_size // args.accounts)
+        accounts = fund_accounts(web3_src, web3_dest, args.accounts, deposits_per_account * args.amount)
+
+        if not args.use_running_relayer:
+            processes.append(start_relayer(files))
+            time.sleep(2)  # relayer reads the starting nonce before we begin
+
+        watcher = ReleaseWatcher(web3_dest)
+        watcher.start()
+        deposits = fire_deposits(web3_src, accounts, args.bursts, args.burst_size, args.interval, args.amount)
+
+        deadline = time.time() + args.drain_timeout
+        while len(watcher.releases) < len(deposits) and time.time() < deadline:
+            time.sleep(0.2)
+        watcher.stop()
+        watcher.join()
+
+        report = summarize(deposits, watcher.releases)
+        print_report(report)
+        return report
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            process.wait()
+        files.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Throughput of the batched swap simulator replaying a random trade stream across many pools.
+
+from root dir:
+`python3 -m scripts.bench_simulation --pools 1000 --trades 1000000`
+"""
+import argparse
+import time
+
+import numpy as np
+
+from pathway import Token, Dex
+from simulation import SwapSimulator, TradeBatch
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pools', type=int, default=1000)
+    parser.add_argument('--trades', type=int, default=1000000)
+    parser.add_argument('--chunk-size', type=int, default=65536)
+    parser.add_argument('--exact', action='store_true', help="use the exact integer loop instead of the vectorized float path")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    pools = [Dex(f"DEX-{i}", Token(f"Chain{i}", "A", 10**12), Token(f"Chain{i}", "B", 10**12), exact=args.exact) for i in range(args.pools)]
+    amounts = rng.integers(1, 10**8, args.trades)
+    trades = TradeBatch(
+        rng.integers(0, args.pools, args.trades),
+        rng.random(args.trades) < 0.5,
+        amounts.astype(object) if args.exact else amounts.astype(np.float64),
+    )
+
+    simulator = SwapSimulator(pools, exact=args.exact)
+    start = time.perf_counter()
+    simulator.run(trades, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"{args.trades} trades over {args.pools} pools in {elapsed:.3f}s ({args.trades / elapsed:,.0f} trades/s)")
+
+
+if __name__ == "__main__":
+    main()
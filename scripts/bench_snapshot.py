@@ -0,0 +1,58 @@
+"""
+Startup cost of a quote worker: rebuilding the routing graph versus opening a mmap snapshot.
+
+from root dir:
+`python3 -m scripts.bench_snapshot --tokens 10000 --lps 40000`
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from pathway import Graph, dijkstra
+from snapshot import write_snapshot, open_snapshot
+
+
+def build_graph(tokens: int, lps: int, seed: int = 0) -> Graph:
+    rng = random.Random(seed)
+    nodes = [(f"Chain{i % 50}", f"T{i}") for i in range(tokens)]
+    graph = Graph()
+    for node in nodes:
+        graph.add_node(node)
+    for i in range(lps):
+        a, b = rng.sample(nodes, 2)
+        graph.add_edge(a, b, rng.random() * 0.01, f"LP-{i}")
+    return graph
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=10000)
+    parser.add_argument('--lps', type=int, default=40000)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    graph = build_graph(args.tokens, args.lps)
+    initial, target = ("Chain0", "T0"), ("Chain1", "T1")
+    dijkstra(graph, initial, target)
+    rebuild = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "graph.snap")
+        write_snapshot(path, graph)
+        size = os.path.getsize(path)
+
+        start = time.perf_counter()
+        with open_snapshot(path) as snapshot:
+            opened = time.perf_counter() - start
+            snapshot.graph.route(initial, target)
+            first_route = time.perf_counter() - start
+
+    print(f"rebuild graph + first dijkstra: {rebuild * 1000:9.1f} ms")
+    print(f"open snapshot ({size / 1e6:.1f} MB):   {opened * 1000:9.1f} ms")
+    print(f"open snapshot + first route:    {first_route * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
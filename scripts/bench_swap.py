@@ -0,0 +1,56 @@
+"""
+Per swap cost of the in memory CFMM simulation.
+
+Compares `LPExchange.swap_b_from_a` over the slotted `Token` record against the same pool backed
+by pydantic `TokenModel` instances, and reports the memory held by each token representation.
+
+from root dir:
+`python3 -m scripts.bench_swap --swaps 200000`
+"""
+import argparse
+import time
+import tracemalloc
+from decimal import Decimal
+
+from pathway import Token, TokenModel, LPExchange
+
+
+def time_swaps(token_cls, swaps: int) -> float:
+    """
+    Return seconds per swap, alternating direction so reserves stay balanced.
+    """
+    token_a = token_cls(chain="Ethereum", name="ETH", amount=10**12)
+    token_b = token_cls(chain="Ethereum", name="USDT", amount=10**12)
+    amm = LPExchange(token_a, token_b, fee_percent=0.0025)
+    amount = Decimal(10**6)
+    start = time.perf_counter()
+    for i in range(swaps):
+        if i & 1:
+            amm.swap_a_from_b(amount)
+        else:
+            amm.swap_b_from_a(amount)
+    return (time.perf_counter() - start) / swaps
+
+
+def bytes_per_token(token_cls, count: int = 10000) -> float:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tokens = [token_cls(chain="Ethereum", name=f"T{i}", amount=i) for i in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tokens
+    return (after - before) / count
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--swaps', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    for label, token_cls in (("pydantic TokenModel", TokenModel), ("slotted Token", Token)):
+        per_swap = time_swaps(token_cls, args.swaps)
+        print(f"{label:>20}: {per_swap * 1e6:8.3f} us/swap, {bytes_per_token(token_cls):8.1f} bytes/token")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Batched swap simulation for backtesting pool state over long trade streams.
+
+Reserves of every pool live in contiguous arrays indexed by pool position instead of on Token
+objects. Trades are consumed in chunks, within a chunk the k-th trade of every pool is applied in
+one vectorized step (trades on different pools are independent, trades on the same pool stay in
+order). With exact=True reserves are Python ints and every trade goes through cfmm.get_amount_out
+in a tight loop, matching Dex.sol bit for bit.
+"""
+import csv
+from itertools import islice
+from typing import Iterable, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from cfmm import get_amount_out, checked_add
+from pathway import LPExchange
+
+A_TO_B = "a_to_b"
+B_TO_A = "b_to_a"
+
+
+class Trade(NamedTuple):
+    pool: str
+    direction: str  # A_TO_B sells token a for token b, B_TO_A the reverse
+    amount: Union[int, float]
+
+
+class ReserveSnapshot(NamedTuple):
+    trade_index: int  # number of trades applied when the snapshot was taken
+    a_reserves: Union[np.ndarray, list[int]]
+    b_reserves: Union[np.ndarray, list[int]]
+
+
+class SimulationResult(NamedTuple):
+    outputs: Union[np.ndarray, list[int]]
+    snapshots: list[ReserveSnapshot]
+
+
+class TradeBatch(NamedTuple):
+    """
+    Columnar trades, pool is the position of the pool in the simulator
+    """
+    pool: np.ndarray
+    a_to_b: np.ndarray
+    amount: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.pool)
+
+
+class SwapSimulator:
+    """
+    Replays trades across many Dex/Bridge pools without touching the pool objects,
+    call write_back to copy the final reserves onto the pools' tokens.
+    """
+    def __init__(self, pools: Sequence[LPExchange], exact: bool = False) -> None:
+        self.pools = list(pools)
+        self.exact = exact
+        self.pool_index = {pool.name: i for i, pool in enumerate(self.pools)}
+        if len(self.pool_index) != len(self.pools):
+            raise ValueError("Pool names must be unique.")
+        reserves = [pool.get_reserves() for pool in self.pools]
+        if exact:
+            self.a_reserves = [a for a, _ in reserves]
+            self.b_reserves = [b for _, b in reserves]
+            self.fee_bps = [pool.fee_bps for pool in self.pools]
+        else:
+            self.a_reserves = np.array([a for a, _ in reserves], dtype=np.float64)
+            self.b_reserves = np.array([b for _, b in reserves], dtype=np.float64)
+            self.fee_multiplier = np.array([1 - float(pool.fee_percent) for pool in self.pools], dtype=np.float64)
+
+    def to_batch(self, trades: Iterable[Trade]) -> TradeBatch:
+        pools, a_to_b, amounts = [], [], []
+        for trade in trades:
+            pools.append(self.pool_index[trade.pool])
+            if trade.direction == A_TO_B:
+                a_to_b.append(True)
+            elif trade.direction == B_TO_A:
+                a_to_b.append(False)
+            else:
+                raise ValueError(f"Unknown trade direction '{trade.direction}'.")
+            amounts.append(trade.amount)
+        amount_dtype = object if self.exact else np.float64
+        return TradeBatch(np.array(pools, dtype=np.int64), np.array(a_to_b, dtype=bool), np.array(amounts, dtype=amount_dtype))
+
+    def run(self, trades: Union[Iterable[Trade], TradeBatch], chunk_size: int = 65536, snapshot_every: Optional[int] = None) -> SimulationResult:
+        """
+        Apply trades in order and return the output amount of every trade.
+        With snapshot_every=N a copy of all reserves is taken after every N trades and at the end,
+        chunks are cut short at each snapshot but otherwise stay chunk_size long.
+        """
+        outputs = []
+        snapshots = []
+        applied = 0
+        for batch in self._chunks(trades, chunk_size, snapshot_every):
+            if self.exact:
+                outputs.extend(self._apply_exact(batch))
+            else:
+                outputs.append(self._apply_vectorized(batch))
+            applied += len(batch)
+            if snapshot_every and applied % snapshot_every == 0:
+                snapshots.append(self.snapshot(applied))
+        if snapshot_every and (not snapshots or snapshots[-1].trade_index != applied):
+            snapshots.append(self.snapshot(applied))
+        if not self.exact:
+            outputs = np.concatenate(outputs) if outputs else np.empty(0, dtype=np.float64)
+        return SimulationResult(outputs, snapshots)
+
+    def snapshot(self, trade_index: int) -> ReserveSnapshot:
+        return ReserveSnapshot(trade_index, self.a_reserves.copy(), self.b_reserves.copy())
+
+    def write_back(self) -> None:
+        for i, pool in enumerate(self.pools):
+            pool.set_reserves(int(self.a_reserves[i]), int(self.b_reserves[i]))
+
+    def _chunks(self, trades: Union[Iterable[Trade], TradeBatch], chunk_size: int, snapshot_every: Optional[int] = None) -> Iterable[TradeBatch]:
+        def size(start: int) -> int:
+            # up to the next snapshot at most
+            return min(chunk_size, snapshot_every - start % snapshot_every) if snapshot_every else chunk_size
+
+        start = 0
+        if isinstance(trades, TradeBatch):
+            while start < len(trades):
+                end = start + size(start)
+                yield TradeBatch(*(column[start:end] for column in trades))
+                start = end
+            return
+        iterator = iter(trades)
+        while True:
+            batch = self.to_batch(islice(iterator, size(start)))
+            if not len(batch):
+                return
+            yield batch
+            start += len(batch)
+
+    def _apply_exact(self, batch: TradeBatch) -> list[int]:
+        a_reserves, b_reserves, fee_bps = self.a_reserves, self.b_reserves, self.fee_bps
+        outputs = []
+        for pool, a_to_b, amount in zip(batch.pool.tolist(), batch.a_to_b.tolist(), batch.amount.tolist()):
+            amount = int(amount)
+            a_reserve, b_reserve = a_reserves[pool], b_reserves[pool]
+            if a_to_b:
+                output = get_amount_out(amount, a_reserve, b_reserve, fee_bps[pool])
+                a_reserves[pool] = checked_add(a_reserve, amount)
+                b_reserves[pool] = b_reserve - output
+            else:
+                output = get_amount_out(amount, b_reserve, a_reserve, fee_bps[pool])
+                b_reserves[pool] = checked_add(b_reserve, amount)
+                a_reserves[pool] = a_reserve - output
+            outputs.append(output)
+        return outputs
+
+    def _apply_vectorized(self, batch: TradeBatch) -> np.ndarray:
+        n = len(batch)
+        outputs = np.empty(n, dtype=np.float64)
+        if not n:
+            return outputs
+        # rank of each trade among the trades of its own pool within this chunk
+        by_pool = np.argsort(batch.pool, kind='stable')
+        sorted_pools = batch.pool[by_pool]
+        group_start = np.flatnonzero(np.r_[True, sorted_pools[1:] != sorted_pools[:-1]])
+        group_sizes = np.diff(np.r_[group_start, n])
+        rank = np.empty(n, dtype=np.int64)
+        rank[by_pool] = np.arange(n) - np.repeat(group_start, group_sizes)
+
+        rounds = int(group_sizes.max())
+        if rounds * 8 > n:
+            # few distinct pools, numpy call overhead per round would dominate
+            self._apply_scalar(batch, outputs)
+            return outputs
+
+        by_rank = np.argsort(rank, kind='stable')
+        bounds = np.searchsorted(rank[by_rank], np.arange(rounds + 1))
+        a_reserves, b_reserves, fee_multiplier = self.a_reserves, self.b_reserves, self.fee_multiplier
+        for r in range(rounds):
+            idx = by_rank[bounds[r]:bounds[r + 1]]
+            pool = batch.pool[idx]
+            a_to_b = batch.a_to_b[idx]
+            amount = batch.amount[idx]
+            a_reserve, b_reserve = a_reserves[pool], b_reserves[pool]
+            reserve_in = np.where(a_to_b, a_reserve, b_reserve)
+            reserve_out = np.where(a_to_b, b_reserve, a_reserve)
+            amount_with_fee = amount * fee_multiplier[pool]
+            output = reserve_out * amount_with_fee / (reserve_in + amount_with_fee)
+            new_in = reserve_in + amount
+            new_out = reserve_out - output
+            a_reserves[pool] = np.where(a_to_b, new_in, new_out)
+            b_reserves[pool] = np.where(a_to_b, new_out, new_in)
+            outputs[idx] = output
+        return outputs
+
+    def _apply_scalar(self, batch: TradeBatch, outputs: np.ndarray) -> None:
+        a_reserves, b_reserves = self.a_reserves.tolist(), self.b_reserves.tolist()
+        fee_multiplier = self.fee_multiplier.tolist()
+        for i, (pool, a_to_b, amount) in enumerate(zip(batch.pool.tolist(), batch.a_to_b.tolist(), batch.amount.tolist())):
+            amount_with_fee = amount * fee_multiplier[pool]
+            if a_to_b:
+                output = b_reserves[pool] * amount_with_fee / (a_reserves[pool] + amount_with_fee)
+                a_reserves[pool] += amount
+                b_reserves[pool] -= output
+            else:
+                output = a_reserves[pool] * amount_with_fee / (b_reserves[pool] + amount_with_fee)
+                b_reserves[pool] += amount
+                a_reserves[pool] -= output
+            outputs[i] = output
+        self.a_reserves[:] = a_reserves
+        self.b_reserves[:] = b_reserves
+
+
+def read_trades_csv(path: str) -> Iterable[Trade]:
+    """
+    Stream trades from a CSV file with a `pool,direction,amount` header
+    """
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            amount = row['amount']
+            yield Trade(row['pool'], row['direction'], int(amount) if amount.isdigit() else float(amount))
+
+
+def read_trades_parquet(path: str, simulator: SwapSimulator) -> TradeBatch:
+    """
+    Load a Parquet file with pool, direction and amount columns straight into a TradeBatch, requires pyarrow
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet trade files requires pyarrow, install it with `pip install pyarrow`") from e
+    table = pq.read_table(path, columns=['pool', 'direction', 'amount'])
+    names = table.column('pool').to_pylist()
+    pools = np.array([simulator.pool_index[name] for name in names], dtype=np.int64)
+    directions = np.array(table.column('direction').to_pylist())
+    if not np.isin(directions, (A_TO_B, B_TO_A)).all():
+        raise ValueError("Unknown trade direction in Parquet file.")
+    amounts = table.column('amount').to_pylist()
+    amount_dtype = object if simulator.exact else np.float64
+    return TradeBatch(pools, directions == A_TO_B, np.array(amounts, dtype=amount_dtype))
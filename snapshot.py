@@ -0,0 +1,124 @@
+"""
+On disk snapshot of the routing graph, opened with mmap for instant worker startup
+
+Layout (little endian):
+
+    8 bytes   magic b"ASGRAPH\\0"
+    u32       format version
+    u32       header length in bytes
+    header    UTF-8 JSON: node table, LP table and metadata, source block per chain, array sections
+    padding   to a 64 byte boundary before every array
+    arrays    indptr int64, indices int32, weights float64, edge_lp int32
+
+Array sections are referenced by offset so open_snapshot maps the file read only and returns
+NumPy views straight over the mapped pages; every process opening the same file shares them
+through the page cache.
+"""
+import json
+import mmap
+import struct
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from frozen_graph import FrozenGraph
+from pathway import Graph, LPExchange, Dex, Bridge
+
+MAGIC = b"ASGRAPH\0"
+VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")
+_ARRAYS = ("indptr", "indices", "weights", "edge_lp")
+
+
+def _lp_metadata(lp: LPExchange) -> dict[str, Any]:
+    reserve_a, reserve_b = lp.get_reserves()
+    return {
+        "kind": "Dex" if isinstance(lp, Dex) else "Bridge" if isinstance(lp, Bridge) else type(lp).__name__,
+        "token_a": [lp.token_a.chain, lp.token_a.name],
+        "token_b": [lp.token_b.chain, lp.token_b.name],
+        "fee_bps": lp.fee_bps,
+        # uint256 reserves do not fit JSON numbers portably
+        "reserve_a": str(reserve_a),
+        "reserve_b": str(reserve_b),
+    }
+
+
+def write_snapshot(path: str, graph: Graph, block_numbers: Optional[dict[str, int]] = None, lps: Sequence[LPExchange] = ()) -> FrozenGraph:
+    """
+    Freeze `graph` and write it to `path`. `block_numbers` records the block each chain's reserves were
+    read at, `lps` are the pools the graph was built from and populate the LP metadata table.
+    """
+    frozen = FrozenGraph.from_graph(graph)
+    arrays = {name: np.ascontiguousarray(getattr(frozen, name)) for name in _ARRAYS}
+
+    sections = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        sections[name] = {"offset": offset, "dtype": array.dtype.str, "length": len(array)}
+        offset += array.nbytes
+
+    header = {
+        "nodes": [list(node) for node in frozen.nodes],
+        "lp_names": frozen.lp_names,
+        "lp_metadata": {lp.name: _lp_metadata(lp) for lp in lps},
+        "block_numbers": block_numbers or {},
+        "sections": sections,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    data_start = -(-(_PREAMBLE.size + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b"\0" * (data_start + sections[name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+    return frozen
+
+
+class GraphSnapshot:
+    """
+    A snapshot file mapped read only. `graph` is a FrozenGraph whose arrays are views over the mapping,
+    keep the GraphSnapshot open for as long as they are used.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a graph snapshot.")
+        if version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"Unsupported graph snapshot version {version}, expected {VERSION}.")
+        header = json.loads(self._mmap[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        data_start = -(-(_PREAMBLE.size + header_length) // ALIGNMENT) * ALIGNMENT
+
+        arrays = {
+            name: np.frombuffer(self._mmap, dtype=np.dtype(section["dtype"]), count=section["length"], offset=data_start + section["offset"])
+            for name, section in header["sections"].items()
+        }
+        self.block_numbers: dict[str, int] = header["block_numbers"]
+        self.lp_metadata: dict[str, dict[str, Any]] = header["lp_metadata"]
+        self.graph = FrozenGraph.from_arrays([tuple(node) for node in header["nodes"]], header["lp_names"], **arrays)
+
+    def close(self) -> None:
+        self.graph = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # callers still hold views over the mapping, it is unmapped once they are collected
+            pass
+
+    def __enter__(self) -> "GraphSnapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_snapshot(path: str) -> GraphSnapshot:
+    return GraphSnapshot(path)
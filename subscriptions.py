@@ -0,0 +1,162 @@
+"""
+Live best route subscriptions.
+
+Instead of calling dijkstra in a loop, register the pairs to watch and report which LPs changed:
+
+    hub = RouteSubscriptions(graph, cost_threshold=0.0001)
+    subscription = hub.subscribe(initial, target, amount=Decimal(5000), callback=print)
+    ...
+    hub.on_lps_updated(tracker.flush())
+
+or consume a subscription as a stream from asyncio code:
+
+    async for result in hub.subscribe(initial, target):
+        ...
+
+A new ShortestPathResult is pushed only when the best route changes or its cost moves more than
+cost_threshold away from the last one pushed. Each subscription remembers its frontier, the LPs
+leaving every node reachable for less than the current route cost. An LP outside the frontier can
+not become part of a better route, so updates only re-run dijkstra for subscriptions whose frontier
+contains one of the updated LPs. The current route's LPs are always in the frontier.
+"""
+import asyncio
+import heapq
+from decimal import Decimal
+from typing import Callable, Dict, Optional
+
+from pathway import Graph, ShortestPathResult, TokenNode, dijkstra
+
+RouteCallback = Callable[[ShortestPathResult], None]
+
+_CLOSED = object()
+
+
+def _frontier_lps(graph: Graph, initial: TokenNode, limit: float, weights) -> set[str]:
+    """
+    Names of LPs on edges leaving nodes closer than limit to initial
+    """
+    distances = {initial: 0.0}
+    heap = [(0.0, initial)]
+    lp_names = set()
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if distance > distances.get(node, float('inf')) or distance >= limit:
+            continue
+        for next_node in graph.edges.get(node, ()):
+            lp_names.add(graph.lp_names[(node, next_node)])
+            next_distance = distance + float(weights[(node, next_node)])
+            if next_distance < distances.get(next_node, float('inf')):
+                distances[next_node] = next_distance
+                heapq.heappush(heap, (next_distance, next_node))
+    return lp_names
+
+
+class Subscription:
+    def __init__(self, hub: "RouteSubscriptions", initial: TokenNode, target: TokenNode, amount: Optional[Decimal], callback: Optional[RouteCallback]) -> None:
+        self.hub = hub
+        self.initial = initial
+        self.target = target
+        self.amount = amount
+        self.callback = callback
+        self.result: Optional[ShortestPathResult] = None  # last result pushed
+        self.frontier: set[str] = set()
+        self.active = True
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def cancel(self) -> None:
+        self.hub._remove(self)
+        self.active = False
+        self._put(_CLOSED)
+
+    def _put(self, item) -> None:
+        if self._queue is not None:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    def _push(self, result: ShortestPathResult) -> None:
+        self.result = result
+        if self.callback is not None:
+            self.callback(result)
+        self._put(result)
+
+    def __aiter__(self) -> "Subscription":
+        if self._queue is None:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue()
+            # the stream starts with the current route
+            if self.result is not None:
+                self._queue.put_nowait(self.result)
+            if not self.active:
+                self._queue.put_nowait(_CLOSED)
+        return self
+
+    async def __anext__(self) -> ShortestPathResult:
+        item = await self._queue.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        return item
+
+
+class RouteSubscriptions:
+    def __init__(self, graph: Graph, cost_threshold: float = 0.0, router: Callable[..., ShortestPathResult] = dijkstra) -> None:
+        self.graph = graph
+        self.cost_threshold = cost_threshold
+        self.router = router
+        self.subscriptions: list[Subscription] = []
+        # lp name -> subscriptions whose frontier contains it
+        self._by_lp: Dict[str, list[Subscription]] = {}
+        self.evaluations = 0
+
+    def subscribe(self, initial: TokenNode, target: TokenNode, amount: Optional[Decimal] = None, callback: Optional[RouteCallback] = None) -> Subscription:
+        subscription = Subscription(self, initial, target, amount, callback)
+        self.subscriptions.append(subscription)
+        self._evaluate(subscription, force=True)
+        return subscription
+
+    def _remove(self, subscription: Subscription) -> None:
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+            self._unindex(subscription)
+
+    def _unindex(self, subscription: Subscription) -> None:
+        for lp_name in subscription.frontier:
+            subscribers = self._by_lp.get(lp_name)
+            if subscribers is not None:
+                subscribers.remove(subscription)
+                if not subscribers:
+                    del self._by_lp[lp_name]
+
+    def _evaluate(self, subscription: Subscription, force: bool = False) -> bool:
+        self.evaluations += 1
+        result = self.router(self.graph, subscription.initial, subscription.target, amount=subscription.amount)
+        weights = self.graph.weights if subscription.amount is None else self.graph.weights_for_amount(subscription.amount)
+        limit = float(result.total_cost) if result.path else float('inf')
+
+        self._unindex(subscription)
+        subscription.frontier = _frontier_lps(self.graph, subscription.initial, limit, weights)
+        subscription.frontier.update(lp_name for _, _, lp_name in result.edges_used)
+        for lp_name in subscription.frontier:
+            self._by_lp.setdefault(lp_name, []).append(subscription)
+
+        previous = subscription.result
+        changed = (force or previous is None or previous.edges_used != result.edges_used
+                   or abs(float(result.total_cost) - float(previous.total_cost)) > self.cost_threshold)
+        if changed:
+            subscription._push(result)
+        return changed
+
+    def on_lps_updated(self, lp_names) -> list[Subscription]:
+        """
+        Re-evaluate the subscriptions affected by new weights of the named LPs, returns the ones that got a new result
+        """
+        affected: Dict[int, Subscription] = {}
+        for lp_name in lp_names:
+            for subscription in self._by_lp.get(lp_name, ()):
+                affected[id(subscription)] = subscription
+        return [subscription for subscription in affected.values() if self._evaluate(subscription)]
+
+    def refresh_all(self) -> list[Subscription]:
+        """
+        Re-evaluate every subscription, needed after LPs were added to the graph
+        """
+        return [subscription for subscription in list(self.subscriptions) if self._evaluate(subscription)]
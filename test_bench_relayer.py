@@ -0,0 +1,28 @@
+import unittest
+from scripts.bench_relayer import DepositSent, ReleaseSeen, summarize
+
+ALICE, BOB, CAROL = "0xA11ce", "0xB0b", "0xCa401"
+
+class TestSummarize(unittest.TestCase):
+    def test_matched_missed_and_duplicated(self):
+        deposits = [DepositSent(ALICE, 100, 0.0), DepositSent(ALICE, 100, 1.0), DepositSent(BOB, 100, 2.0), DepositSent(CAROL, 100, 3.0)]
+        releases = [
+            ReleaseSeen(ALICE, 99, 1, 0.5),
+            ReleaseSeen(BOB, 99, 2, 2.5),
+            ReleaseSeen(BOB, 99, 3, 3.0),  # a second release for BOB's only deposit
+            ReleaseSeen(ALICE, 99, 4, 4.0),
+        ]
+        report = summarize(deposits, releases)
+
+        self.assertEqual((report.deposits, report.releases), (4, 4))
+        self.assertEqual((report.matched, report.missed, report.duplicated), (3, 1, 1))
+        # first in first out per depositor
+        self.assertEqual(report.latencies, [0.5, 0.5, 3.0])
+        self.assertAlmostEqual(report.throughput, 3 / 4.0)
+
+    def test_nothing_released(self):
+        report = summarize([DepositSent(ALICE, 100, 0.0)], [])
+        self.assertEqual((report.matched, report.missed, report.duplicated, report.throughput), (0, 1, 0, 0.0))
+
+if __name__ == '__main__':
+    unittest.main()
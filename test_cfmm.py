@@ -0,0 +1,61 @@
+import unittest
+import random
+from decimal import Decimal
+from cfmm import get_amount_out, fee_percent_to_bps, Uint256Error, UINT256_MAX
+from pathway import Token, LPExchange, Dex
+
+E = 10**18
+
+class TestExactAmountOut(unittest.TestCase):
+    def test_matches_dex_contract_vectors(self):
+        # vectors are pinned in contracts/test/Dex.t.sol
+        self.assertEqual(get_amount_out(100 * E, 500 * E, 500 * E, 25), 83159649854105877448)
+        self.assertEqual(get_amount_out(1000, 10000, 10000, 25), 906)
+        self.assertEqual(get_amount_out(7, 10, 500, 25), 187)
+
+    def test_randomized_against_solidity_formula(self):
+        rng = random.Random(1447)
+        for _ in range(2000):
+            amount_in = rng.randint(0, 10**30)
+            reserve_in = rng.randint(1, 10**30)
+            reserve_out = rng.randint(0, 10**30)
+            fee_bps = rng.randint(0, 10000)
+            # each step of Dex._getAmountOut as floor division on unbounded integers
+            amount_in_with_fee = amount_in * (10000 - fee_bps) // 10000
+            expected = amount_in_with_fee * reserve_out // (reserve_in + amount_in_with_fee)
+            self.assertEqual(get_amount_out(amount_in, reserve_in, reserve_out, fee_bps), expected)
+
+    def test_overflow_reverts(self):
+        with self.assertRaises(Uint256Error):
+            get_amount_out(UINT256_MAX, 1, 1, 25)
+        with self.assertRaises(Uint256Error):
+            get_amount_out(2**200, 2**200, 2**100, 0)
+        with self.assertRaises(Uint256Error):
+            get_amount_out(1, 1, 1, 10001)
+        with self.assertRaises(Uint256Error):
+            get_amount_out(0, 0, 1, 25)
+
+    def test_fee_percent_to_bps(self):
+        self.assertEqual(fee_percent_to_bps(0.0025), 25)
+        self.assertEqual(fee_percent_to_bps(Decimal("0.01")), 100)
+        self.assertEqual(fee_percent_to_bps(0), 0)
+
+class TestExactLPExchange(unittest.TestCase):
+    def test_exact_swap_updates_integer_reserves(self):
+        amm = LPExchange(Token("Ethereum", "ETH", 10000), Token("Ethereum", "USDT", 10000), fee_percent=0.0025, exact=True)
+        b_output = amm.swap_b_from_a(1000)
+        self.assertEqual(b_output, 906)
+        self.assertEqual(amm.get_reserves(), (11000, 10000 - 906))
+
+        a_output = amm.swap_a_from_b(906)
+        self.assertEqual(a_output, get_amount_out(906, 10000 - 906, 11000, 25))
+        self.assertEqual(amm.get_reserves(), (11000 - a_output, 10000))
+
+    def test_exact_quote_close_to_decimal(self):
+        exact = Dex("DEX", Token("Chain1", "TokenA", 10**9), Token("Chain1", "TokenB", 10**9), exact=True)
+        approx = Dex("DEX", Token("Chain1", "TokenA", 10**9), Token("Chain1", "TokenB", 10**9))
+        for amount in (1, 10**3, 10**6, 10**8):
+            self.assertLessEqual(abs(Decimal(exact.get_b_from_a(amount)) - approx.get_b_from_a(amount)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
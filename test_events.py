@@ -0,0 +1,248 @@
+import unittest
+from decimal import Decimal
+from types import SimpleNamespace
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+from pathway import Token, Dex, Bridge, Graph, add_edges_for_lp
+from events import LogIngestor, ReserveTracker
+
+DEX_ADDRESS = "0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0"
+BRIDGE_ADDRESS = "0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9"
+TOKEN_A = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+ALICE = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+
+# event fragments of contracts/src/Dex.sol and contracts/src/Bridge.sol
+DEX_ABI = [{"type": "event", "name": "Swap", "anonymous": False, "inputs": [
+    {"name": "nonce", "type": "uint256", "indexed": True},
+    {"name": "sender", "type": "address", "indexed": True},
+    {"name": "tokenIn", "type": "address", "indexed": True},
+    {"name": "amountIn", "type": "uint256", "indexed": False},
+    {"name": "amountOut", "type": "uint256", "indexed": False},
+    {"name": "reserveA", "type": "uint256", "indexed": False},
+    {"name": "reserveB", "type": "uint256", "indexed": False},
+]}]
+BRIDGE_ABI = [{"type": "event", "name": name, "anonymous": False, "inputs": [
+    {"name": "nonce", "type": "uint256", "indexed": True},
+    {"name": account, "type": "address", "indexed": True},
+    {"name": "amount", "type": "uint256", "indexed": False},
+    {"name": "reserve", "type": "uint256", "indexed": False},
+]} for name, account in (("Deposit", "depositor"), ("Release", "to"))]
+
+def make_log(address, signature, indexed, data, block_number, log_index):
+    topics = [Web3.keccak(text=signature)] + [HexBytes(encode([kind], [value])) for kind, value in indexed]
+    return {
+        'address': address, 'topics': topics, 'data': HexBytes(encode([kind for kind, _ in data], [value for _, value in data])),
+        'blockNumber': block_number, 'logIndex': log_index, 'transactionIndex': 0,
+        'transactionHash': HexBytes(bytes(32)), 'blockHash': HexBytes(bytes(32)), 'removed': False,
+    }
+
+def swap_log(block_number, nonce, reserve_a, reserve_b, log_index=0):
+    return make_log(DEX_ADDRESS, "Swap(uint256,address,address,uint256,uint256,uint256,uint256)",
+                    [("uint256", nonce), ("address", ALICE), ("address", TOKEN_A)],
+                    [("uint256", 10), ("uint256", 9), ("uint256", reserve_a), ("uint256", reserve_b)], block_number, log_index)
+
+def deposit_log(block_number, nonce, amount, reserve, log_index=0):
+    return make_log(BRIDGE_ADDRESS, "Deposit(uint256,address,uint256,uint256)",
+                    [("uint256", nonce), ("address", ALICE)], [("uint256", amount), ("uint256", reserve)], block_number, log_index)
+
+class FakeEth:
+    """
+    Minimal node: eth_getLogs rejects ranges wider than max_range, filters can be disabled,
+    the next transient_failures eth_getLogs calls fail like a dropped connection
+    """
+    def __init__(self, max_range=None, get_logs_supported=True):
+        self.transient_failures = 0
+        self.logs = []
+        self.block_number = 0
+        self.max_range = max_range
+        self.get_logs_supported = get_logs_supported
+        self.get_logs_calls = []
+        self.filters = {}
+
+    def _matching(self, params, from_block, to_block):
+        addresses = {address.lower() for address in params['address']}
+        topics = {HexBytes(topic) for topic in params['topics'][0]}
+        return [log for log in self.logs if from_block <= log['blockNumber'] <= to_block
+                and log['address'].lower() in addresses and HexBytes(log['topics'][0]) in topics]
+
+    def get_logs(self, params):
+        self.get_logs_calls.append((params['fromBlock'], params['toBlock']))
+        if self.transient_failures:
+            self.transient_failures -= 1
+            raise ConnectionError("connection reset by peer")
+        if not self.get_logs_supported:
+            raise ValueError({'code': -32601, 'message': "the method eth_getLogs does not exist"})
+        if self.max_range and params['toBlock'] - params['fromBlock'] + 1 > self.max_range:
+            raise ValueError("block range too large")
+        return self._matching(params, params['fromBlock'], params['toBlock'])
+
+    def filter(self, params):
+        filter_id = len(self.filters)
+        self.filters[filter_id] = [params, self.block_number]
+        return SimpleNamespace(filter_id=filter_id)
+
+    def get_filter_logs(self, filter_id):
+        params, _ = self.filters[filter_id]
+        return self._matching(params, params['fromBlock'], self.block_number)
+
+    def get_filter_changes(self, filter_id):
+        params, seen = self.filters[filter_id]
+        self.filters[filter_id][1] = self.block_number
+        return self._matching(params, seen + 1, self.block_number)
+
+class TestLogIngestor(unittest.TestCase):
+    def setUp(self):
+        self.eth = FakeEth()
+        self.web3 = SimpleNamespace(eth=self.eth)
+        self.dex_contract = Web3().eth.contract(address=DEX_ADDRESS, abi=DEX_ABI)
+        self.bridge_contract = Web3().eth.contract(address=BRIDGE_ADDRESS, abi=BRIDGE_ABI)
+
+    def test_batched_ranges_dispatch_in_order(self):
+        ingestor = LogIngestor(self.web3, start_block=1, batch_size=10)
+        seen = []
+        ingestor.subscribe(self.bridge_contract, 'Deposit', lambda event: seen.append(event['args']['nonce']))
+        self.eth.logs = [deposit_log(block, block, 100, 1000 + block) for block in range(1, 26)]
+        self.eth.block_number = 25
+
+        self.assertEqual(ingestor.poll(), 25)
+        self.assertEqual(seen, list(range(1, 26)))
+        self.assertEqual(self.eth.get_logs_calls, [(1, 10), (11, 20), (21, 25)])
+        # nothing new, no work
+        self.assertEqual(ingestor.poll(), 0)
+
+    def test_range_halves_when_rejected(self):
+        self.eth.max_range = 3
+        ingestor = LogIngestor(self.web3, start_block=1, batch_size=16)
+        seen = []
+        ingestor.subscribe(self.bridge_contract, 'Deposit', lambda event: seen.append(event['args']['nonce']))
+        self.eth.logs = [deposit_log(block, block, 100, 1000) for block in range(1, 11)]
+        self.eth.block_number = 10
+
+        ingestor.poll()
+        self.assertEqual(seen, list(range(1, 11)))
+        self.assertLessEqual(ingestor.batch_size, 3)
+
+    def test_transient_errors_retried(self):
+        ingestor = LogIngestor(self.web3, start_block=1, batch_size=10, backoff=0)
+        seen = []
+        ingestor.subscribe(self.bridge_contract, 'Deposit', lambda event: seen.append(event['args']['nonce']))
+        self.eth.logs = [deposit_log(1, 1, 100, 1000)]
+        self.eth.block_number = 1
+        self.eth.transient_failures = 2
+
+        # a one block range that fails twice is retried, not halved nor moved to a filter
+        self.assertEqual(ingestor.poll(), 1)
+        self.assertEqual(self.eth.get_logs_calls, [(1, 1)] * 3)
+        self.assertEqual(ingestor.batch_size, 10)
+        self.assertIsNone(ingestor.log_filter)
+
+        self.eth.logs.append(deposit_log(5, 2, 100, 1100))
+        self.eth.block_number = 5
+        self.eth.transient_failures = 1
+        self.assertEqual(ingestor.poll(), 1)
+        self.assertEqual(ingestor.batch_size, 10)
+        self.assertEqual(seen, [1, 2])
+
+    def test_outage_does_not_switch_to_filter(self):
+        ingestor = LogIngestor(self.web3, start_block=1, batch_size=10, retries=1, backoff=0)
+        seen = []
+        ingestor.subscribe(self.bridge_contract, 'Deposit', lambda event: seen.append(event['args']['nonce']))
+        self.eth.logs = [deposit_log(1, 1, 100, 1000)]
+        self.eth.block_number = 1
+        self.eth.transient_failures = 5
+        with self.assertRaises(ConnectionError):
+            ingestor.poll()
+        self.assertIsNone(ingestor.log_filter)
+        self.assertEqual(self.eth.filters, {})
+
+        # the node is back, batching goes on from the same block
+        self.eth.transient_failures = 0
+        self.assertEqual(ingestor.poll(), 1)
+        self.assertEqual(seen, [1])
+        self.assertEqual(ingestor.batch_size, 10)
+
+    def test_filter_fallback_honours_confirmations(self):
+        self.eth.get_logs_supported = False
+        ingestor = LogIngestor(self.web3, start_block=1, confirmations=2)
+        seen = []
+        ingestor.subscribe(self.bridge_contract, 'Deposit', lambda event: seen.append(event['args']['nonce']))
+        self.eth.logs = [deposit_log(block, block, 100, 1000) for block in range(1, 6)]
+        self.eth.block_number = 5
+        self.assertEqual(ingestor.poll(), 3)
+        self.assertEqual(seen, [1, 2, 3])
+
+        # held back logs go out once deep enough, without the filter returning them again
+        self.eth.block_number = 6
+        self.assertEqual(ingestor.poll(), 1)
+        self.eth.logs.append(deposit_log(7, 7, 100, 1000))
+        self.eth.block_number = 9
+        self.assertEqual(ingestor.poll(), 2)
+        self.assertEqual(seen, [1, 2, 3, 4, 5, 7])
+
+    def test_confirmations(self):
+        ingestor = LogIngestor(self.web3, start_block=1, confirmations=2)
+        seen = []
+        ingestor.subscribe(self.bridge_contract, 'Deposit', lambda event: seen.append(event['args']['nonce']))
+        self.eth.logs = [deposit_log(block, block, 100, 1000) for block in range(1, 6)]
+        self.eth.block_number = 5
+        ingestor.poll()
+        self.assertEqual(seen, [1, 2, 3])
+
+    def test_filter_fallback(self):
+        self.eth.get_logs_supported = False
+        ingestor = LogIngestor(self.web3, start_block=1, backoff=0)
+        seen = []
+        ingestor.subscribe(self.bridge_contract, 'Deposit', lambda event: seen.append(event['args']['nonce']))
+        self.eth.logs = [deposit_log(1, 1, 100, 1000), deposit_log(2, 2, 100, 1100)]
+        self.eth.block_number = 2
+        self.assertEqual(ingestor.poll(), 2)
+
+        self.eth.logs.append(deposit_log(3, 3, 100, 1200))
+        self.eth.block_number = 3
+        self.assertEqual(ingestor.poll(), 1)
+
+        # node dropped the filter, reinstalling must not replay logs already handled
+        self.eth.filters.clear()
+        self.eth.logs.append(deposit_log(4, 4, 100, 1300))
+        self.eth.block_number = 4
+        self.assertEqual(ingestor.poll(), 1)
+        self.assertEqual(seen, [1, 2, 3, 4])
+
+class TestReserveTracker(unittest.TestCase):
+    def test_swap_and_bridge_events_update_only_touched_lps(self):
+        eth = FakeEth()
+        ingestor = LogIngestor(SimpleNamespace(eth=eth), start_block=1)
+        dex = Dex("DEX-A", Token("SourceChain", "sUSDC-A", 10000), Token("SourceChain", "sUSDC-B", 10000))
+        bridge = Bridge("Bridge-B", Token("SourceChain", "sUSDC-B", 10000), Token("DestinationChain", "dUSDC-B", 10000))
+        graph = Graph()
+        add_edges_for_lp(graph, dex, Decimal(1000))
+        add_edges_for_lp(graph, bridge, Decimal(1000))
+        bridge_weight = graph.weights[(("SourceChain", "sUSDC-B"), ("DestinationChain", "dUSDC-B"))]
+
+        tracker = ReserveTracker(graph, Decimal(1000))
+        tracker.track_dex(ingestor, dex, Web3().eth.contract(address=DEX_ADDRESS, abi=DEX_ABI))
+        tracker.track_bridge(ingestor, bridge, Web3().eth.contract(address=BRIDGE_ADDRESS, abi=BRIDGE_ABI), 'a')
+
+        eth.logs = [swap_log(1, 0, 10010, 2000)]
+        eth.block_number = 1
+        ingestor.poll()
+        self.assertEqual(dex.get_reserves(), (10010, 2000))
+        self.assertEqual(tracker.flush(), ["DEX-A"])
+
+        expected = Graph()
+        add_edges_for_lp(expected, dex, Decimal(1000))
+        key = (("SourceChain", "sUSDC-A"), ("SourceChain", "sUSDC-B"))
+        self.assertEqual(graph.weights[key], expected.weights[key])
+        self.assertEqual(graph.weights[(("SourceChain", "sUSDC-B"), ("DestinationChain", "dUSDC-B"))], bridge_weight)
+        self.assertEqual(len(graph.edges[("SourceChain", "sUSDC-A")]), len(expected.edges[("SourceChain", "sUSDC-A")]))
+
+        eth.logs.append(deposit_log(2, 0, 500, 10500))
+        eth.block_number = 2
+        ingestor.poll()
+        self.assertEqual(bridge.get_reserves(), (10500, 10000))
+        self.assertEqual(tracker.flush(), ["Bridge-B"])
+        self.assertEqual(tracker.flush(), [])
+
+if __name__ == '__main__':
+    unittest.main()
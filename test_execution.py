@@ -0,0 +1,233 @@
+import unittest
+from decimal import Decimal
+from types import SimpleNamespace
+from pathway import Token, Dex, Bridge, ShortestPathResult
+from execution import ChainSigner, TradeExecutor, ExecutionError, SendError, StaleTransaction
+
+ACCOUNT = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+
+class FakeCall:
+    def __init__(self, apply):
+        self.apply = apply
+
+    def build_transaction(self, params):
+        return {**params, 'call': self.apply}
+
+class FakeEth:
+    """
+    Mines every transaction on arrival, rejects nonces out of order like a node would
+    """
+    def __init__(self):
+        self.nonce = 0
+        self.receipts = {}
+        self.sent = []
+        self.balances = {}
+        self.allowances = {}
+        self.account = SimpleNamespace(sign_transaction=lambda tx, private_key: SimpleNamespace(rawTransaction=tx))
+
+    def get_transaction_count(self, account, block_identifier='latest'):
+        return self.nonce
+
+    def send_raw_transaction(self, tx):
+        if tx['nonce'] != self.nonce:
+            raise ValueError("nonce too low" if tx['nonce'] < self.nonce else "nonce gap")
+        self.nonce += 1
+        tx_hash = bytes([len(self.sent)]) * 32
+        self.sent.append(tx)
+        output = tx['call']()
+        self.receipts[tx_hash] = {'status': 0 if output is None else 1, 'amountOut': output}
+        return tx_hash
+
+    def wait_for_transaction_receipt(self, tx_hash, timeout=120):
+        return self.receipts[tx_hash]
+
+class FakeToken:
+    def __init__(self, eth, name):
+        self.eth = eth
+        self.name = name
+
+    @property
+    def functions(self):
+        def approve(spender, amount):
+            def apply():
+                self.eth.allowances[(self.name, spender)] = amount
+                return 0
+            return FakeCall(apply)
+        return SimpleNamespace(approve=approve)
+
+class FakeDexContract:
+    def __init__(self, eth, lp, address):
+        self.eth = eth
+        self.lp = lp
+        self.address = address
+
+    def _swap(self, token_in, token_out, amount, a_to_b):
+        def apply():
+            if self.eth.balances.get(token_in, 0) < amount or self.eth.allowances.get((token_in, self.address), 0) < amount:
+                return None
+            output = self.lp.swap_b_from_a(amount) if a_to_b else self.lp.swap_a_from_b(amount)
+            self.eth.balances[token_in] -= amount
+            self.eth.balances[token_out] = self.eth.balances.get(token_out, 0) + output
+            return output
+        return FakeCall(apply)
+
+    @property
+    def functions(self):
+        a, b = self.lp.token_a.name, self.lp.token_b.name
+        return SimpleNamespace(
+            tokenA=lambda: SimpleNamespace(call=lambda: a),
+            tokenB=lambda: SimpleNamespace(call=lambda: b),
+            swapAForB=lambda amount: self._swap(a, b, amount, True),
+            swapBForA=lambda amount: self._swap(b, a, amount, False),
+        )
+
+    @property
+    def events(self):
+        def process_receipt(receipt):
+            return [{'args': {'amountOut': receipt['amountOut']}}]
+        return SimpleNamespace(Swap=lambda: SimpleNamespace(process_receipt=process_receipt))
+
+class FakeDex(Dex):
+    def __init__(self, name, token_a, token_b, eth, fee_percent=0.0025):
+        super().__init__(name, token_a, token_b, fee_percent=fee_percent, exact=True)
+        self.dex_contract = FakeDexContract(eth, self, f"0x{name}")
+
+class FakeBridge(Bridge):
+    def __init__(self, name, token_a, token_b):
+        super().__init__(name, token_a, token_b, exact=True)
+        self.bridge_contract_src, self.bridge_contract_dst = object(), object()
+
+def fake_web3(eth):
+    return SimpleNamespace(eth=SimpleNamespace(
+        get_transaction_count=eth.get_transaction_count,
+        send_raw_transaction=eth.send_raw_transaction,
+        wait_for_transaction_receipt=eth.wait_for_transaction_receipt,
+        account=eth.account,
+        contract=lambda address, abi: FakeToken(eth, address),
+    ))
+
+class TestTradeExecutor(unittest.TestCase):
+    def setUp(self):
+        self.eth = FakeEth()
+        self.eth.nonce = 7
+        self.dex_ab = FakeDex("DEX-AB", Token("Chain0", "A", 100000), Token("Chain0", "B", 100000), self.eth)
+        self.dex_bc = FakeDex("DEX-BC", Token("Chain0", "C", 100000), Token("Chain0", "B", 100000), self.eth)
+        self.signer = ChainSigner(fake_web3(self.eth), ACCOUNT, "0x00", gas_price=1)
+        self.executor = TradeExecutor({"DEX-AB": self.dex_ab, "DEX-BC": self.dex_bc}, {"Chain0": self.signer})
+        self.executor._token_abi = []
+        self.route = ShortestPathResult(
+            [("Chain0", "A"), ("Chain0", "B"), ("Chain0", "C")],
+            [(("Chain0", "A"), ("Chain0", "B"), "DEX-AB"), (("Chain0", "B"), ("Chain0", "C"), "DEX-BC")],
+            0.0,
+        )
+
+    def test_plan_directions(self):
+        legs = self.executor.plan(self.route)
+        self.assertEqual([leg.a_to_b for leg in legs], [True, False])
+        self.assertEqual(self.executor._next_batch(legs, 0), legs)
+        with self.assertRaises(ExecutionError):
+            self.executor.plan(ShortestPathResult([], [(("Chain0", "A"), ("Chain0", "B"), "Unknown")], 0.0))
+
+    def test_unreachable_route(self):
+        with self.assertRaises(ExecutionError):
+            self.executor.execute(ShortestPathResult([], [], float('infinity')), 1000)
+        self.assertEqual(self.eth.sent, [])
+
+    def test_same_chain_legs_sent_back_to_back(self):
+        self.eth.balances["A"] = 1000
+        expected_b = self.dex_ab.get_b_from_a(1000)
+        report = self.executor.execute(self.route, 1000)
+
+        # two approvals and two swaps on consecutive local nonces, starting from the node's count
+        self.assertEqual([tx['nonce'] for tx in self.eth.sent], [7, 8, 9, 10])
+        self.assertEqual(report.fills[0].realized_out, expected_b)
+        self.assertEqual(report.fills[1].amount_in, int(expected_b * Decimal("0.995")))
+        self.assertEqual(report.amount_out, self.eth.balances["C"])
+        self.assertEqual(self.eth.balances["B"], expected_b - report.fills[1].amount_in)
+        self.assertEqual(report.requotes, 0)
+
+    def test_requote_after_shortfall(self):
+        self.eth.balances["A"] = 1000
+        # someone trades against DEX-AB between quoting and mining, the second leg runs out of balance
+        quote = self.executor.quote
+        def quote_then_front_run(leg, amount):
+            output = quote(leg, amount)
+            if leg.lp is self.dex_ab:
+                self.dex_ab.swap_b_from_a(50000)
+            return output
+        self.executor.quote = quote_then_front_run
+
+        report = self.executor.execute(self.route, 1000)
+        self.assertEqual(report.requotes, 1)
+        self.assertEqual([fill.lp_name for fill in report.fills], ["DEX-AB", "DEX-BC"])
+        self.assertLess(report.fills[0].realized_out, report.fills[0].quoted_out)
+        self.assertEqual(report.fills[1].amount_in, report.fills[0].realized_out)
+        self.assertEqual(self.eth.balances["B"], 0)
+
+    def test_nonce_resynced_after_send_failure(self):
+        self.eth.balances["A"] = 1000
+        self.signer.nonce = 3  # stale local count
+        with self.assertRaises(SendError) as raised:
+            self.executor.execute(self.route, 1000)
+        self.assertIsInstance(raised.exception.__cause__, ValueError)
+        self.assertIsNone(self.signer.nonce)
+        self.executor.execute(self.route, 1000)
+        self.assertEqual(self.eth.sent[0]['nonce'], 7)
+
+    def bridge_executor(self, destination_account):
+        bridge = FakeBridge("Bridge-X", Token("Chain0", "B", 100000), Token("Chain1", "B", 100000))
+        signers = {"Chain0": self.signer, "Chain1": ChainSigner(fake_web3(FakeEth()), destination_account, "0x00", gas_price=1)}
+        executor = TradeExecutor({"Bridge-X": bridge}, signers, release_timeout=1, poll_interval=0)
+        route = ShortestPathResult([("Chain0", "B"), ("Chain1", "B")], [(("Chain0", "B"), ("Chain1", "B"), "Bridge-X")], 0.0)
+        return executor, route
+
+    def test_bridge_legs_need_one_account(self):
+        executor, route = self.bridge_executor("0x70997970C51812dc3A010C7d01b50e0d17dc79C8")
+        with self.assertRaises(ExecutionError):
+            executor.plan(route)
+        executor, route = self.bridge_executor(ACCOUNT.lower())
+        self.assertTrue(executor.plan(route)[0].is_bridge)
+
+    def test_release_matched_by_recipient_and_amount(self):
+        executor, route = self.bridge_executor(ACCOUNT)
+        leg = executor.plan(route)[0]
+        other = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+
+        class FakeIngestor:
+            def __init__(self, batches):
+                self.batches = batches
+
+            def subscribe(self, contract, event_name, handler):
+                self.handler = handler
+
+            def poll(self):
+                for to, amount in self.batches.pop(0):
+                    self.handler({'args': {'to': to, 'amount': amount}})
+
+        # someone else's release, then an earlier deposit of ours still in flight, then this one
+        ingestor = FakeIngestor([[(other, 990)], [(ACCOUNT, 500)], [(ACCOUNT, 985)]])
+        self.assertEqual(executor._wait_release(leg, ingestor, 990), 985)
+
+    def test_resend_is_idempotent(self):
+        known = {}
+        web3 = SimpleNamespace(eth=SimpleNamespace(get_transaction=lambda tx_hash: known[tx_hash], send_raw_transaction=self.eth.send_raw_transaction))
+        signer = ChainSigner(web3, ACCOUNT, "0x00", gas_price=1)
+        signed = SimpleNamespace(hash=b"\x01" * 32, rawTransaction={'nonce': 7, 'call': lambda: 1})
+
+        # the node has it already, nothing is sent
+        known[signed.hash] = {'nonce': 7}
+        self.assertEqual(signer.resend(signed), signed.hash)
+        self.assertEqual(self.eth.sent, [])
+
+        # unknown to the node, the same transaction goes out
+        del known[signed.hash]
+        signer.resend(signed)
+        self.assertEqual(self.eth.sent, [signed.rawTransaction])
+
+        # another transaction took the nonce, it can never be mined
+        other = SimpleNamespace(hash=b"\x02" * 32, rawTransaction={'nonce': 7, 'call': lambda: 1})
+        with self.assertRaises(StaleTransaction):
+            signer.resend(other)
+
+if __name__ == '__main__':
+    unittest.main()
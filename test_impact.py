@@ -0,0 +1,66 @@
+import unittest
+from decimal import Decimal
+from pathway import Token, Dex, Bridge, Graph, add_edges_for_lp, get_lp_weights, dijkstra
+from impact import add_impact_tables, slippage_curve
+
+class TestImpactTables(unittest.TestCase):
+    def setUp(self):
+        self.dex = Dex("DEX-A", Token("SourceChain", "sUSDC-A", 50000), Token("SourceChain", "sUSDC-B", 40000), fee_percent=0.003)
+
+    def test_curve_matches_get_lp_weights(self):
+        sizes = [10, 1000, 30000]
+        curve = slippage_curve([50000], [40000], [0.003], sizes)[0]
+        for size, slippage in zip(sizes, curve):
+            a_to_b, _ = get_lp_weights(self.dex, Decimal(size))
+            self.assertAlmostEqual(slippage, float(a_to_b), places=12)
+
+    def test_interpolated_weight_off_ladder(self):
+        graph = Graph()
+        add_edges_for_lp(graph, self.dex, Decimal(1000))
+        add_impact_tables(graph, [self.dex])
+        a, b = ("SourceChain", "sUSDC-A"), ("SourceChain", "sUSDC-B")
+        for amount in (37, 2500, 123456):
+            weights = graph.weights_for_amount(amount)
+            a_to_b, b_to_a = get_lp_weights(self.dex, Decimal(amount))
+            self.assertAlmostEqual(weights[(a, b)], float(a_to_b), delta=float(a_to_b) * 0.01 + 1e-9)
+            self.assertAlmostEqual(weights[(b, a)], float(b_to_a), delta=float(b_to_a) * 0.01 + 1e-9)
+
+    def test_amounts_outside_ladder_are_clamped(self):
+        graph = Graph()
+        add_edges_for_lp(graph, self.dex, Decimal(1000))
+        add_impact_tables(graph, [self.dex], ladder=[100, 1000])
+        key = (("SourceChain", "sUSDC-A"), ("SourceChain", "sUSDC-B"))
+        self.assertEqual(graph.weights_for_amount(1)[key], graph.impact_tables[key][0])
+        self.assertEqual(graph.weights_for_amount(10**9)[key], graph.impact_tables[key][-1])
+        with self.assertRaises(ValueError):
+            add_impact_tables(graph, [self.dex], ladder=[100, 2000])
+
+    def test_route_depends_on_amount(self):
+        # a cheap but shallow bridge against a deep route with a higher fee
+        shallow = Bridge("Bridge-Shallow", Token("SourceChain", "sUSDC", 20000), Token("DestinationChain", "dUSDC", 20000), fee_percent=0.001)
+        deep_dex = Dex("DEX-Deep", Token("SourceChain", "sUSDC", 10**7), Token("SourceChain", "sUSDT", 10**7), fee_percent=0.001)
+        deep = Bridge("Bridge-Deep", Token("SourceChain", "sUSDT", 10**7), Token("DestinationChain", "dUSDC", 10**7), fee_percent=0.004)
+        graph = Graph()
+        for lp in (shallow, deep_dex, deep):
+            add_edges_for_lp(graph, lp, Decimal(10))
+        add_impact_tables(graph, [shallow, deep_dex, deep])
+
+        source, target = ("SourceChain", "sUSDC"), ("DestinationChain", "dUSDC")
+        self.assertEqual(dijkstra(graph, source, target, amount=Decimal(10)).edges_used[-1][2], "Bridge-Shallow")
+        self.assertEqual(dijkstra(graph, source, target, amount=Decimal(100000)).path, [source, ("SourceChain", "sUSDT"), target])
+
+    def test_edges_without_table_use_fixed_weight(self):
+        graph = Graph()
+        graph.add_edge(("X", "A"), ("X", "B"), Decimal("0.01"), "LP-X")
+        add_impact_tables(graph, [])
+        self.assertEqual(graph.weights_for_amount(1000)[(("X", "A"), ("X", "B"))], 0.01)
+        self.assertEqual(dijkstra(graph, ("X", "A"), ("X", "B"), amount=1000).edges_used[0][2], "LP-X")
+
+    def test_amount_without_tables(self):
+        graph = Graph()
+        graph.add_edge(("X", "A"), ("X", "B"), 0.01, "LP-X")
+        with self.assertRaises(ValueError):
+            dijkstra(graph, ("X", "A"), ("X", "B"), amount=1000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+from scripts.bench_import import import_times
+
+# generous budget for slow CI machines, a routing core import is ~15ms and web3 alone is ~1s
+IMPORT_BUDGET_US = 300000
+
+class TestImportTime(unittest.TestCase):
+    def test_routing_core_imports_without_web3_or_pydantic(self):
+        for module in ('pathway', 'route_cache', 'subscriptions'):
+            times = import_times(module)
+            self.assertNotIn('web3', times, module)
+            self.assertNotIn('pydantic', times, module)
+            self.assertLess(times[module], IMPORT_BUDGET_US, module)
+
+    def test_relayer_imports_without_a_node(self):
+        # used to read the ABI and call token() on both chains at import
+        times = import_times('bridge')
+        self.assertNotIn('web3', times)
+        self.assertLess(times['bridge'], IMPORT_BUDGET_US)
+
+    def test_lazy_attributes(self):
+        import pathway
+        self.assertEqual(pathway.TokenModel(chain="Ethereum", name="ETH", amount="10").to_token().amount, 10)
+        self.assertEqual(pathway.RealDex.__module__, 'onchain')
+        with self.assertRaises(AttributeError):
+            pathway.Missing
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import random
+from pathway import RealToken, RealDex
+
+DEX_ADDRESS = "0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0"
+ALICE = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+
+class TestIntegrationExactCFMM(unittest.TestCase):
+    """
+    Randomized swaps on the deployed DEX-A, every quote from the exact integer engine
+    must equal the amount the contract actually pays out.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.susdc_a = RealToken("SourceChain", "sUSDC-A", "0x5FbDB2315678afecb367f032d93F642f64180aa3", "http://localhost:8545")
+        cls.susdc_b = RealToken("SourceChain", "sUSDC-B", "0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512", "http://localhost:8545")
+        cls.dex_a = RealDex("DEX-A", cls.susdc_a.to_token(DEX_ADDRESS), cls.susdc_b.to_token(DEX_ADDRESS), 0.0025, DEX_ADDRESS, "http://localhost:8545", exact=True)
+
+        # deep random liquidity so both directions can be exercised
+        cls.susdc_a.token_contract.functions.mint(DEX_ADDRESS, random.randint(10**6, 10**24)).transact({'from': ALICE})
+        cls.susdc_b.token_contract.functions.mint(DEX_ADDRESS, random.randint(10**6, 10**24)).transact({'from': ALICE})
+        cls.susdc_a.token_contract.functions.mint(ALICE, 10**30).transact({'from': ALICE})
+        cls.susdc_b.token_contract.functions.mint(ALICE, 10**30).transact({'from': ALICE})
+        cls.susdc_a.token_contract.functions.approve(DEX_ADDRESS, 2**256 - 1).transact({'from': ALICE})
+        cls.susdc_b.token_contract.functions.approve(DEX_ADDRESS, 2**256 - 1).transact({'from': ALICE})
+
+    def test_randomized_swaps_match_contract(self):
+        rng = random.Random()
+        swap_functions = self.dex_a.dex_contract.functions
+        for _ in range(50):
+            amount = rng.randint(1, 10**24)
+            if rng.random() < 0.5:
+                quote = self.dex_a.get_b_from_a(amount)
+                before = self.susdc_b.get_amount(ALICE)
+                swap_functions.swapAForB(amount).transact({'from': ALICE})
+                received = self.susdc_b.get_amount(ALICE) - before
+            else:
+                quote = self.dex_a.get_a_from_b(amount)
+                before = self.susdc_a.get_amount(ALICE)
+                swap_functions.swapBForA(amount).transact({'from': ALICE})
+                received = self.susdc_a.get_amount(ALICE) - before
+            self.assertEqual(quote, received, f"quote {quote} != received {received} for amount {amount}")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from decimal import Decimal
+from web3 import Web3
+from pathway import TokenManager, RealToken, RealDex, RealBridge, Graph, add_edges_for_lp, dijkstra
+from execution import ChainSigner, TradeExecutor
+
+SRC_CHAIN_RPC = "http://localhost:8545"
+DEST_CHAIN_RPC = "http://localhost:8546"
+DEX_ADDRESS = "0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0"
+BRIDGE_ADDRESS = "0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9"
+ACCOUNT = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+class TestIntegrationExecution(unittest.TestCase):
+    """
+    Needs both Anvil chains, ./scripts/deploy.py and the bridge listener (`python3 -m bridge`) running
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.token_manager = TokenManager()
+        for chain, name in (("SourceChain", "sUSDC-A"), ("SourceChain", "sUSDC-B"), ("DestinationChain", "dUSDC-A"), ("DestinationChain", "dUSDC-B")):
+            cls.token_manager.add_token(chain, name, 10000)
+
+        cls.susdc_a = RealToken("SourceChain", "sUSDC-A", "0x5FbDB2315678afecb367f032d93F642f64180aa3", SRC_CHAIN_RPC)
+        cls.susdc_b = RealToken("SourceChain", "sUSDC-B", "0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512", SRC_CHAIN_RPC)
+        cls.dusdc_a = RealToken("DestinationChain", "dUSDC-A", "0x5FbDB2315678afecb367f032d93F642f64180aa3", DEST_CHAIN_RPC)
+        cls.dusdc_b = RealToken("DestinationChain", "dUSDC-B", "0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512", DEST_CHAIN_RPC)
+
+        for token, pool in ((cls.susdc_a, DEX_ADDRESS), (cls.susdc_b, DEX_ADDRESS), (cls.dusdc_a, DEX_ADDRESS), (cls.dusdc_b, DEX_ADDRESS), (cls.susdc_b, BRIDGE_ADDRESS), (cls.dusdc_b, BRIDGE_ADDRESS)):
+            token.token_contract.functions.mint(pool, 10000).transact({'from': ACCOUNT})
+        cls.susdc_a.token_contract.functions.mint(ACCOUNT, 1000).transact({'from': ACCOUNT})
+
+        cls.dex_a = RealDex("DEX-A", cls.susdc_a.to_token(DEX_ADDRESS), cls.susdc_b.to_token(DEX_ADDRESS), 0.0025, DEX_ADDRESS, SRC_CHAIN_RPC, exact=True)
+        cls.dex_b = RealDex("DEX-B", cls.dusdc_a.to_token(DEX_ADDRESS), cls.dusdc_b.to_token(DEX_ADDRESS), 0.0025, DEX_ADDRESS, DEST_CHAIN_RPC, exact=True)
+        cls.bridge_b = RealBridge("Bridge-B", cls.susdc_b.to_token(BRIDGE_ADDRESS), cls.dusdc_b.to_token(BRIDGE_ADDRESS), 0, BRIDGE_ADDRESS, BRIDGE_ADDRESS, SRC_CHAIN_RPC, DEST_CHAIN_RPC)
+
+    def test_execute_shortest_path(self):
+        graph = Graph()
+        for token in self.token_manager.get_all_keys():
+            graph.add_node(token)
+        for lp in (self.dex_a, self.dex_b, self.bridge_b):
+            add_edges_for_lp(graph, lp, Decimal(1000))
+        result = dijkstra(graph, ("SourceChain", "sUSDC-A"), ("DestinationChain", "dUSDC-A"))
+
+        executor = TradeExecutor({lp.name: lp for lp in (self.dex_a, self.dex_b, self.bridge_b)}, {
+            "SourceChain": ChainSigner(Web3(Web3.HTTPProvider(SRC_CHAIN_RPC)), ACCOUNT, PRIVATE_KEY),
+            "DestinationChain": ChainSigner(Web3(Web3.HTTPProvider(DEST_CHAIN_RPC)), ACCOUNT, PRIVATE_KEY),
+        })
+        balance_before = self.dusdc_a.get_amount(ACCOUNT)
+        report = executor.execute(result, 1000)
+
+        for fill in report.fills:
+            print(f"{fill.lp_name}: in {fill.amount_in}, quoted {fill.quoted_out}, realized {fill.realized_out} ({fill.tx_hash})")
+        print(f"executed in {report.elapsed:.2f}s with {report.requotes} re-quotes")
+
+        self.assertEqual([fill.lp_name for fill in report.fills], [lp_name for _, _, lp_name in result.edges_used])
+        self.assertEqual(self.dusdc_a.get_amount(ACCOUNT) - balance_before, report.amount_out)
+        # exact DEX legs realize their quote when nothing trades in between
+        self.assertEqual(report.fills[0].realized_out, report.fills[0].quoted_out)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from pathway import Token, LPExchange
+from pathway import Token, TokenManager, LPExchange, Dex
+from pydantic import ValidationError
 from decimal import Decimal
 
 class TestLPExchange(unittest.TestCase):
@@ -35,5 +36,25 @@ class TestLPExchange(unittest.TestCase):
         print(f"A reserve after swap: {actual_a_reserve} {self.token_a.name} (amount: {actual_a_reserve})")
         print(f"B reserve after swap: {actual_b_reserve} {self.token_b.name} (amount: {actual_b_reserve})")
 
+class TestTokenRecords(unittest.TestCase):
+    def test_token_is_slotted(self):
+        token = Token(chain="Ethereum", name="ETH", amount=10)
+        self.assertFalse(hasattr(token, "__dict__"))
+        with self.assertRaises(AttributeError):
+            token.decimals = 18
+
+    def test_token_manager_validates_input(self):
+        token_manager = TokenManager()
+        token_manager.add_token("Ethereum", "ETH", "10")
+        self.assertEqual(token_manager.get_token("Ethereum", "ETH").amount, 10)
+        with self.assertRaises(ValidationError):
+            token_manager.add_token("Ethereum", "USDT", "not an amount")
+
+    def test_get_pairwise(self):
+        dex = Dex("DEX", Token("Ethereum", "ETH", 10), Token("Ethereum", "USDT", 500))
+        pairwise = dex.get_pairwise()
+        self.assertEqual(pairwise.token_a, ("Ethereum", "ETH"))
+        self.assertEqual(pairwise.token_b, ("Ethereum", "USDT"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
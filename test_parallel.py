@@ -0,0 +1,51 @@
+import unittest
+import random
+from pathway import Graph, dijkstra
+from parallel import RouteExecutor, SharedGraph
+
+def random_graph(tokens=60, lps=150, seed=5):
+    rng = random.Random(seed)
+    nodes = [(f"Chain{i % 4}", f"T{i}") for i in range(tokens)]
+    graph = Graph()
+    for node in nodes:
+        graph.add_node(node)
+    for i in range(lps):
+        a, b = rng.sample(nodes, 2)
+        graph.add_edge(a, b, rng.random() * 0.01, f"LP-{i}")
+    return graph, nodes
+
+class TestRouteExecutor(unittest.TestCase):
+    def test_route_many_matches_dijkstra(self):
+        graph, nodes = random_graph()
+        rng = random.Random(9)
+        queries = [tuple(rng.sample(nodes, 2)) for _ in range(40)]
+        queries.append((nodes[0], ("Nowhere", "T0")))
+
+        with RouteExecutor(graph, processes=2) as executor:
+            results = executor.route_many(queries)
+
+        self.assertEqual(len(results), len(queries))
+        for (initial, target), result in zip(queries, results):
+            expected = dijkstra(graph, initial, target)
+            self.assertAlmostEqual(result.total_cost, expected.total_cost, places=12)
+            if expected.path:
+                self.assertEqual(result.path[0], initial)
+                self.assertEqual(result.path[-1], target)
+        self.assertEqual(results[-1].path, [])
+
+    def test_empty_batch(self):
+        graph, _ = random_graph(tokens=4, lps=3)
+        with RouteExecutor(graph, processes=1) as executor:
+            self.assertEqual(executor.route_many([]), [])
+
+    def test_shared_graph_is_read_only(self):
+        graph, _ = random_graph(tokens=4, lps=3)
+        shared = SharedGraph(graph)
+        try:
+            with self.assertRaises(ValueError):
+                shared.graph.weights[0] = 1.0
+        finally:
+            shared.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import random
+from pathway import Graph, dijkstra
+from path_trees import ShortestPathTrees
+
+A, B, C, D, E = [("Chain0", name) for name in "ABCDE"]
+
+def random_graph(tokens=60, lps=150, seed=5):
+    rng = random.Random(seed)
+    nodes = [(f"Chain{i % 4}", f"T{i}") for i in range(tokens)]
+    graph = Graph()
+    for node in nodes:
+        graph.add_node(node)
+    for i in range(lps):
+        a, b = rng.sample(nodes, 2)
+        graph.add_edge(a, b, rng.random() * 0.01, f"LP-{i}")
+    return graph, nodes
+
+def lp_edges(graph):
+    edges = {}
+    for (from_node, to_node), lp_name in graph.lp_names.items():
+        edges[lp_name] = (from_node, to_node)
+    return edges
+
+class TestShortestPathTrees(unittest.TestCase):
+    def assertMatchesDijkstra(self, trees, graph, source, targets):
+        for target in targets:
+            expected = dijkstra(graph, source, target)
+            result = trees.route(source, target)
+            self.assertAlmostEqual(result.total_cost, expected.total_cost, places=12)
+            if result.path:
+                self.assertEqual((result.path[0], result.path[-1]), (source, target))
+                self.assertAlmostEqual(sum(graph.weights[(a, b)] for a, b, _ in result.edges_used), result.total_cost, places=12)
+
+    def test_increase_and_decrease(self):
+        graph = Graph()
+        for node in (A, B, C, D):
+            graph.add_node(node)
+        graph.add_edge(A, B, 0.001, "LP-AB")
+        graph.add_edge(B, C, 0.001, "LP-BC")
+        graph.add_edge(C, D, 0.001, "LP-CD")
+        graph.add_edge(A, C, 0.005, "LP-AC")
+        trees = ShortestPathTrees(graph)
+        trees.add_source(A)
+        self.assertEqual(trees.route(A, D).path, [A, B, C, D])
+
+        # the tree edge into B gets expensive, C and D move under the direct pool
+        graph.set_edge_weight(A, B, 0.01, "LP-AB")
+        trees.on_lps_updated(["LP-AB"])
+        self.assertEqual(trees.route(A, D).path, [A, C, D])
+        self.assertAlmostEqual(trees.distance(A, B), 0.006)
+
+        # and back
+        graph.set_edge_weight(A, B, 0.001, "LP-AB")
+        trees.on_lps_updated(["LP-AB"])
+        self.assertEqual(trees.route(A, D).path, [A, B, C, D])
+
+        # a new pool reaching a new token
+        graph.add_node(E)
+        graph.add_edge(D, E, 0.002, "LP-DE")
+        self.assertEqual(trees.route(A, E).path, [])
+        trees.on_lps_updated(["LP-DE"])
+        self.assertAlmostEqual(trees.distance(A, E), 0.005)
+
+    def test_unrelated_update_repairs_nothing(self):
+        graph = Graph()
+        for node in (A, B, C, D, E):
+            graph.add_node(node)
+        graph.add_edge(A, B, 0.001, "LP-AB")
+        graph.add_edge(B, C, 0.001, "LP-BC")
+        graph.add_edge(D, E, 0.001, "LP-DE")
+        trees = ShortestPathTrees(graph)
+        trees.add_source(A)
+        graph.set_edge_weight(D, E, 0.5, "LP-DE")
+        self.assertEqual(trees.on_lps_updated(["LP-DE"]), 0)
+        # off the tree and not cheaper either
+        graph.set_edge_weight(B, C, 0.002, "LP-BC")
+        self.assertEqual(trees.on_lps_updated(["LP-BC"]), 1)
+        self.assertEqual(trees.repaired, 1)
+
+    def test_matches_full_recompute_on_random_updates(self):
+        for seed in range(4):
+            graph, nodes = random_graph(tokens=40, lps=100, seed=seed)
+            rng = random.Random(seed)
+            edges = lp_edges(graph)
+            trees = ShortestPathTrees(graph)
+            sources = rng.sample(nodes, 3)
+            for source in sources:
+                trees.add_source(source)
+
+            for _ in range(150):
+                # batches mixing increases and decreases, sometimes on the same pool twice
+                updated = rng.sample(sorted(edges), rng.randint(1, 4))
+                for lp_name in updated:
+                    weight = graph.weights[edges[lp_name]]
+                    graph.set_edge_weight(*edges[lp_name], weight * rng.choice([0.1, 0.5, 2.0, 10.0]) if rng.random() < 0.8 else rng.random() * 0.01, lp_name)
+                trees.on_lps_updated(updated)
+                for source in sources:
+                    self.assertMatchesDijkstra(trees, graph, source, rng.sample(nodes, 10))
+
+            for source in sources:
+                self.assertMatchesDijkstra(trees, graph, source, nodes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import threading
+import time
+from decimal import Decimal
+from pathway import Token, Dex, Bridge, Graph, ReserveRead, add_edges_for_lp
+from refresh import ReserveRefresher
+
+class Endpoint:
+    """
+    Fake RPC endpoint with a fixed latency that records the peak number of reads in flight
+    """
+    def __init__(self, url, latency=0.0, failures=0):
+        self.url = url
+        self.latency = latency
+        self.failures = failures
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def call(self, value):
+        def read():
+            with self.lock:
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+            try:
+                time.sleep(self.latency)
+                with self.lock:
+                    if self.failures:
+                        self.failures -= 1
+                        raise ConnectionError(f"{self.url} unavailable")
+                return value
+            finally:
+                with self.lock:
+                    self.in_flight -= 1
+        return read
+
+class FakeRealDex(Dex):
+    def __init__(self, name, token_a, token_b, endpoint, reserves):
+        super().__init__(name, token_a, token_b)
+        self.endpoint = endpoint
+        self.reserves = reserves
+        self.live = True
+
+    def reserve_reads(self):
+        return [ReserveRead(self.token_a.chain, self.endpoint.url, 'ab', self.endpoint.call(self.reserves))]
+
+class FakeRealBridge(Bridge):
+    def __init__(self, name, token_a, token_b, endpoint_src, endpoint_dst, reserves):
+        super().__init__(name, token_a, token_b)
+        self.endpoints = endpoint_src, endpoint_dst
+        self.reserves = reserves
+        self.live = True
+
+    def reserve_reads(self):
+        return [ReserveRead(self.token_a.chain, self.endpoints[0].url, 'a', self.endpoints[0].call(self.reserves[0])),
+                ReserveRead(self.token_b.chain, self.endpoints[1].url, 'b', self.endpoints[1].call(self.reserves[1]))]
+
+class TestReserveRefresher(unittest.TestCase):
+    def test_concurrent_reads_bounded_per_endpoint(self):
+        endpoint = Endpoint("http://chain0", latency=0.05)
+        lps = [FakeRealDex(f"DEX-{i}", Token("Chain0", f"T{i}", 1), Token("Chain0", f"U{i}", 1), endpoint, (1000 + i, 2000)) for i in range(8)]
+        graph = Graph()
+        updated = []
+        refresher = ReserveRefresher(graph, Decimal(10), max_per_endpoint=4, on_update=lambda lp: updated.append(lp.name))
+        result = refresher.refresh(lps)
+
+        self.assertEqual(sorted(result.refreshed), sorted(lp.name for lp in lps))
+        self.assertEqual(sorted(updated), sorted(result.refreshed))
+        self.assertEqual(result.stale_chains, set())
+        self.assertEqual(endpoint.peak, 4)
+        # 8 reads of 50ms, 4 at a time
+        self.assertLess(result.elapsed, 0.35)
+        self.assertEqual(lps[3].get_reserves(), (1003, 2000))
+        self.assertTrue(lps[3].live)
+
+        expected = Graph()
+        add_edges_for_lp(expected, lps[3], Decimal(10))
+        key = (("Chain0", "T3"), ("Chain0", "U3"))
+        self.assertEqual(graph.weights[key], expected.weights[key])
+        self.assertIn(("Chain0", "T3"), graph.nodes)
+
+    def test_slow_chain_marked_stale(self):
+        fast, slow = Endpoint("http://chain0"), Endpoint("http://chain1", latency=1.0)
+        dex = FakeRealDex("DEX-Fast", Token("Chain0", "A", 1), Token("Chain0", "B", 1), fast, (1000, 1000))
+        bridge = FakeRealBridge("Bridge-Slow", Token("Chain0", "A", 500), Token("Chain1", "A", 500), fast, slow, (1000, 1000))
+        graph = Graph()
+        result = ReserveRefresher(graph, Decimal(10), timeout=0.2).refresh([dex, bridge])
+
+        self.assertEqual(result.refreshed, ["DEX-Fast"])
+        self.assertEqual(result.stale_chains, {"Chain1"})
+        self.assertIsInstance(result.errors["Bridge-Slow"], TimeoutError)
+        self.assertLess(result.elapsed, 0.9)
+        # a half read bridge keeps its old reserves and stays out of the graph
+        self.assertEqual(bridge.get_reserves(), (500, 500))
+        self.assertNotIn((("Chain0", "A"), ("Chain1", "A")), graph.weights)
+
+    def test_slow_endpoint_does_not_starve_others(self):
+        slow, fast = Endpoint("http://slow", latency=1.0), Endpoint("http://fast", latency=0.01)
+        # the slow chain's reads are queued first
+        lps = [FakeRealDex(f"DEX-Slow-{i}", Token("Slow", f"T{i}", 1), Token("Slow", f"U{i}", 1), slow, (1000, 1000)) for i in range(20)]
+        lps += [FakeRealDex(f"DEX-Fast-{i}", Token("Fast", f"T{i}", 1), Token("Fast", f"U{i}", 1), fast, (1000, 1000)) for i in range(5)]
+        refresher = ReserveRefresher(Graph(), Decimal(10), timeout=0.5)
+        result = refresher.refresh(lps)
+        refresher.close()
+
+        self.assertEqual(sorted(result.refreshed), [f"DEX-Fast-{i}" for i in range(5)])
+        self.assertEqual(result.stale_chains, {"Slow"})
+        self.assertLess(result.elapsed, 0.9)
+
+    def test_abandoned_reads_keep_endpoint_bounded(self):
+        hung = Endpoint("http://chain0", latency=0.3)
+        lps = [FakeRealDex(f"DEX-{i}", Token("Chain0", f"T{i}", 1), Token("Chain0", f"U{i}", 1), hung, (1000, 1000)) for i in range(4)]
+        refresher = ReserveRefresher(Graph(), Decimal(10), max_per_endpoint=2, timeout=0.05)
+        for _ in range(3):
+            self.assertEqual(refresher.refresh(lps).stale_chains, {"Chain0"})
+        # reads left running by earlier refreshes still count against the endpoint's limit
+        self.assertEqual(hung.peak, 2)
+
+        # and once they return the endpoint serves again
+        hung.latency = 0.0
+        time.sleep(0.35)
+        refresher.timeout = 1.0
+        self.assertEqual(len(refresher.refresh(lps).refreshed), 4)
+        self.assertEqual(hung.peak, 2)
+        refresher.close()
+
+    def test_retries(self):
+        flaky = Endpoint("http://chain0", failures=2)
+        dex = FakeRealDex("DEX-A", Token("Chain0", "A", 1), Token("Chain0", "B", 1), flaky, (1000, 1000))
+        result = ReserveRefresher(Graph(), Decimal(10), retries=2, backoff=0.001).refresh([dex])
+        self.assertEqual(result.refreshed, ["DEX-A"])
+
+        down = Endpoint("http://chain0", failures=10)
+        dex = FakeRealDex("DEX-A", Token("Chain0", "A", 1), Token("Chain0", "B", 1), down, (1000, 1000))
+        result = ReserveRefresher(Graph(), Decimal(10), retries=1, backoff=0.001).refresh([dex])
+        self.assertEqual(result.refreshed, [])
+        self.assertEqual(result.stale_chains, {"Chain0"})
+        self.assertIsInstance(result.errors["DEX-A"], ConnectionError)
+
+    def test_local_pools_and_updates(self):
+        dex = Dex("DEX-A", Token("Chain0", "A", 1000), Token("Chain0", "B", 1000))
+        graph = Graph()
+        refresher = ReserveRefresher(graph, Decimal(10))
+        refresher.refresh([dex])
+        edges = len(graph.edges[("Chain0", "A")])
+        dex.set_reserves(2000, 500)
+        self.assertEqual(refresher.refresh([dex]).refreshed, ["DEX-A"])
+        # later refreshes update weights in place
+        self.assertEqual(len(graph.edges[("Chain0", "A")]), edges)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from web3 import Web3
+from test_events import FakeEth, BRIDGE_ABI, ALICE, deposit_log
+from bridge import Relayer, shard_of
+from execution import SendError, StaleTransaction
+
+BRIDGE_1 = "0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9"
+BRIDGE_2 = "0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0"
+
+def make_config(pairs):
+    chains = {name: {"rpc_url": url, "account": ALICE, "private_key": "0x00"}
+              for name, url in (("Chain0", "http://rpc0"), ("Chain1", "http://rpc1"), ("Chain1-Archive", "http://rpc1"))}
+    return {"chains": chains, "pairs": pairs}
+
+def pair(name, chain_a="Chain0", chain_b="Chain1", bridge_a=BRIDGE_1, bridge_b=BRIDGE_1):
+    return {"name": name, "chain_a": chain_a, "bridge_a": bridge_a, "chain_b": chain_b, "bridge_b": bridge_b, "fee_percent": 0}
+
+class FakeWeb3Factory:
+    def __init__(self):
+        self.nodes = {}
+
+    def __call__(self, rpc_url):
+        eth = FakeEth()
+        eth.contract = Web3().eth.contract
+        self.nodes[rpc_url] = eth
+        return SimpleNamespace(eth=eth)
+
+class TestRelayer(unittest.TestCase):
+    def test_shards_partition_pairs(self):
+        pairs = [pair(f"Bridge-{i}") for i in range(20)]
+        served = []
+        for shard in range(3):
+            relayer = Relayer(make_config(pairs), shard, 3, web3_factory=FakeWeb3Factory(), abi=BRIDGE_ABI)
+            served.extend(p.name for p in relayer.pairs)
+            self.assertTrue(all(shard_of(p.name, 3) == shard for p in relayer.pairs))
+        self.assertEqual(sorted(served), sorted(p["name"] for p in pairs))
+
+    def test_connections_shared_and_logs_read_once_per_chain(self):
+        factory = FakeWeb3Factory()
+        config = make_config([pair("Bridge-1"), pair("Bridge-2", chain_b="Chain1-Archive", bridge_a=BRIDGE_2, bridge_b=BRIDGE_2)])
+        relayer = Relayer(config, web3_factory=factory, abi=BRIDGE_ABI)
+
+        # Chain1 and Chain1-Archive share an RPC url, so one connection and one nonce counter
+        self.assertEqual(sorted(factory.nodes), ["http://rpc0", "http://rpc1"])
+        self.assertIs(relayer.signers["Chain1"], relayer.signers["Chain1-Archive"])
+
+        source = factory.nodes["http://rpc0"]
+        source.logs = [deposit_log(1, 0, 100, 10100), {**deposit_log(1, 0, 50, 5050, log_index=1), 'address': BRIDGE_2}]
+        source.block_number = 1
+        relayed = []
+        with mock.patch('bridge.relay_deposit', lambda event, bridge_out, signer, fee_percent: relayed.append((event['args']['amount'], bridge_out.address))):
+            relayer.poll()
+
+        self.assertEqual(relayed, [(100, BRIDGE_1), (50, BRIDGE_2)])
+        # both pairs' deposits on Chain0 came from a single eth_getLogs
+        self.assertEqual(source.get_logs_calls, [(1, 1)])
+
+    def test_failed_release_does_not_stop_other_pairs(self):
+        factory = FakeWeb3Factory()
+        relayer = Relayer(make_config([pair("Bridge-1"), pair("Bridge-2", bridge_a=BRIDGE_2, bridge_b=BRIDGE_2)]), web3_factory=factory, abi=BRIDGE_ABI, retry_backoff=0)
+        source = factory.nodes["http://rpc0"]
+        source.logs = [deposit_log(1, 0, 100, 10100), {**deposit_log(1, 0, 50, 5050, log_index=1), 'address': BRIDGE_2}]
+        source.block_number = 1
+        relayed = []
+        failing = {BRIDGE_1}
+
+        def relay(event, bridge_out, signer, fee_percent):
+            if bridge_out.address in failing:
+                raise ValueError("insufficient reserve")
+            relayed.append(event['args']['amount'])
+
+        with mock.patch('bridge.relay_deposit', relay), self.assertLogs('bridge', 'ERROR'):
+            self.assertEqual(relayer.poll(), 2)
+        self.assertEqual(relayed, [50])
+
+        # still failing, kept for the next poll
+        with mock.patch('bridge.relay_deposit', relay), self.assertLogs('bridge', 'ERROR'):
+            self.assertEqual(relayer.poll(), 0)
+        self.assertEqual(len(relayer.retries["Chain0"]), 1)
+
+        # the failed deposit is retried on the next poll, not dropped
+        failing.clear()
+        with mock.patch('bridge.relay_deposit', relay):
+            self.assertEqual(relayer.poll(), 1)
+            self.assertEqual(relayer.poll(), 0)
+        self.assertEqual(relayed, [50, 100])
+        self.assertEqual(relayer.retries["Chain0"], [])
+
+    def failing_relayer(self, **kwargs):
+        factory = FakeWeb3Factory()
+        relayer = Relayer(make_config([pair("Bridge-1")]), web3_factory=factory, abi=BRIDGE_ABI, **kwargs)
+        source = factory.nodes["http://rpc0"]
+        source.logs = [deposit_log(1, 0, 100, 10100)]
+        source.block_number = 1
+        return relayer
+
+    def test_signed_release_resent_not_signed_again(self):
+        relayer = self.failing_relayer(retry_backoff=0)
+        signed = SimpleNamespace(hash=b"\x01" * 32, rawTransaction=b"release")
+        calls = []
+
+        def relay(event, bridge_out, signer, fee_percent):
+            calls.append(event['args']['amount'])
+            # the node took the transaction but the response timed out
+            raise SendError("read timed out", signed)
+
+        signer = relayer.signers["Chain1"]
+        with mock.patch('bridge.relay_deposit', relay), self.assertLogs('bridge', 'ERROR'):
+            relayer.poll()
+        with mock.patch('bridge.relay_deposit', relay), mock.patch.object(signer, 'resend', return_value=signed.hash) as resend:
+            self.assertEqual(relayer.poll(), 1)
+        resend.assert_called_once_with(signed)
+        self.assertEqual(calls, [100])
+        self.assertEqual(relayer.retries["Chain0"], [])
+
+    def test_stale_release_signed_again(self):
+        relayer = self.failing_relayer(retry_backoff=0)
+        signed = SimpleNamespace(hash=b"\x01" * 32, rawTransaction=b"release")
+        calls = []
+
+        def relay(event, bridge_out, signer, fee_percent):
+            calls.append(event['args']['amount'])
+            if len(calls) == 1:
+                raise SendError("connection reset", signed)
+
+        signer = relayer.signers["Chain1"]
+        with mock.patch('bridge.relay_deposit', relay), self.assertLogs('bridge', 'ERROR'):
+            relayer.poll()
+        # never reached the node and its nonce went to another release since
+        with mock.patch('bridge.relay_deposit', relay), mock.patch.object(signer, 'resend', side_effect=StaleTransaction("nonce too low")):
+            self.assertEqual(relayer.poll(), 1)
+        self.assertEqual(calls, [100, 100])
+
+    def test_retries_back_off_and_give_up(self):
+        clock = SimpleNamespace(now=0.0)
+        relayer = self.failing_relayer(retry_backoff=1.0, max_retries=2, clock=lambda: clock.now)
+        attempts = []
+
+        def relay(event, bridge_out, signer, fee_percent):
+            attempts.append(clock.now)
+            raise ValueError("insufficient reserve")
+
+        with mock.patch('bridge.relay_deposit', relay), self.assertLogs('bridge', 'ERROR') as logs:
+            for now in (0.0, 0.5, 1.0, 2.0, 3.0, 10.0):
+                clock.now = now
+                relayer.poll()
+        # retried after 1s then 2s, then dropped to the failed list
+        self.assertEqual(attempts, [0.0, 1.0, 3.0])
+        self.assertEqual(relayer.retries["Chain0"], [])
+        self.assertEqual(len(relayer.failed), 1)
+        self.assertIn("giving up", logs.output[-1])
+
+if __name__ == '__main__':
+    unittest.main()
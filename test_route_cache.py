@@ -0,0 +1,100 @@
+import unittest
+from decimal import Decimal
+from pathway import Graph, dijkstra
+from route_cache import RouteCache, amount_bucket
+
+A, B, C, D = ("Chain0", "USDC"), ("Chain0", "USDT"), ("Chain1", "USDC"), ("Chain1", "DAI")
+
+def small_graph():
+    graph = Graph()
+    for node in (A, B, C, D):
+        graph.add_node(node)
+    graph.add_edge(A, B, 0.001, "DEX-AB")
+    graph.add_edge(B, C, 0.001, "Bridge-BC")
+    graph.add_edge(A, C, 0.01, "Bridge-AC")
+    graph.add_edge(C, D, 0.002, "DEX-CD")
+    return graph
+
+class CountingRouter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, graph, initial, target, amount=None):
+        self.calls += 1
+        return dijkstra(graph, initial, target)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestRouteCache(unittest.TestCase):
+    def setUp(self):
+        self.graph = small_graph()
+        self.router = CountingRouter()
+
+    def test_hits_within_amount_bucket(self):
+        cache = RouteCache()
+        first = cache.route(self.graph, A, C, Decimal(1000), router=self.router)
+        self.assertIs(cache.route(self.graph, A, C, Decimal(600), router=self.router), first)
+        cache.route(self.graph, A, C, Decimal(100000), router=self.router)
+        cache.route(self.graph, A, C, Decimal(1000), profile="gas", router=self.router)
+        self.assertEqual(self.router.calls, 3)
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 3))
+        self.assertAlmostEqual(cache.stats.hit_rate, 0.25)
+        self.assertIsNone(amount_bucket(None))
+        self.assertEqual(amount_bucket(Decimal(1024)), 10)
+        # exact powers start their bucket even where math.log falls just short
+        self.assertEqual(amount_bucket(Decimal(1000), ratio=10), 3)
+        self.assertEqual(amount_bucket(Decimal(999), ratio=10), 2)
+        self.assertEqual([amount_bucket(10 ** k, ratio=10) for k in range(1, 16)], list(range(1, 16)))
+
+    def test_invalidate_only_dependent_routes(self):
+        cache = RouteCache()
+        cache.route(self.graph, A, C, router=self.router)  # through DEX-AB and Bridge-BC
+        cache.route(self.graph, C, D, router=self.router)
+        self.assertEqual(cache.invalidate_lps(["DEX-AB", "Unknown"]), 1)
+        self.assertIsNone(cache.get(A, C))
+        self.assertIsNotNone(cache.get(C, D))
+        self.assertEqual(cache.stats.invalidations, 1)
+        # the index is cleaned up with the entry
+        self.assertEqual(cache.invalidate_lps(["Bridge-BC"]), 0)
+
+    def test_unreachable_not_cached(self):
+        cache = RouteCache()
+        nowhere = ("Chain9", "USDC")
+        self.assertEqual(cache.route(self.graph, A, nowhere, router=self.router).path, [])
+        self.assertEqual(len(cache), 0)
+        # a pool reaching it shows up on the next lookup without any invalidation
+        self.graph.add_node(nowhere)
+        self.graph.add_edge(D, nowhere, 0.001, "Bridge-D9")
+        self.assertEqual(cache.route(self.graph, A, nowhere, router=self.router).path[-1], nowhere)
+        self.assertEqual(self.router.calls, 2)
+
+    def test_lru_eviction(self):
+        cache = RouteCache(max_entries=2)
+        cache.route(self.graph, A, C, router=self.router)
+        cache.route(self.graph, C, D, router=self.router)
+        cache.get(A, C)
+        cache.route(self.graph, A, B, router=self.router)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertIsNone(cache.get(C, D))
+        self.assertIsNotNone(cache.get(A, C))
+        self.assertEqual(cache.invalidate_lps(["DEX-CD"]), 0)
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = RouteCache(ttl=10, clock=clock)
+        cache.route(self.graph, A, C, router=self.router)
+        clock.now = 5
+        self.assertIsNotNone(cache.get(A, C))
+        clock.now = 16
+        self.assertIsNone(cache.get(A, C))
+        self.assertEqual(cache.stats.expirations, 1)
+        self.assertEqual(len(cache), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import os
+import random
+import tempfile
+from decimal import Decimal
+from pathway import Token, Dex, Bridge
+from simulation import SwapSimulator, Trade, A_TO_B, B_TO_A, read_trades_csv
+
+def make_pools(exact=False):
+    rng = random.Random(7)
+    pools = []
+    for i in range(20):
+        token_a = Token(f"Chain{i}", "USDC", rng.randint(10**6, 10**9))
+        token_b = Token(f"Chain{i}", "USDT", rng.randint(10**6, 10**9))
+        pools.append(Dex(f"DEX-{i}", token_a, token_b, fee_percent=rng.choice([0.0025, 0.003, 0.001]), exact=exact))
+    pools.append(Bridge("Bridge-0", Token("Chain0", "xUSDC", 10**8), Token("Chain1", "xUSDC", 10**8), exact=exact))
+    return pools
+
+def make_trades(pools, count, seed=11):
+    rng = random.Random(seed)
+    # skewed so some pools see many trades per chunk and others few
+    weights = [1 + 10 * (i % 3 == 0) for i in range(len(pools))]
+    names = rng.choices([pool.name for pool in pools], weights=weights, k=count)
+    return [Trade(name, rng.choice([A_TO_B, B_TO_A]), rng.randint(1, 10**5)) for name in names]
+
+def replay(pools, trades):
+    by_name = {pool.name: pool for pool in pools}
+    outputs = []
+    for trade in trades:
+        pool = by_name[trade.pool]
+        if trade.direction == A_TO_B:
+            outputs.append(pool.swap_b_from_a(trade.amount))
+        else:
+            outputs.append(pool.swap_a_from_b(trade.amount))
+    return outputs
+
+class TestSwapSimulator(unittest.TestCase):
+    def test_exact_matches_sequential_swaps(self):
+        trades = make_trades(make_pools(), 3000)
+        expected = replay(make_pools(exact=True), trades)
+        simulator = SwapSimulator(make_pools(exact=True), exact=True)
+        result = simulator.run(trades, chunk_size=500)
+        self.assertEqual(result.outputs, expected)
+
+    def test_vectorized_close_to_decimal_swaps(self):
+        trades = make_trades(make_pools(), 3000)
+        reference_pools = make_pools()
+        expected = replay(reference_pools, trades)
+        simulator = SwapSimulator(make_pools())
+        result = simulator.run(trades, chunk_size=1000)
+        for output, reference in zip(result.outputs, expected):
+            # Decimal pools truncate reserves to integers after every swap
+            self.assertAlmostEqual(output, float(reference), delta=max(1e-6 * float(reference), 2))
+        for i, pool in enumerate(reference_pools):
+            self.assertAlmostEqual(simulator.a_reserves[i], pool.token_a.amount, delta=1e-6 * pool.token_a.amount + 100)
+
+    def test_single_pool_stream_uses_scalar_path(self):
+        pools = make_pools()[:1]
+        trades = make_trades(pools, 500)
+        expected = replay(make_pools()[:1], trades)
+        result = SwapSimulator(pools).run(trades)
+        for output, reference in zip(result.outputs, expected):
+            self.assertAlmostEqual(output, float(reference), delta=max(1e-6 * float(reference), 2))
+
+    def test_snapshots_and_write_back(self):
+        pools = make_pools(exact=True)
+        trades = make_trades(pools, 250)
+        simulator = SwapSimulator(pools, exact=True)
+        result = simulator.run(trades, snapshot_every=100)
+        self.assertEqual([snapshot.trade_index for snapshot in result.snapshots], [100, 200, 250])
+        self.assertEqual(result.snapshots[-1].a_reserves, simulator.a_reserves)
+
+        expected_pools = make_pools(exact=True)
+        replay(expected_pools, trades)
+        simulator.write_back()
+        self.assertEqual([pool.get_reserves() for pool in pools], [pool.get_reserves() for pool in expected_pools])
+
+    def test_chunks_cut_at_snapshots_only(self):
+        pools = make_pools()
+        trades = make_trades(pools, 250)
+        simulator = SwapSimulator(pools)
+        sizes = [len(batch) for batch in simulator._chunks(trades, 64, snapshot_every=100)]
+        self.assertEqual(sizes, [64, 36, 64, 36, 50])
+        batch = simulator.to_batch(trades)
+        self.assertEqual([len(chunk) for chunk in simulator._chunks(batch, 1000, snapshot_every=100)], [100, 100, 50])
+
+        result = simulator.run(batch, chunk_size=64, snapshot_every=100)
+        self.assertEqual([snapshot.trade_index for snapshot in result.snapshots], [100, 200, 250])
+        self.assertEqual(len(result.outputs), 250)
+
+    def test_read_trades_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trades.csv")
+            with open(path, "w") as f:
+                f.write("pool,direction,amount\nDEX-0,a_to_b,100\nDEX-1,b_to_a,2.5\n")
+            trades = list(read_trades_csv(path))
+        self.assertEqual(trades, [Trade("DEX-0", A_TO_B, 100), Trade("DEX-1", B_TO_A, 2.5)])
+
+    def test_unknown_direction(self):
+        simulator = SwapSimulator(make_pools())
+        with self.assertRaises(ValueError):
+            simulator.run([Trade("DEX-0", "sideways", Decimal(1))])
+
+if __name__ == '__main__':
+    unittest.main()
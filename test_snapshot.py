@@ -0,0 +1,80 @@
+import unittest
+import os
+import random
+import tempfile
+from decimal import Decimal
+from pathway import TokenManager, Dex, Bridge, Graph, add_edges_for_lp, dijkstra
+from frozen_graph import FrozenGraph
+from snapshot import write_snapshot, open_snapshot
+
+def build_graph(seed=3, chains=4, tokens_per_chain=5):
+    rng = random.Random(seed)
+    token_manager = TokenManager()
+    lps = []
+    for c in range(chains):
+        for t in range(tokens_per_chain):
+            token_manager.add_token(f"Chain{c}", f"USD{t}", rng.randint(1000, 10000))
+        for t in range(tokens_per_chain - 1):
+            lps.append(Dex(f"DEX-{c}-{t}", token_manager.get_token(f"Chain{c}", f"USD{t}"), token_manager.get_token(f"Chain{c}", f"USD{t + 1}"), fee_percent=rng.uniform(0.001, 0.005)))
+    for c in range(chains - 1):
+        lps.append(Bridge(f"Bridge-{c}", token_manager.get_token(f"Chain{c}", "USD0"), token_manager.get_token(f"Chain{c + 1}", f"USD{rng.randrange(tokens_per_chain)}"), fee_percent=rng.uniform(0.001, 0.005)))
+
+    graph = Graph()
+    for token in token_manager.get_all_keys():
+        graph.add_node(token)
+    for lp in lps:
+        add_edges_for_lp(graph, lp, Decimal(500))
+    return graph, lps
+
+class TestFrozenGraph(unittest.TestCase):
+    def test_route_matches_dijkstra(self):
+        graph, _ = build_graph()
+        frozen = FrozenGraph.from_graph(graph)
+        for initial in sorted(graph.nodes):
+            for target in sorted(graph.nodes):
+                expected = dijkstra(graph, initial, target)
+                result = frozen.route(initial, target)
+                self.assertAlmostEqual(result.total_cost, float(expected.total_cost), places=12)
+                if result.path:
+                    self.assertEqual(result.path[0], initial)
+                    self.assertEqual(result.path[-1], target)
+
+    def test_round_trip_to_graph(self):
+        graph, _ = build_graph()
+        rebuilt = FrozenGraph.from_graph(graph).to_graph()
+        self.assertEqual(rebuilt.nodes, graph.nodes)
+        self.assertEqual(rebuilt.lp_names, graph.lp_names)
+        for key, weight in graph.weights.items():
+            self.assertAlmostEqual(rebuilt.weights[key], float(weight), places=15)
+
+class TestGraphSnapshot(unittest.TestCase):
+    def test_write_and_open(self):
+        graph, lps = build_graph()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.snap")
+            frozen = write_snapshot(path, graph, block_numbers={"Chain0": 123}, lps=lps)
+            with open_snapshot(path) as snapshot:
+                mapped = snapshot.graph
+                # arrays are read only views over the mapping, not copies
+                self.assertFalse(mapped.weights.flags.owndata)
+                self.assertFalse(mapped.weights.flags.writeable)
+                self.assertEqual(mapped.nodes, frozen.nodes)
+                self.assertEqual(mapped.indptr.tolist(), frozen.indptr.tolist())
+                self.assertEqual(mapped.weights.tolist(), frozen.weights.tolist())
+                self.assertEqual(snapshot.block_numbers, {"Chain0": 123})
+                self.assertEqual(snapshot.lp_metadata["Bridge-0"]["kind"], "Bridge")
+                self.assertEqual(int(snapshot.lp_metadata["DEX-0-0"]["reserve_a"]), lps[0].token_a.amount)
+
+                initial, target = ("Chain0", "USD1"), ("Chain3", "USD4")
+                self.assertAlmostEqual(mapped.route(initial, target).total_cost, float(dijkstra(graph, initial, target).total_cost), places=12)
+
+    def test_rejects_other_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "not_a_graph")
+            with open(path, "wb") as f:
+                f.write(b"\0" * 64)
+            with self.assertRaises(ValueError):
+                open_snapshot(path)
+
+if __name__ == '__main__':
+    unittest.main()
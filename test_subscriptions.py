@@ -0,0 +1,111 @@
+import unittest
+import asyncio
+import random
+from pathway import Graph, dijkstra
+from subscriptions import RouteSubscriptions
+
+A, B, C, D, E = [("Chain0", name) for name in "ABCDE"]
+
+def random_graph(tokens=60, lps=150, seed=5):
+    rng = random.Random(seed)
+    nodes = [(f"Chain{i % 4}", f"T{i}") for i in range(tokens)]
+    graph = Graph()
+    for node in nodes:
+        graph.add_node(node)
+    for i in range(lps):
+        a, b = rng.sample(nodes, 2)
+        graph.add_edge(a, b, rng.random() * 0.01, f"LP-{i}")
+    return graph, nodes
+
+def line_graph():
+    # A -> B -> C is the best route, A -> C a worse direct one, D -> E unrelated
+    graph = Graph()
+    for node in (A, B, C, D, E):
+        graph.add_node(node)
+    graph.add_edge(A, B, 0.001, "LP-AB")
+    graph.add_edge(B, C, 0.001, "LP-BC")
+    graph.add_edge(A, C, 0.005, "LP-AC")
+    graph.add_edge(D, E, 0.001, "LP-DE")
+    return graph
+
+class TestRouteSubscriptions(unittest.TestCase):
+    def test_push_only_on_route_or_cost_change(self):
+        graph = line_graph()
+        hub = RouteSubscriptions(graph, cost_threshold=0.0005)
+        received = []
+        hub.subscribe(A, C, callback=received.append)
+        self.assertEqual([lp for _, _, lp in received[-1].edges_used], ["LP-AB", "LP-BC"])
+
+        # unrelated pool, not even evaluated
+        graph.set_edge_weight(D, E, 0.5, "LP-DE")
+        self.assertEqual(hub.on_lps_updated(["LP-DE"]), [])
+        self.assertEqual(hub.evaluations, 1)
+
+        # small move within the threshold
+        graph.set_edge_weight(A, B, 0.0012, "LP-AB")
+        self.assertEqual(hub.on_lps_updated(["LP-AB"]), [])
+        self.assertEqual(len(received), 1)
+
+        # the direct pool becomes the best route
+        graph.set_edge_weight(A, B, 0.01, "LP-AB")
+        self.assertEqual(len(hub.on_lps_updated(["LP-AB"])), 1)
+        self.assertEqual([lp for _, _, lp in received[-1].edges_used], ["LP-AC"])
+
+        # LP-BC now hangs off B, which is farther than the route cost, it can't matter
+        graph.set_edge_weight(B, C, 0.0, "LP-BC")
+        evaluations = hub.evaluations
+        hub.on_lps_updated(["LP-BC"])
+        self.assertEqual(hub.evaluations, evaluations)
+
+    def test_cancel(self):
+        graph = line_graph()
+        hub = RouteSubscriptions(graph)
+        received = []
+        subscription = hub.subscribe(A, C, callback=received.append)
+        subscription.cancel()
+        graph.set_edge_weight(A, B, 0.01, "LP-AB")
+        hub.on_lps_updated(["LP-AB"])
+        self.assertEqual(len(received), 1)
+        self.assertEqual(hub._by_lp, {})
+
+    def test_async_stream(self):
+        graph = line_graph()
+        hub = RouteSubscriptions(graph)
+
+        async def consume():
+            subscription = hub.subscribe(A, C)
+            results = []
+            async for result in subscription:
+                results.append(result)
+                if len(results) == 1:
+                    graph.set_edge_weight(A, B, 0.01, "LP-AB")
+                    hub.on_lps_updated(["LP-AB"])
+                else:
+                    subscription.cancel()
+            return results
+
+        results = asyncio.run(consume())
+        self.assertEqual([[lp for _, _, lp in result.edges_used] for result in results], [["LP-AB", "LP-BC"], ["LP-AC"]])
+
+    def test_matches_full_recompute_on_random_updates(self):
+        graph, nodes = random_graph(tokens=30, lps=80, seed=11)
+        rng = random.Random(4)
+        lp_edges = {}
+        for (from_node, to_node), lp_name in graph.lp_names.items():
+            lp_edges[lp_name] = (from_node, to_node)
+        hub = RouteSubscriptions(graph)
+        pairs = [tuple(rng.sample(nodes, 2)) for _ in range(15)]
+        subscriptions = [hub.subscribe(initial, target) for initial, target in pairs]
+
+        for _ in range(200):
+            lp_name = rng.choice(sorted(lp_edges))
+            graph.set_edge_weight(*lp_edges[lp_name], rng.random() * 0.01, lp_name)
+            hub.on_lps_updated([lp_name])
+            for subscription in subscriptions:
+                expected = dijkstra(graph, subscription.initial, subscription.target)
+                self.assertAlmostEqual(subscription.result.total_cost, expected.total_cost, places=12)
+        # most updates touch only a few subscriptions
+        self.assertLess(hub.evaluations, 200 * len(subscriptions))
+
+if __name__ == '__main__':
+    unittest.main()
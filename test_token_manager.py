@@ -0,0 +1,108 @@
+import unittest
+import json
+import os
+import tempfile
+from pathway import TokenManager, Token, Dex, Bridge
+
+class TestTokenManagerIndexes(unittest.TestCase):
+    def setUp(self):
+        self.token_manager = TokenManager()
+        self.token_manager.add_token("SourceChain", "sUSDC-A", 100, asset="USDC")
+        self.token_manager.add_token("SourceChain", "sUSDT", 100, asset="USDT")
+        self.token_manager.add_token("DestinationChain", "dUSDC-A", 100, asset="USDC")
+        self.token_manager.add_token("DestinationChain", "dDAI", 100)
+
+    def test_stable_ids(self):
+        token_id = self.token_manager.get_token_id("DestinationChain", "dUSDC-A")
+        self.assertEqual(token_id, 2)
+        self.assertEqual(self.token_manager.get_key_by_id(token_id), ("DestinationChain", "dUSDC-A"))
+        self.assertIs(self.token_manager.get_token_by_id(token_id), self.token_manager.get_token("DestinationChain", "dUSDC-A"))
+        self.assertEqual(self.token_manager.add_token("SourceChain", "sDAI"), 4)
+        self.assertIsNone(self.token_manager.get_token_id("SourceChain", "missing"))
+
+    def test_chain_and_asset_indexes(self):
+        self.assertEqual(self.token_manager.get_tokens_on_chain("SourceChain"), [("SourceChain", "sUSDC-A"), ("SourceChain", "sUSDT")])
+        self.assertEqual(self.token_manager.get_tokens_for_asset("USDC"), [("SourceChain", "sUSDC-A"), ("DestinationChain", "dUSDC-A")])
+        # asset defaults to the token name
+        self.assertEqual(self.token_manager.get_tokens_for_asset("dDAI"), [("DestinationChain", "dDAI")])
+        self.assertEqual(self.token_manager.get_tokens_on_chain("Nowhere"), [])
+        self.assertEqual(self.token_manager.get_chains(), ["SourceChain", "DestinationChain"])
+        # results are copies, changing them leaves the indexes alone
+        self.token_manager.get_tokens_on_chain("SourceChain").clear()
+        self.token_manager.get_tokens_for_asset("USDC").append(("SourceChain", "sUSDT"))
+        self.assertEqual(len(self.token_manager.get_tokens_on_chain("SourceChain")), 2)
+        self.assertEqual(len(self.token_manager.get_tokens_for_asset("USDC")), 2)
+
+    def test_get_all_keys(self):
+        keys = self.token_manager.get_all_keys()
+        self.assertEqual(len(keys), 4)
+        self.assertIn(("SourceChain", "sUSDT"), keys)
+
+    def test_duplicate_token(self):
+        with self.assertRaises(ValueError):
+            self.token_manager.add_token("SourceChain", "sUSDT")
+
+    def test_lps_by_chain(self):
+        dex = Dex("DEX-A", self.token_manager.get_token("SourceChain", "sUSDC-A"), self.token_manager.get_token("SourceChain", "sUSDT"))
+        bridge = Bridge("Bridge-A", self.token_manager.get_token("SourceChain", "sUSDC-A"), self.token_manager.get_token("DestinationChain", "dUSDC-A"))
+        self.token_manager.add_lp(dex)
+        self.token_manager.add_lp(bridge)
+        self.assertEqual(self.token_manager.get_lps_on_chain("SourceChain"), [dex, bridge])
+        self.assertEqual(self.token_manager.get_lps_on_chain("DestinationChain"), [bridge])
+
+class TestTokenManifest(unittest.TestCase):
+    def test_json_manifest(self):
+        manifest = {
+            "chains": {"SourceChain": {"rpc_url": "http://localhost:8545"}},
+            "tokens": [
+                {"chain": "SourceChain", "name": "sUSDC-A", "address": "0x5FbDB2315678afecb367f032d93F642f64180aa3", "decimals": 6, "asset": "USDC", "amount": 10000},
+                {"chain": "DestinationChain", "name": "dUSDC-A", "asset": "USDC", "rpc_url": "http://localhost:8546"},
+            ],
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tokens.json")
+            with open(path, "w") as f:
+                json.dump(manifest, f)
+            token_manager = TokenManager.from_manifest(path)
+
+        self.assertEqual(token_manager.get_token("SourceChain", "sUSDC-A"), Token("SourceChain", "sUSDC-A", 10000))
+        self.assertEqual(token_manager.metadata[("SourceChain", "sUSDC-A")].decimals, 6)
+        self.assertEqual(token_manager.rpc_urls, {"SourceChain": "http://localhost:8545", "DestinationChain": "http://localhost:8546"})
+        self.assertEqual(len(token_manager.get_tokens_for_asset("USDC")), 2)
+
+    def test_csv_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tokens.csv")
+            with open(path, "w") as f:
+                f.write("chain,name,address,decimals,asset,amount\n")
+                f.write("SourceChain,sUSDC-A,0x5FbDB2315678afecb367f032d93F642f64180aa3,6,USDC,10000\n")
+                f.write("SourceChain,sUSDC-B,,,USDC,\n")
+            token_manager = TokenManager()
+            self.assertEqual(token_manager.load_manifest(path), [0, 1])
+
+        self.assertEqual(token_manager.get_token("SourceChain", "sUSDC-A").amount, 10000)
+        self.assertIsNone(token_manager.get_token("SourceChain", "sUSDC-B").amount)
+        self.assertEqual(token_manager.metadata[("SourceChain", "sUSDC-A")].decimals, 6)
+        self.assertEqual(token_manager.get_tokens_on_chain("SourceChain"), [("SourceChain", "sUSDC-A"), ("SourceChain", "sUSDC-B")])
+
+    def test_bad_manifest_adds_nothing(self):
+        token_manager = TokenManager()
+        token_manager.add_token("SourceChain", "sUSDT")
+        rows = [{"chain": "SourceChain", "name": "sUSDC-A"}, {"chain": "SourceChain", "name": "sUSDC-B", "amount": "lots"}]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tokens.json")
+            for bad in (rows, rows[:1] * 2, rows[:1] + [{"chain": "SourceChain", "name": "sUSDT"}]):
+                with open(path, "w") as f:
+                    json.dump({"chains": {"SourceChain": {"rpc_url": "http://localhost:8545"}}, "tokens": bad}, f)
+                with self.assertRaises(ValueError):  # pydantic's ValidationError is one too
+                    token_manager.load_manifest(path)
+                self.assertEqual(len(token_manager.tokens), 1)
+                self.assertEqual(token_manager.rpc_urls, {})
+
+            # the fixed manifest loads, ids carry on from the registry
+            with open(path, "w") as f:
+                json.dump({"tokens": [rows[0], {"chain": "SourceChain", "name": "sUSDC-B", "amount": 5}]}, f)
+            self.assertEqual(token_manager.load_manifest(path), [1, 2])
+
+if __name__ == '__main__':
+    unittest.main()